@@ -0,0 +1,433 @@
+import math
+import time
+from collections import deque, namedtuple
+
+# --- WAITING ---
+# Events after which a waited-for window or application may have appeared
+WAIT_EVENTS = ("window:create", "window:activate", "object:children-changed")
+# Bursts of events (an application building its UI) are checked once per
+# this interval instead of once per event. A window often gets its name or
+# children after the event announcing it, so a check that misses is
+# repeated at doubling delays up to the poll interval, more events or not.
+CHECK_DELAY_S = 0.02
+# Events can be missed (e.g. an application that registers on the bus
+# late), so the target is also looked for at this interval, no slower
+# than the loop being replaced
+FALLBACK_POLL_S = 1.0
+# The interval the sleep-polling loops this replaces used
+LEGACY_POLL_S = 1.0
+
+# --- SEARCH ---
+# AT-SPI's SHOWING state (AtspiStateType), in the form the state calls take
+STATE_SHOWING = 25
+# Limits on the breadth-first walk, so a runaway tree can't stall a job
+SEARCH_MAX_DEPTH = 25
+SEARCH_MAX_NODES = 10000
+# Containers that never hold a menu, skipped when looking for menu items
+MENU_SKIP_ROLES = ("tool bar", "page tab list", "scroll pane", "table", "tree table", "tree", "list", "canvas")
+
+# What search() looks for:
+#   roles         the widget's role name contains one of these, e.g. "menu item"
+#                 also takes check/radio/tearoff menu items (None: any role)
+#   name          predicate on its name
+#   hidden_roles  roles whose subtrees are searched even when not SHOWING
+#                 (items of a closed menu are not showing but can be activated)
+#   skip_roles    roles whose subtrees can't hold the widget
+Match = namedtuple("Match", ["roles", "name", "hidden_roles", "skip_roles"], defaults=((), ()))
+
+_waits = []
+_ipc_calls = 0
+_nodes_visited = 0
+
+
+# Accessor wrappers: every call is a D-Bus round trip, so they are counted
+def role_name(acc):
+    """Lowercase role name of acc."""
+    global _ipc_calls
+    _ipc_calls += 1
+    return (acc.getRoleName() or "").lower()
+
+
+def acc_name(acc):
+    """Name of acc ("" when it has none)."""
+    global _ipc_calls
+    _ipc_calls += 1
+    return acc.name or ""
+
+
+def child_count(acc):
+    global _ipc_calls
+    _ipc_calls += 1
+    return acc.childCount
+
+
+def child_at(acc, i):
+    global _ipc_calls
+    _ipc_calls += 1
+    return acc.getChildAtIndex(i)
+
+
+def is_showing(acc):
+    """True if acc has the SHOWING state."""
+    global _ipc_calls
+    _ipc_calls += 1
+    return acc.getState().contains(STATE_SHOWING)
+
+
+def parent_index(acc):
+    """(parent, index of acc in it)."""
+    global _ipc_calls
+    _ipc_calls += 2
+    return acc.parent, acc.getIndexInParent()
+
+
+def ipc_calls():
+    """Accessibility calls made through this module so far."""
+    return _ipc_calls
+
+
+def nodes_visited():
+    """Accessibles the searches in this module have looked at so far."""
+    return _nodes_visited
+
+
+def menu_item_named(text):
+    """Match for a menu item of any kind whose name contains text (lowercase)."""
+    return Match(("menu item",), lambda name: text in name.lower(), ("menu",), MENU_SKIP_ROLES)
+
+
+def button_named(text):
+    """Match for a button of any kind whose whole name is text (lowercase)."""
+    return Match(("button",), lambda name: name.strip().lower() == text)
+
+
+def role_matches(role, match):
+    """True if a role name contains one of match's roles."""
+    return match.roles is None or any(r in role for r in match.roles)
+
+
+def matches(acc, match):
+    """True if acc has one of match's roles and a name it accepts."""
+    if not role_matches(role_name(acc), match):
+        return False
+    return bool(match.name(acc_name(acc)))
+
+
+def find_path(acc, match, path=()):
+    """
+    (accessible, child-index path) of the first match under acc, depth first; (None, None) if none.
+
+    Visits every node, hidden or not; search() is the pruned version.
+    """
+    global _nodes_visited
+    _nodes_visited += 1
+    try:
+        if matches(acc, match):
+            return acc, path
+        for i in range(child_count(acc)):
+            found, found_path = find_path(child_at(acc, i), match, path + (i,))
+            if found is not None:
+                return found, found_path
+    except Exception:
+        pass
+    return None, None
+
+
+def follow_path(acc, path):
+    """The accessible reached from acc through a child-index path."""
+    for i in path:
+        acc = child_at(acc, i)
+    return acc
+
+
+def path_to(root, acc, max_depth=SEARCH_MAX_DEPTH):
+    """Child-index path from root down to acc through its parents, or None if root is not above it."""
+    path = []
+    while acc != root:
+        if acc is None or len(path) >= max_depth:
+            return None
+        acc, index = parent_index(acc)
+        path.append(index)
+    return tuple(reversed(path))
+
+
+def _collection_matches(root, match):
+    """Candidates for match under root from one Collection getMatches call; None without Collection."""
+    global _ipc_calls
+    if match.roles is None:
+        return None
+    try:
+        from gi.repository import Atspi
+    except ImportError:
+        return None
+    try:
+        collection = root.get_collection_iface()
+        if collection is None:
+            return None
+        # Every role whose name contains one of match.roles, as matches() takes them
+        roles = [role for role in Atspi.Role.__enum_values__.values()
+                 if role_matches(role.value_nick.replace("-", " "), match)]
+        # Hidden menus hold the target unshown, so SHOWING is only required without them
+        states = Atspi.StateSet.new([] if match.hidden_roles else [Atspi.StateType.SHOWING])
+        rule = Atspi.MatchRule.new(states, Atspi.CollectionMatchType.ALL, {}, Atspi.CollectionMatchType.ALL,
+                                   roles, Atspi.CollectionMatchType.ANY, [], Atspi.CollectionMatchType.ALL, False)
+        _ipc_calls += 1
+        return collection.get_matches(rule, Atspi.CollectionSortOrder.CANONICAL, 0, True)
+    except Exception:
+        return None
+
+
+def _walk(root, match, max_depth, max_nodes):
+    """Breadth-first search of root's tree that skips non-showing and match.skip_roles subtrees."""
+    global _nodes_visited
+    # Children are fetched only when dequeued, so an early match skips the rest
+    queue = deque([(None, 0, ())])
+    visited = 0
+    while queue and visited < max_nodes:
+        parent, index, path = queue.popleft()
+        visited += 1
+        try:
+            acc = root if parent is None else child_at(parent, index)
+            role = role_name(acc)
+            if role_matches(role, match) and match.name(acc_name(acc)):
+                _nodes_visited += visited
+                return acc, path
+            if len(path) >= max_depth or role in match.skip_roles:
+                continue
+            if path and role not in match.hidden_roles and not is_showing(acc):
+                continue
+            queue.extend((acc, i, path + (i,)) for i in range(child_count(acc)))
+        except Exception:
+            continue
+    _nodes_visited += visited
+    return None, None
+
+
+def search(root, match, max_depth=SEARCH_MAX_DEPTH, max_nodes=SEARCH_MAX_NODES):
+    """
+    (accessible, child-index path) of the first match under root; (None, None) if none.
+
+    Asks the application for the candidates with the Collection
+    interface's getMatches (role and state rules; names are checked here)
+    when it supports it. Otherwise walks the tree breadth first, skipping
+    subtrees without SHOWING (except match.hidden_roles) and of
+    match.skip_roles, up to max_depth levels and max_nodes nodes. The path
+    is None when it can't be worked out.
+    """
+    global _nodes_visited
+    candidates = _collection_matches(root, match)
+    if candidates is None:
+        return _walk(root, match, max_depth, max_nodes)
+    for acc in candidates:
+        _nodes_visited += 1
+        try:
+            if match.name(acc_name(acc)):
+                return acc, path_to(root, acc, max_depth)
+        except Exception:
+            continue
+    return None, None
+
+
+class PathCache:
+    """
+    Child-index paths to widgets found before, so a later lookup costs a few calls.
+
+    find() walks the cached path from the root and checks the node still
+    matches; only a missing or stale path runs search(). Hits, misses and
+    the calls hits saved against that search are kept for logging.
+    """
+
+    def __init__(self):
+        self.paths = {}
+        self.search_calls = {}
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.saved_calls = 0
+
+    def find(self, key, root, match):
+        """The widget `key` under root: through its cached path if that still matches, else searched."""
+        start = _ipc_calls
+        path = self.paths.pop(key, None)
+        if path is not None:
+            node = _safe(lambda: follow_path(root, path))
+            if node is not None and _safe(lambda: matches(node, match)):
+                self.paths[key] = path
+                self.hits += 1
+                cost = _ipc_calls - start
+                self.saved_calls += max(self.search_calls[key] - cost, 0)
+                print(f"[ATSPI] {key}: cached path hit in {cost} calls (search took {self.search_calls[key]}), "
+                      f"hit rate {self.hit_rate():.0%}, {self.saved_calls} calls saved")
+                return node
+            self.stale += 1
+
+        self.misses += 1
+        node, found_path = search(root, match)
+        cost = _ipc_calls - start
+        if found_path is not None:
+            self.paths[key] = found_path
+            self.search_calls[key] = cost
+        print(f"[ATSPI] {key}: {'stale path, ' if path is not None else ''}search in {cost} calls"
+              f"{'' if node is not None else ', not found'}, hit rate {self.hit_rate():.0%}")
+        return node
+
+    def hit_rate(self):
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self):
+        """Hits, misses, stale paths and IPC calls saved, for logging."""
+        return {"hits": self.hits, "misses": self.misses, "stale": self.stale,
+                "hit_rate": self.hit_rate(), "saved_calls": self.saved_calls, "size": len(self.paths)}
+
+    def clear(self):
+        """Forget all paths and reset the counters."""
+        self.__init__()
+
+
+# Shared by every lookup in this process (one Inkscape layout)
+paths = PathCache()
+
+
+def wait_for(find, timeout, interval=LEGACY_POLL_S):
+    """Call find() until it returns something, for up to timeout seconds; None on timeout."""
+    deadline = time.monotonic() + timeout
+    while True:
+        found = find()
+        if found:
+            return found
+        if time.monotonic() >= deadline:
+            return None
+        time.sleep(interval)
+
+
+def _safe(find):
+    try:
+        return find()
+    except Exception:
+        return None
+
+
+def wait_for_event(find, timeout, label="target", events=WAIT_EVENTS):
+    """
+    Wait for find() to return something, re-checking on AT-SPI events; None on timeout.
+
+    Listens for window-create, window-activate and children-changed events
+    through the pyatspi registry and runs find() shortly after each burst
+    (and again at doubling delays while it misses), so the wait ends as
+    soon as the target appears instead of on the next one-second poll.
+    Without a GLib main loop it falls back to wait_for(). Every wait is
+    logged with whether an event or the fallback poll found the target.
+    """
+    t0 = time.monotonic()
+    found = _safe(find)
+    if found:
+        return found
+    try:
+        from gi.repository import GLib
+        import pyatspi
+    except ImportError:
+        found = wait_for(find, timeout)
+        _record(label, time.monotonic() - t0, found is not None, "poll" if found else None)
+        return found
+
+    loop = GLib.MainLoop()
+    result = []
+    # Last miss (s after t0) and time spent in find(), for the legacy estimate
+    misses = [0.0]
+    find_s = [time.monotonic() - t0]
+    follow_up = {"source": None, "delay": CHECK_DELAY_S}
+
+    def check(source):
+        t = time.monotonic()
+        hit = _safe(find)
+        find_s.append(time.monotonic() - t)
+        if result:
+            return True
+        if hit:
+            result.append((hit, source))
+            loop.quit()
+            return True
+        misses.append(t - t0)
+        return False
+
+    def schedule(delay):
+        if follow_up["source"] is not None:
+            GLib.source_remove(follow_up["source"])
+        follow_up["delay"] = delay
+        follow_up["source"] = GLib.timeout_add(int(delay * 1000), on_check)
+
+    def on_check():
+        follow_up["source"] = None
+        if not check("event") and follow_up["delay"] * 2 < FALLBACK_POLL_S:
+            schedule(follow_up["delay"] * 2)
+        return False
+
+    def on_event(event):
+        # A pending check covers the events before it; a far-off follow-up is brought forward
+        if not result and (follow_up["source"] is None or follow_up["delay"] > CHECK_DELAY_S):
+            schedule(CHECK_DELAY_S)
+
+    def on_poll():
+        return not check("poll")
+
+    def on_timeout():
+        loop.quit()
+        return False
+
+    pyatspi.Registry.registerEventListener(on_event, *events)
+    sources = [GLib.timeout_add(int(timeout * 1000), on_timeout),
+               GLib.timeout_add(int(FALLBACK_POLL_S * 1000), on_poll)]
+    try:
+        loop.run()
+    finally:
+        pyatspi.Registry.deregisterEventListener(on_event, *events)
+        for source in sources + [follow_up["source"]]:
+            if source is not None and GLib.MainContext.default().find_source_by_id(source):
+                GLib.source_remove(source)
+
+    found, source = result[0] if result else (None, None)
+    legacy = None
+    if source == "event":
+        legacy = legacy_wait_s(misses[-1], sum(find_s) / len(find_s))
+    _record(label, time.monotonic() - t0, found is not None, source, legacy)
+    return found
+
+
+def legacy_wait_s(last_miss_s, find_s, interval=LEGACY_POLL_S):
+    """
+    When wait_for() would have found a target that was still missing last_miss_s into the wait.
+
+    wait_for() calls find() at 0, then once per interval plus the call's own
+    find_s; the first of those calls after the last miss is the earliest it
+    could have seen the target, so savings against it are a lower bound.
+    """
+    period = interval + find_s
+    return (math.floor(last_miss_s / period) + 1) * period + find_s
+
+
+def _record(label, elapsed, found, source, legacy=None):
+    # Only an event-driven hit beats the legacy loop; a poll hit is what it would have done
+    saved = max(0.0, legacy - elapsed) if legacy is not None else 0.0
+    _waits.append({"label": label, "elapsed_s": elapsed, "found": found, "source": source, "saved_s": saved})
+    if not found:
+        print(f"[ATSPI] {label} not found after {elapsed:.1f} s")
+    elif legacy is not None:
+        print(f"[ATSPI] {label} ready in {elapsed:.2f} s on an event (one-second polling: {legacy:.2f} s, "
+              f"saved {saved * 1000:.0f} ms)")
+    else:
+        print(f"[ATSPI] {label} ready in {elapsed:.2f} s on a poll")
+
+
+def stats():
+    """Waits so far, what ended them, and the milliseconds saved against one-second polling, for logging."""
+    found = [w for w in _waits if w["found"]]
+    saved_ms = sum(w["saved_s"] for w in found) * 1000.0
+    return {
+        "waits": len(_waits),
+        "found": len(found),
+        "event_hits": sum(1 for w in found if w["source"] == "event"),
+        "poll_hits": sum(1 for w in found if w["source"] == "poll"),
+        "saved_ms": saved_ms,
+        "saved_ms_per_wait": saved_ms / len(found) if found else 0.0,
+    }
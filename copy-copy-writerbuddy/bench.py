@@ -0,0 +1,786 @@
+#!/usr/bin/env python3
+"""
+bench.py
+
+Micro-benchmarks for the writer pipeline.
+
+Usage:
+  python bench.py fontcache [--font EMSDelight.svg] [--repeat 50]
+  python bench.py wrap [--words 20000] [--seed 1]
+  python bench.py lines [--repeat 500]
+  python bench.py outlines [--repeat 50]
+  python bench.py fontstore [--workers 1,2,4,8]
+  python bench.py svgmodes [--repeat 10] [--inkscape]
+  python bench.py svgstream [--glyphs 100,10000,100000]
+  python bench.py svgsize [--repeat 10] [--inkscape]
+  python bench.py travel [--passes 0,1,2,4,all]
+  python bench.py merge [--tolerances 0.05,0.25,0.5,1]
+  python bench.py quality
+  python bench.py estimate [--repeat 20]
+  python bench.py preview [--repeat 10] [--dpmm 2,4,8]
+  python bench.py pipeline [--repeat 10]
+  python bench.py plotter [--repeat 5]
+  python bench.py inkscape [--jobs 3]
+  python bench.py atspi [--jobs 5] [--menus 12] [--items 25] [--widgets 40]
+"""
+
+import argparse
+import os
+import shutil
+import signal
+import subprocess
+import tempfile
+import time
+import tracemalloc
+
+from reference_data import (
+    REFERENCE_UTTERANCES,
+    TreeNode,
+    axidraw_dialog,
+    inkscape_tree,
+    legacy_split_to_lines,
+    legacy_wrap_text_to_width,
+    random_corpus,
+)
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_FONT = os.path.join(SCRIPT_DIR, "EMSDelight.svg")
+
+
+def time_calls(fn, repeat):
+    """Return (best, mean) wall time per call in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    return min(samples), sum(samples) / len(samples)
+
+
+def report(label, best, mean):
+    print(f"  {label:<28} best {best:9.3f} ms   mean {mean:9.3f} ms")
+
+
+def bench_fontcache(args):
+    import font_cache
+
+    cache_dir = tempfile.mkdtemp(prefix="wb_fontcache_")
+    try:
+        print(f"Font: {args.font}")
+        report("cold lxml parse", *time_calls(lambda: font_cache.parse_svg_font(args.font), args.repeat))
+
+        # First call compiles the cache, the rest are hits
+        font_cache.load_cached_font(args.font, cache_dir)
+        report("cache hit", *time_calls(lambda: font_cache.load_cached_font(args.font, cache_dir), args.repeat))
+
+        cache_file = font_cache.cache_path_for(args.font, cache_dir)
+        print(f"  cache file size: {os.path.getsize(cache_file)} bytes")
+    finally:
+        shutil.rmtree(cache_dir, ignore_errors=True)
+
+
+def bench_wrap(args):
+    import cleaned_svgout
+    import font_cache
+
+    glyphs, units_per_em, ascent = font_cache.parse_svg_font(args.font)
+    height = cleaned_svgout.TEXT_HEIGHT_MM
+    max_width = cleaned_svgout.MAX_LINE_WIDTH
+
+    mismatches = 0
+    for seed in range(args.seed, args.seed + 200):
+        text = random_corpus(glyphs, 50, seed)
+        for width in (20, max_width):
+            old = legacy_wrap_text_to_width(text, glyphs, units_per_em, height, width)
+            new = cleaned_svgout.wrap_text_to_width(text, glyphs, units_per_em, height, width)
+            mismatches += old != new
+    print(f"Equivalence on 400 random texts: {mismatches} mismatches")
+
+    for n_words in (12, 1000, args.words):
+        text = random_corpus(glyphs, n_words, args.seed)
+        repeat = max(3, min(200, 20000 // n_words))
+        old = legacy_wrap_text_to_width(text, glyphs, units_per_em, height, max_width)
+        new = cleaned_svgout.wrap_text_to_width(text, glyphs, units_per_em, height, max_width)
+        print(f"{n_words} words, {len(new)} lines, identical: {old == new}")
+        report("legacy loop", *time_calls(
+            lambda: legacy_wrap_text_to_width(text, glyphs, units_per_em, height, max_width), repeat))
+        report("vectorized", *time_calls(
+            lambda: cleaned_svgout.wrap_text_to_width(text, glyphs, units_per_em, height, max_width), repeat))
+
+
+def bench_lines(args):
+    import cleaned_svgout
+
+    cleaned_svgout.FONT_PATH = args.font
+    glyphs, units_per_em, ascent = cleaned_svgout.load_svg_font(args.font)
+    height = cleaned_svgout.TEXT_HEIGHT_MM
+    max_width = cleaned_svgout.MAX_LINE_WIDTH
+
+    def emitted(lines):
+        # text_to_svg re-wraps every line it is given
+        out = []
+        for line in lines:
+            out.extend(cleaned_svgout.wrap_text_to_width(line, glyphs, units_per_em, height, max_width))
+        return out
+
+    old_total = new_total = 0
+    for text in REFERENCE_UTTERANCES:
+        old_total += len(emitted(legacy_split_to_lines(text)))
+        new_total += len(emitted(cleaned_svgout.split_text_to_lines(text)))
+    print(f"Reference corpus ({len(REFERENCE_UTTERANCES)} utterances): "
+          f"{old_total} lines with 8-word breaks, {new_total} with glyph metrics")
+
+    def run_old():
+        for text in REFERENCE_UTTERANCES:
+            emitted(legacy_split_to_lines(text))
+
+    def run_new():
+        for text in REFERENCE_UTTERANCES:
+            emitted(cleaned_svgout.split_text_to_lines(text))
+
+    n = len(REFERENCE_UTTERANCES)
+    best, mean = time_calls(run_old, args.repeat)
+    report("8-word split + re-wrap", best / n, mean / n)
+    best, mean = time_calls(run_new, args.repeat)
+    report("glyph-metric split", best / n, mean / n)
+    print("  (per utterance)")
+
+
+def page_runs(cleaned_svgout, font, text=None):
+    """Layout runs for one full page of text at the writer's settings."""
+    import text_layout
+
+    glyphs, units_per_em, ascent = cleaned_svgout.load_svg_font(font)
+    table = text_layout.advance_table(glyphs, units_per_em, cleaned_svgout.TEXT_HEIGHT_MM)
+    layout = text_layout.LineLayout(
+        table,
+        cleaned_svgout.START_X,
+        cleaned_svgout.START_Y,
+        cleaned_svgout.MAX_LINE_WIDTH,
+        cleaned_svgout.TEXT_HEIGHT_MM * cleaned_svgout.LINE_SPACING,
+        cleaned_svgout.PAGE_HEIGHT - cleaned_svgout.MARGIN,
+    )
+    text = text or " ".join(REFERENCE_UTTERANCES * 20)
+    return [run for run in layout.add_text(text) if run[3] == 1]
+
+
+def bench_outlines(args):
+    import cleaned_svgout
+    import outline_cache
+
+    glyphs, units_per_em, ascent = cleaned_svgout.load_svg_font(args.font)
+    height = cleaned_svgout.TEXT_HEIGHT_MM
+    runs = page_runs(cleaned_svgout, args.font)
+    n_glyphs = sum(1 for run in runs for ch in run[0] if ch in glyphs)
+    print(f"One page: {len(runs)} lines, {n_glyphs} glyphs")
+
+    def per_glyph_transforms():
+        scale = height / units_per_em
+        out = []
+        for text, x, y, _ in runs:
+            for char in text:
+                if char == " ":
+                    x += height * 0.6
+                    continue
+                if char not in glyphs:
+                    continue
+                path_data, adv = glyphs[char]
+                out.append((path_data, f"matrix({scale} 0 0 {-scale} {x} {y + ascent * scale})"))
+                x += adv * scale
+        return out
+
+    def build():
+        outline_cache.clear()
+        outline_cache.get_outlines(args.font, height)
+
+    report("build outlines (miss)", *time_calls(build, args.repeat))
+    outlines = outline_cache.get_outlines(args.font, height)
+    report("per-glyph transform strings", *time_calls(per_glyph_transforms, args.repeat))
+    report("batched offset placement", *time_calls(lambda: outlines.place_runs(runs), args.repeat))
+    points, offsets, _, _ = outlines.place_runs(runs)
+    print(f"  {len(offsets) - 1} strokes, {len(points)} points; cache {outline_cache.stats()}")
+
+
+def private_kb():
+    """Private (unshared) memory of this process in kB, from /proc (Linux only)."""
+    total = 0
+    try:
+        with open("/proc/self/smaps_rollup") as f:
+            for line in f:
+                if line.startswith(("Private_Clean:", "Private_Dirty:")):
+                    total += int(line.split()[1])
+    except OSError:
+        return -1
+    return total
+
+
+def font_worker(job):
+    """Load a font in a fresh worker; return (load ms, private kB added)."""
+    mode, path = job
+    import numpy  # noqa: F401  (exclude numpy's own import cost)
+    import font_cache
+    import font_store
+
+    before = private_kb()
+    t0 = time.perf_counter()
+    if mode == "svg":
+        font = font_cache.parse_svg_font(path)
+    else:
+        font = font_store.open_font_store(path)
+    # Touch every point so mapped pages are really read
+    checksum = sum(float(g.points.sum()) for g in font[0].values())
+    elapsed = (time.perf_counter() - t0) * 1000.0
+    return elapsed, private_kb() - before, checksum
+
+
+def bench_fontstore(args):
+    import multiprocessing
+    import font_cache
+
+    store_dir = tempfile.mkdtemp(prefix="wb_fontstore_")
+    try:
+        font_cache.load_cached_font(args.font, store_dir)
+        store_path = font_cache.cache_path_for(args.font, store_dir)
+        print(f"Store: {os.path.getsize(store_path)} bytes")
+        ctx = multiprocessing.get_context("spawn")
+        for n in [int(v) for v in args.workers.split(",")]:
+            for mode, path in (("svg", args.font), ("mmap", store_path)):
+                with ctx.Pool(n) as pool:
+                    results = pool.map(font_worker, [(mode, path)] * n)
+                ms = [r[0] for r in results]
+                kb = [r[1] for r in results]
+                print(f"  {n} workers, {mode:<4}  load mean {sum(ms) / n:7.2f} ms   "
+                      f"private +{sum(kb) / n:7.0f} kB/worker   total +{sum(kb):7.0f} kB")
+    finally:
+        shutil.rmtree(store_dir, ignore_errors=True)
+
+
+def write_page(cleaned_svgout, runs, path, mode, writer=None, precision=None):
+    """Write one page of runs in an output mode, bypassing layout state."""
+    dwg, group = cleaned_svgout.new_drawing(path, writer)
+    cleaned_svgout.draw_runs(dwg, group, runs, mode, precision)
+    dwg.add(group)
+    dwg.save()
+
+
+def inkscape_load_ms(path, repeat=3):
+    """Best wall time for `inkscape --query-all` on path, or None without Inkscape."""
+    if not shutil.which("inkscape"):
+        return None
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run(["inkscape", "--query-all", path], stdout=subprocess.DEVNULL,
+                       stderr=subprocess.DEVNULL, check=False)
+        ms = (time.perf_counter() - t0) * 1000.0
+        best = ms if best is None else min(best, ms)
+    return best
+
+
+def bench_svgmodes(args):
+    import cleaned_svgout
+
+    cleaned_svgout.FONT_PATH = args.font
+    runs = page_runs(cleaned_svgout, args.font)
+    out_dir = tempfile.mkdtemp(prefix="wb_svgmodes_")
+    try:
+        print(f"One page: {len(runs)} lines")
+        for mode in cleaned_svgout.OUTPUT_MODES:
+            path = os.path.join(out_dir, f"page_{mode}.svg")
+            best, mean = time_calls(lambda: write_page(cleaned_svgout, runs, path, mode), args.repeat)
+            size = os.path.getsize(path)
+            line = f"  {mode:<6} {size / 1024:8.1f} KB   write best {best:7.2f} ms  mean {mean:7.2f} ms"
+            if args.inkscape:
+                ms = inkscape_load_ms(path)
+                line += "   inkscape n/a" if ms is None else f"   inkscape {ms:7.0f} ms"
+            print(line)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def glyph_runs(cleaned_svgout, font, n_glyphs):
+    """Runs holding roughly n_glyphs glyphs, laid out as one very long page."""
+    import text_layout
+
+    glyphs, units_per_em, ascent = cleaned_svgout.load_svg_font(font)
+    table = text_layout.advance_table(glyphs, units_per_em, cleaned_svgout.TEXT_HEIGHT_MM)
+    layout = text_layout.LineLayout(
+        table,
+        cleaned_svgout.START_X,
+        cleaned_svgout.START_Y,
+        cleaned_svgout.MAX_LINE_WIDTH,
+        cleaned_svgout.TEXT_HEIGHT_MM * cleaned_svgout.LINE_SPACING,
+        float("inf"),
+    )
+    corpus = " ".join(REFERENCE_UTTERANCES)
+    text = (corpus + " ") * (n_glyphs // len(corpus) + 1)
+    return layout.add_text(text[:n_glyphs].rstrip())
+
+
+def traced_write(fn):
+    """Run fn once under tracemalloc; returns (ms, peak MB)."""
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    fn()
+    ms = (time.perf_counter() - t0) * 1000.0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return ms, peak / (1024 * 1024)
+
+
+def bench_svgstream(args):
+    import cleaned_svgout
+
+    cleaned_svgout.FONT_PATH = args.font
+    # With travel ordering a page is laid out whole and written as one piece;
+    # without it the writers stream a few lines at a time, which is the
+    # memory this bench measures
+    cleaned_svgout.OPTIMIZE_TRAVEL = False
+    out_dir = tempfile.mkdtemp(prefix="wb_svgstream_")
+    try:
+        for n in [int(x) for x in args.glyphs.split(",")]:
+            runs = glyph_runs(cleaned_svgout, args.font, n)
+            print(f"{n} glyphs ({len(runs)} lines), mode {args.mode}")
+            paths = {}
+            for writer in ("svgwrite", "stream"):
+                path = os.path.join(out_dir, f"{writer}_{n}.svg")
+                ms, peak = traced_write(lambda: write_page(cleaned_svgout, runs, path, args.mode, writer))
+                paths[writer] = path
+                print(f"  {writer:<9} {ms:10.1f} ms   peak {peak:8.2f} MB   {os.path.getsize(path) / 1024:9.1f} KB")
+            with open(paths["svgwrite"], "rb") as a, open(paths["stream"], "rb") as b:
+                same = a.read() == b.read()
+            print(f"  identical output: {'yes' if same else 'NO'}")
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def bench_svgsize(args):
+    import cleaned_svgout
+
+    cleaned_svgout.FONT_PATH = args.font
+    runs = page_runs(cleaned_svgout, args.font)
+    step = cleaned_svgout.COORD_PRECISION_MM or 0.01
+    variants = [
+        ("full precision", 0, ".svg"),
+        (f"{step} mm relative", step, ".svg"),
+        (f"{step} mm svgz", step, ".svgz"),
+    ]
+    out_dir = tempfile.mkdtemp(prefix="wb_svgsize_")
+    try:
+        print(f"One page: {len(runs)} lines")
+        for mode in cleaned_svgout.OUTPUT_MODES:
+            print(f"{mode}:")
+            for label, precision, ext in variants:
+                path = os.path.join(out_dir, f"page_{mode}{ext}")
+                best, mean = time_calls(lambda: write_page(cleaned_svgout, runs, path, mode, None, precision), args.repeat)
+                size = os.path.getsize(path)
+                line = f"  {label:<20} {size / 1024:8.1f} KB   write best {best:7.2f} ms  mean {mean:7.2f} ms"
+                if args.inkscape:
+                    ms = inkscape_load_ms(path)
+                    line += "   inkscape n/a" if ms is None else f"   inkscape {ms:7.0f} ms"
+                print(line)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def bench_travel(args):
+    import cleaned_svgout
+    import outline_cache
+    import pen_travel
+
+    cleaned_svgout.FONT_PATH = args.font
+    runs = page_runs(cleaned_svgout, args.font)
+    outlines = outline_cache.get_outlines(args.font, cleaned_svgout.TEXT_HEIGHT_MM)
+    points, offsets, _, _ = outlines.place_runs(runs)
+    starts, ends = pen_travel.stroke_endpoints(points, offsets)
+    print(f"One page: {len(runs)} lines, {len(starts)} strokes")
+    print(f"  character order          pen-up {pen_travel.travel_distance(starts, ends):8.0f} mm")
+
+    t0 = time.perf_counter()
+    order, flipped = pen_travel.nearest_neighbour(starts, ends)
+    ms = (time.perf_counter() - t0) * 1000.0
+    print(f"  nearest neighbour        pen-up {pen_travel.travel_distance(starts, ends, order, flipped):8.0f} mm"
+          f"   {ms:7.0f} ms")
+
+    for passes in args.passes.split(","):
+        max_passes = None if passes == "all" else int(passes)
+        t0 = time.perf_counter()
+        order, flipped = pen_travel.optimize_order(starts, ends, max_passes=max_passes)
+        ms = (time.perf_counter() - t0) * 1000.0
+        label = f"nn + 2-opt, {passes} passes"
+        print(f"  {label:<24} pen-up {pen_travel.travel_distance(starts, ends, order, flipped):8.0f} mm"
+              f"   {ms:7.0f} ms")
+
+
+def bench_merge(args):
+    import cleaned_svgout
+    import outline_cache
+    import pen_travel
+    import stroke_merge
+
+    cleaned_svgout.FONT_PATH = args.font
+    runs = page_runs(cleaned_svgout, args.font)
+    glyphs, units_per_em, _ = cleaned_svgout.load_svg_font(args.font)
+    print(f"One page: {len(runs)} lines")
+    for tol in [float(t) for t in args.tolerances.split(",")]:
+        t0 = time.perf_counter()
+        merged = stroke_merge.merged_glyphs(glyphs, tol * units_per_em / cleaned_svgout.TEXT_HEIGHT_MM)
+        ms = (time.perf_counter() - t0) * 1000.0
+
+        outlines = outline_cache.get_outlines(args.font, cleaned_svgout.TEXT_HEIGHT_MM, tol)
+        points, offsets, _, _ = outlines.place_runs(runs)
+        order, flipped = pen_travel.optimize_order(*pen_travel.stroke_endpoints(points, offsets),
+                                                  max_passes=cleaned_svgout.TRAVEL_MAX_PASSES)
+        points, offsets = pen_travel.reorder_strokes(points, offsets, order, flipped)
+        _, _, joined = stroke_merge.join_consecutive(offsets, *pen_travel.stroke_endpoints(points, offsets), tol)
+        print(f"  {tol:5.2f} mm   {len(merged):3d} glyphs merge   lifts removed: "
+              f"{outlines.merged_lifts(runs):4d} in glyphs, {joined:4d} on page   "
+              f"({len(offsets) - 1} strokes, font pass {ms:.0f} ms once)")
+
+
+def bench_quality(args):
+    import cleaned_svgout
+    import outline_cache
+    import pen_travel
+    import plot_time
+
+    cleaned_svgout.FONT_PATH = args.font
+    runs = page_runs(cleaned_svgout, args.font)
+    print(f"One page: {len(runs)} lines (strokes in travel-optimized order)")
+    for quality, tol in cleaned_svgout.QUALITY_TOLERANCE_MM.items():
+        outline_cache.clear()
+        t0 = time.perf_counter()
+        outlines = cleaned_svgout.page_outlines(quality)
+        build_ms = (time.perf_counter() - t0) * 1000.0
+
+        points, offsets, _, _ = outlines.place_runs(runs)
+        order, flipped = pen_travel.optimize_order(*pen_travel.stroke_endpoints(points, offsets),
+                                                  max_passes=cleaned_svgout.TRAVEL_MAX_PASSES)
+        points, offsets = pen_travel.reorder_strokes(points, offsets, order, flipped)
+        est = plot_time.estimate_strokes(points, offsets)
+        print(f"  {quality:<7} {tol:5.2f} mm   {est['vertices']:6d} vertices   plot {est['time_s']:6.0f} s "
+              f"(draw {est['draw_s']:5.0f} s, travel {est['travel_s']:4.0f} s, pen {est['pen_s']:4.0f} s)   "
+              f"outlines built in {build_ms:.0f} ms")
+
+
+def bench_estimate(args):
+    import cleaned_svgout
+    import plot_time
+
+    cleaned_svgout.FONT_PATH = args.font
+    runs = page_runs(cleaned_svgout, args.font)
+    outlines = cleaned_svgout.page_outlines()
+    points, offsets, _, _ = outlines.place_runs(runs)
+    best, mean = time_calls(lambda: plot_time.estimate_strokes(points, offsets), args.repeat)
+    est = plot_time.estimate_strokes(points, offsets)
+    print(f"One page: {len(runs)} lines, {est['lifts']} lifts, pen-down {est['draw_mm']:.0f} mm, "
+          f"pen-up {est['travel_mm']:.0f} mm, estimate {est['time_s']:.0f} s")
+    report("from layout strokes", best, mean)
+
+    out_dir = tempfile.mkdtemp(prefix="wb_estimate_")
+    try:
+        for mode in cleaned_svgout.OUTPUT_MODES:
+            path = os.path.join(out_dir, f"page_{mode}.svg")
+            write_page(cleaned_svgout, runs, path, mode)
+            best, mean = time_calls(lambda: plot_time.estimate_svg(path), args.repeat)
+            report(f"from {mode} SVG ({plot_time.estimate_svg(path)['time_s']:.0f} s)", best, mean)
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def bench_preview(args):
+    import numpy as np
+
+    import cleaned_svgout
+    import preview
+
+    cleaned_svgout.FONT_PATH = args.font
+    runs = page_runs(cleaned_svgout, args.font)
+    size = (cleaned_svgout.PAGE_WIDTH, cleaned_svgout.PAGE_HEIGHT)
+    outlines = cleaned_svgout.page_outlines()
+    points, offsets, glyph_strokes, _ = outlines.place_runs(runs)
+    glyph_of = np.repeat(np.arange(len(glyph_strokes) - 1), np.diff(glyph_strokes))
+    print(f"One page: {len(runs)} lines, {len(offsets) - 1} strokes")
+    for dpmm in [float(d) for d in args.dpmm.split(",")]:
+        shape = preview.page_shape(size, dpmm)
+        report(f"render {shape[1]}x{shape[0]} px", *time_calls(
+            lambda: preview.render_strokes(points, offsets, size, dpmm), args.repeat))
+        found = preview.overprints(points, offsets, glyph_of, size, dpmm)
+        report(f"glyph overprint ({sum(f[2] for f in found)} px)", *time_calls(
+            lambda: preview.overprints(points, offsets, glyph_of, size, dpmm), args.repeat))
+
+    out_dir = tempfile.mkdtemp(prefix="wb_preview_")
+    try:
+        for mode in cleaned_svgout.OUTPUT_MODES:
+            path = os.path.join(out_dir, f"page_{mode}.svg")
+            write_page(cleaned_svgout, runs, path, mode)
+            report(f"{mode} SVG -> PNG", *time_calls(lambda: preview.preview_svg(path), args.repeat))
+
+        image = preview.render_svg(path)
+        png = os.path.join(out_dir, "golden.png")
+        preview.write_png(png, image)
+        print(f"  PNG {os.path.getsize(png) / 1024:.1f} KB")
+        report("golden read + compare", *time_calls(
+            lambda: preview.compare_images(image, preview.read_png(png)), args.repeat))
+        sheet = os.path.join(out_dir, "sheet.png")
+        report("add fragment to sheet", *time_calls(lambda: preview.add_to_sheet(image, sheet), args.repeat))
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def bench_pipeline(args):
+    import cleaned_svgout
+    import plot_time
+    import preview
+    import stroke_page
+
+    cleaned_svgout.FONT_PATH = args.font
+    runs = page_runs(cleaned_svgout, args.font)
+    print(f"One page: {len(runs)} lines; estimate + preview of the page, in process vs through the SVG file")
+    out_dir = tempfile.mkdtemp(prefix="wb_pipeline_")
+    try:
+        for mode in cleaned_svgout.OUTPUT_MODES:
+            strokes = cleaned_svgout.layout_strokes(runs, mode=mode)
+            path = os.path.join(out_dir, f"page_{mode}.svg")
+            dwg, group = cleaned_svgout.new_drawing(path)
+            cleaned_svgout.draw_strokes(dwg, group, strokes)
+            dwg.add(group)
+            dwg.save()
+
+            def from_ir():
+                plot_time.estimate_page(strokes)
+                preview.render_page(strokes)
+
+            def from_svg():
+                parsed = stroke_page.read_svg(path)
+                plot_time.estimate_page(parsed)
+                preview.render_page(parsed)
+
+            report(f"{mode} StrokePage", *time_calls(from_ir, args.repeat))
+            report(f"{mode} re-parsed SVG", *time_calls(from_svg, args.repeat))
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def bench_plotter(args):
+    import cleaned_svgout
+    import pagination
+    import plot_backend
+    import plot_time
+
+    cleaned_svgout.FONT_PATH = args.font
+    runs = page_runs(cleaned_svgout, args.font)
+    print(f"One page: {len(runs)} lines through the AxiDraw backend on a fake device")
+    out_dir = tempfile.mkdtemp(prefix="wb_plotter_")
+    try:
+        for mode in cleaned_svgout.OUTPUT_MODES:
+            strokes = cleaned_svgout.layout_strokes(runs, mode=mode)
+            path = os.path.join(out_dir, f"page_{mode}.svg")
+            dwg, group = cleaned_svgout.new_drawing(path)
+            cleaned_svgout.draw_strokes(dwg, group, strokes)
+            dwg.add(group)
+            dwg.save()
+            est = plot_time.estimate_page(strokes)
+
+            for label, fragment in (("StrokePage", pagination.PageFragment(1, path, len(runs), False, None, strokes)),
+                                    ("SVG file", pagination.PageFragment(1, path, len(runs), False))):
+                devices = []
+
+                def run():
+                    devices.append(plot_backend.FakeAxiDraw())
+                    plot_backend.get_plotter("fake", devices[-1])(fragment)
+
+                best, mean = time_calls(run, args.repeat)
+                ad = devices[-1]
+                report(f"{mode} from {label}", best, mean)
+                print(f"    {ad.lowers} pen lowers (estimate {est['lifts']}), pen-down {ad.draw_distance:.1f} mm "
+                      f"(estimate {est['draw_mm']:.1f} mm)")
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def bench_inkscape(args):
+    if not shutil.which("inkscape"):
+        print("Inkscape not installed; nothing to measure")
+        return
+    try:
+        import inkscape_session
+        import plot
+    except ImportError as e:
+        print(f"GUI automation unavailable ({e}); nothing to measure")
+        return
+    import cleaned_svgout
+
+    cleaned_svgout.FONT_PATH = args.font
+    runs = page_runs(cleaned_svgout, args.font)
+    out_dir = tempfile.mkdtemp(prefix="wb_inkscape_")
+    try:
+        paths = []
+        for i in range(args.jobs):
+            path = os.path.join(out_dir, f"job{i}.svg")
+            write_page(cleaned_svgout, runs[i:i + 1], path, "line")
+            paths.append(path)
+
+        # Apply would start a plot, so both paths stop once the dialog is ready
+        real_press, plot.press_apply = plot.press_apply, plot.find_apply
+        try:
+            for path in paths:
+                t0 = time.perf_counter()
+                plot.plot(path)
+                print(f"  new instance   {time.perf_counter() - t0:6.2f} s")
+                # Close it again, so the next job pays a full start like before
+                os.kill(plot.find_inkscape_app().get_process_id(), signal.SIGTERM)
+                time.sleep(1)
+
+            session = inkscape_session.InkscapeSession(os.path.join(out_dir, "session.svg"))
+            for path in paths:
+                session.plot(path)
+            stats = session.stats()
+            print(f"  reused session first {stats['started_mean_s']:.2f} s, "
+                  f"then {stats['reused_mean_s'] or 0.0:.2f} s per job ({stats['starts']} start)")
+            session.close()
+        finally:
+            plot.press_apply = real_press
+    finally:
+        shutil.rmtree(out_dir, ignore_errors=True)
+
+
+def bench_atspi(args):
+    import atspi_utils
+
+    app = inkscape_tree(args.menus, args.items, args.widgets)
+    dialog = axidraw_dialog(args.widgets)
+    lookups = (("AxiDraw menu item", app, atspi_utils.menu_item_named("axidraw")),
+               ("Apply button", dialog, atspi_utils.button_named("apply")))
+    print(f"Synthetic Inkscape tree, {args.jobs} jobs; every accessor call stands for one D-Bus round trip "
+          f"(no Collection interface here, so search() walks breadth first)")
+
+    for label, root, match in lookups:
+        for name, fn in (("recursion", atspi_utils.find_path), ("search", atspi_utils.search)):
+            calls, nodes = atspi_utils.ipc_calls(), atspi_utils.nodes_visited()
+            best, mean = time_calls(lambda: fn(root, match), args.repeat)
+            found, path = fn(root, match)
+            report(f"{label} {name}", best, mean)
+            print(f"    {(atspi_utils.nodes_visited() - nodes) // (args.repeat + 1)} nodes, "
+                  f"{(atspi_utils.ipc_calls() - calls) // (args.repeat + 1)} calls per lookup, "
+                  f"found {found.name!r} at {path}")
+
+    atspi_utils.paths.clear()
+    start = atspi_utils.ipc_calls()
+    for _ in range(args.jobs):
+        for key, root, match in lookups:
+            atspi_utils.paths.find(key, root, match)
+    # A new Inkscape with one more extension installed: the cached path goes stale
+    app.children[0].children[0].children[-1].children.insert(0, TreeNode("Another", "menu item", showing=False))
+    atspi_utils.paths.find("AxiDraw menu item", app, lookups[0][2])
+    stats = atspi_utils.paths.stats()
+    print(f"  path cache: {atspi_utils.ipc_calls() - start} calls for {2 * args.jobs + 1} lookups, "
+          f"hit rate {stats['hit_rate']:.0%}, {stats['stale']} stale, {stats['saved_calls']} calls saved")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Writer buddy micro-benchmarks")
+    sub = parser.add_subparsers(dest="command")
+
+    parser_font = sub.add_parser("fontcache", help="Cold lxml font parse vs compiled cache hits")
+    parser_font.add_argument("--font", "-f", default=DEFAULT_FONT, help="SVG font file")
+    parser_font.add_argument("--repeat", "-n", type=int, default=50, help="Calls per measurement")
+    parser_font.set_defaults(func=bench_fontcache)
+
+    parser_wrap = sub.add_parser("wrap", help="Legacy vs vectorized line wrapping, with an equivalence check")
+    parser_wrap.add_argument("--font", "-f", default=DEFAULT_FONT, help="SVG font file")
+    parser_wrap.add_argument("--words", "-w", type=int, default=20000, help="Words in the large document")
+    parser_wrap.add_argument("--seed", type=int, default=1, help="Random corpus seed")
+    parser_wrap.set_defaults(func=bench_wrap)
+
+    parser_lines = sub.add_parser("lines", help="Per-utterance line breaking cost and emitted line count")
+    parser_lines.add_argument("--font", "-f", default=DEFAULT_FONT, help="SVG font file")
+    parser_lines.add_argument("--repeat", "-n", type=int, default=500, help="Passes over the corpus")
+    parser_lines.set_defaults(func=bench_lines)
+
+    parser_outlines = sub.add_parser("outlines", help="Per-glyph transform formatting vs pre-scaled outline placement")
+    parser_outlines.add_argument("--font", "-f", default=DEFAULT_FONT, help="SVG font file")
+    parser_outlines.add_argument("--repeat", "-n", type=int, default=50, help="Pages per measurement")
+    parser_outlines.set_defaults(func=bench_outlines)
+
+    parser_store = sub.add_parser("fontstore", help="Per-worker font load time and private memory: lxml vs mmap store")
+    parser_store.add_argument("--font", "-f", default=DEFAULT_FONT, help="SVG font file")
+    parser_store.add_argument("--workers", "-w", default="1,2,4,8", help="Comma-separated worker counts")
+    parser_store.set_defaults(func=bench_fontstore)
+
+    parser_modes = sub.add_parser("svgmodes", help="File size, write time and Inkscape load time per output mode")
+    parser_modes.add_argument("--font", "-f", default=DEFAULT_FONT, help="SVG font file")
+    parser_modes.add_argument("--repeat", "-n", type=int, default=10, help="Writes per measurement")
+    parser_modes.add_argument("--inkscape", action="store_true", help="Also time `inkscape --query-all` per file")
+    parser_modes.set_defaults(func=bench_svgmodes)
+
+    parser_stream = sub.add_parser("svgstream", help="svgwrite DOM vs streaming writer: time, peak memory, byte equality")
+    parser_stream.add_argument("--font", "-f", default=DEFAULT_FONT, help="SVG font file")
+    parser_stream.add_argument("--glyphs", "-g", default="100,10000,100000", help="Comma-separated glyph counts")
+    parser_stream.add_argument("--mode", "-m", default="glyph", help="Output mode to write")
+    parser_stream.set_defaults(func=bench_svgstream)
+
+    parser_size = sub.add_parser("svgsize", help="Bytes per page and write time: full precision vs compact vs svgz")
+    parser_size.add_argument("--font", "-f", default=DEFAULT_FONT, help="SVG font file")
+    parser_size.add_argument("--repeat", "-n", type=int, default=10, help="Writes per measurement")
+    parser_size.add_argument("--inkscape", action="store_true", help="Also time `inkscape --query-all` per file")
+    parser_size.set_defaults(func=bench_svgsize)
+
+    parser_travel = sub.add_parser("travel", help="Pen-up travel per page before and after stroke reordering")
+    parser_travel.add_argument("--font", "-f", default=DEFAULT_FONT, help="SVG font file")
+    parser_travel.add_argument("--passes", "-p", default="0,1,2,4,all",
+                               help="Comma-separated 2-opt pass caps ('all': until no gain)")
+    parser_travel.set_defaults(func=bench_travel)
+
+    parser_merge = sub.add_parser("merge", help="Pen lifts removed by stroke merging per tolerance")
+    parser_merge.add_argument("--font", "-f", default=DEFAULT_FONT, help="SVG font file")
+    parser_merge.add_argument("--tolerances", "-t", default="0.05,0.25,0.5,1", help="Comma-separated tolerances (mm)")
+    parser_merge.set_defaults(func=bench_merge)
+
+    parser_quality = sub.add_parser("quality", help="Vertex count and estimated plot time per plot quality")
+    parser_quality.add_argument("--font", "-f", default=DEFAULT_FONT, help="SVG font file")
+    parser_quality.set_defaults(func=bench_quality)
+
+    parser_estimate = sub.add_parser("estimate", help="Plot-time estimator cost from strokes and from written SVGs")
+    parser_estimate.add_argument("--font", "-f", default=DEFAULT_FONT, help="SVG font file")
+    parser_estimate.add_argument("--repeat", "-n", type=int, default=20, help="Calls per measurement")
+    parser_estimate.set_defaults(func=bench_estimate)
+
+    parser_preview = sub.add_parser("preview", help="Raster preview, overprint check and golden compare per page")
+    parser_preview.add_argument("--font", "-f", default=DEFAULT_FONT, help="SVG font file")
+    parser_preview.add_argument("--repeat", "-n", type=int, default=10, help="Calls per measurement")
+    parser_preview.add_argument("--dpmm", "-d", default="2,4,8", help="Comma-separated preview resolutions (px/mm)")
+    parser_preview.set_defaults(func=bench_preview)
+
+    parser_pipeline = sub.add_parser("pipeline", help="Estimate and preview from the in-memory StrokePage vs the SVG")
+    parser_pipeline.add_argument("--font", "-f", default=DEFAULT_FONT, help="SVG font file")
+    parser_pipeline.add_argument("--repeat", "-n", type=int, default=10, help="Calls per measurement")
+    parser_pipeline.set_defaults(func=bench_pipeline)
+
+    parser_plotter = sub.add_parser("plotter", help="AxiDraw backend on a fake device: cost and moves vs estimate")
+    parser_plotter.add_argument("--font", "-f", default=DEFAULT_FONT, help="SVG font file")
+    parser_plotter.add_argument("--repeat", "-n", type=int, default=5, help="Plots per measurement")
+    parser_plotter.set_defaults(func=bench_plotter)
+
+    parser_inkscape = sub.add_parser("inkscape", help="Per-job latency with a new vs a reused Inkscape (desktop only)")
+    parser_inkscape.add_argument("--font", "-f", default=DEFAULT_FONT, help="SVG font file")
+    parser_inkscape.add_argument("--jobs", "-j", type=int, default=3, help="Jobs per measurement")
+    parser_inkscape.set_defaults(func=bench_inkscape)
+
+    parser_atspi = sub.add_parser("atspi", help="Nodes, calls and time per widget lookup: recursion vs pruned search vs cached path")
+    parser_atspi.add_argument("--jobs", "-j", type=int, default=5, help="Plot jobs to simulate")
+    parser_atspi.add_argument("--menus", type=int, default=12, help="Menus in the synthetic menu bar")
+    parser_atspi.add_argument("--items", type=int, default=25, help="Items per menu")
+    parser_atspi.add_argument("--widgets", type=int, default=40, help="Widgets per panel or dialog tab")
+    parser_atspi.add_argument("--repeat", "-n", type=int, default=20, help="Searches per measurement")
+    parser_atspi.set_defaults(func=bench_atspi)
+
+    args = parser.parse_args()
+    if args.command is None:
+        parser.print_help()
+        return
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,23 @@
 import svgwrite
-from lxml import etree
 import json
 import os
-
-SVG_NS = "http://www.w3.org/2000/svg"
+import re
+import time
+
+import numpy as np
+
+import font_registry
+import outline_cache
+import pagination
+import path_encoding
+import pen_travel
+import plot_time
+import preview
+import simplify
+import stroke_merge
+import stroke_page
+import svg_stream
+import text_layout
 
 # --- FILES ---
 FONT_PATH = "/home/pi/Desktop/writerbuddy/EMSDelight.svg"
@@ -23,29 +37,63 @@ LINE_SPACING = 1.4
 START_X = MARGIN
 START_Y = MARGIN + TEXT_HEIGHT_MM
 
+# --- OUTPUT SETUP ---
+# "glyph": one <path> per character with a matrix() transform (original output)
+# "line":  one <path> per line run, coordinates baked in page mm
+# "word":  one <path> per word, coordinates baked in page mm
+# "symbol": each used glyph once in <defs>, characters placed with <use>
+OUTPUT_MODE = "glyph"
+OUTPUT_MODES = ("glyph", "line", "word", "symbol")
+# Write symbol pages as plain paths, as svg_symbols.flatten_symbols would
+# leave them, for plotter setups that ignore clones
+FLATTEN_SYMBOLS = False
+COORD_DECIMALS = 3
+PEN_WIDTH_MM = 0.5
+GLYPH_STROKE_WIDTH = 0.5 / 25.4
+# Grid (mm) every written coordinate is snapped to; path data becomes compact
+# relative commands. None writes full float precision (the original output).
+COORD_PRECISION_MM = 0.01
+# Write gzip-compressed .svgz pages instead of .svg (Inkscape opens both)
+SVGZ_OUTPUT = False
+# --- PEN TRAVEL ---
+# Reorder strokes (line/word modes) or whole glyphs (glyph/symbol modes)
+# before writing, to cut the plotter's pen-up moves
+OPTIMIZE_TRAVEL = True
+# 2-opt passes over a page's strokes. A full page converges in about 7
+# passes of ~0.4 s; the first two take 6750 -> 5860 mm of the 1110 mm the
+# whole run saves. Fixed passes keep the output the same on every run.
+TRAVEL_MAX_PASSES = 2
+# Safety stop only: no page should get near it
+TRAVEL_TIME_LIMIT_S = 5.0
+# Without travel ordering a page is laid out and written this many runs
+# (lines) at a time, so memory stays flat however long the page is
+PIECE_RUNS = 4
+# --- STROKE MERGING ---
+# Strokes whose endpoints are closer than this (mm) are drawn as one, so the
+# pen stays down across the gap. Ends less than a pen width apart already
+# touch on paper, so bridging them changes nothing visible; with the shipped
+# font this saves about 8 lifts per full page (half the pen width saved none).
+# 0 disables merging.
+MERGE_TOLERANCE_MM = PEN_WIDTH_MM
+# --- PLOT QUALITY ---
+# Outline simplification tolerance (mm) per quality; "fine" keeps every vertex
+QUALITY_TOLERANCE_MM = {"draft": 0.15, "normal": 0.05, "fine": 0.0}
+PLOT_QUALITY = "normal"
+# --- SHEET PREVIEW ---
+# Every written fragment is also drawn into a PNG of its sheet, and ink
+# landing on earlier ink beyond this area (mm^2) is reported as overprint
+SHEET_PREVIEW = True
+PREVIEW_DIR = "previews"
+OVERPRINT_MIN_MM2 = 1.0
+
+# "stream": write elements to disk as they are generated (constant memory)
+# "svgwrite": build the svgwrite DOM and serialize it at save()
+SVG_WRITER = "stream"
 
-def load_svg_font(svg_font_path):
-    """Extract glyphs and metrics from SVG font file."""
-    tree = etree.parse(svg_font_path)
-    root = tree.getroot()
-
-    font = root.find(".//{%s}font" % SVG_NS)
-    font_face = root.find(".//{%s}font-face" % SVG_NS)
-
-    units_per_em = float(font_face.get("units-per-em", 1000))
-    ascent = float(font_face.get("ascent", units_per_em))
-    horiz_adv_x_default = float(font.get("horiz-adv-x", units_per_em))
 
-    glyphs = {}
-    for g in root.findall(".//{%s}glyph" % SVG_NS):
-        char = g.get("unicode")
-        path_data = g.get("d")
-        adv = float(g.get("horiz-adv-x", horiz_adv_x_default))
-
-        if char and path_data:
-            glyphs[char] = (path_data, adv)
-
-    return glyphs, units_per_em, ascent
+def load_svg_font(svg_font_path):
+    """Extract glyphs and metrics from SVG font file (resident after first load)."""
+    return font_registry.get_font(svg_font_path)
 
 
 def load_state():
@@ -67,108 +115,590 @@ def save_state(current_y):
 
 
 def reset_state():
-    """Reset the Y position to the start."""
+    """Reset the Y position to the start of page 1 and clear the page index and sheet previews."""
     save_state(START_Y)
+    pagination.reset_page_index()
+    preview.clear_sheets(PREVIEW_DIR)
 
 
 def wrap_text_to_width(text, glyphs, units_per_em, text_height_mm, max_width):
     """Wrap text to fit within max_width, breaking at word boundaries."""
-    scale = text_height_mm / units_per_em
-    space_width = text_height_mm * 0.6
-    
-    words = text.split()
-    lines = []
-    current_line = ""
-    current_width = 0
-    
-    for word in words:
-        word_width = 0
-        for char in word:
-            if char in glyphs:
-                adv = glyphs[char][1]
-                word_width += adv * scale
-        
-        if current_line:
-            word_width += space_width
-        
-        if current_width + word_width <= max_width:
-            if current_line:
-                current_line += " " + word
-                current_width += space_width
-            else:
-                current_line = word
-            current_width += word_width - (space_width if current_line != word else 0)
-        else:
-            if current_line:
-                lines.append(current_line)
-            current_line = word
-            current_width = word_width - space_width if word_width > space_width else word_width
-    
-    if current_line:
-        lines.append(current_line)
-    
-    return lines
-
-
-def text_to_svg(lines, output_file=OUTPUT_SVG):
-    """Convert text lines to SVG using font glyphs."""
-    glyphs, units_per_em, ascent = load_svg_font(FONT_PATH)
+    table = text_layout.advance_table(glyphs, units_per_em, text_height_mm)
+    return text_layout.wrap_words(text, table, max_width)
 
-    scale = TEXT_HEIGHT_MM / units_per_em
-    stroke_width_in = 0.5 / 25.4
 
-    dwg = svgwrite.Drawing(
-        output_file,
-        size=(f"{PAGE_WIDTH}mm", f"{PAGE_HEIGHT}mm"),
-        viewBox=f"0 0 {PAGE_WIDTH} {PAGE_HEIGHT}",
-        profile="tiny",
-    )
+def split_text_to_lines(text, max_width=None):
+    """Break text into lines that fit MAX_LINE_WIDTH with the current font."""
+    glyphs, units_per_em, ascent = load_svg_font(FONT_PATH)
+    if max_width is None:
+        max_width = MAX_LINE_WIDTH
+    return wrap_text_to_width(text, glyphs, units_per_em, TEXT_HEIGHT_MM, max_width)
+
+
+def output_path(output_file):
+    """output_file with the extension the current SVGZ_OUTPUT setting writes."""
+    stem, ext = os.path.splitext(output_file)
+    return stem + (".svgz" if SVGZ_OUTPUT else (ext if ext != ".svgz" else ".svg"))
+
+
+def new_drawing(output_file, writer=None):
+    """A4 drawing plus the shared stroke group that glyph paths go into."""
+    options = {
+        "size": (f"{PAGE_WIDTH}mm", f"{PAGE_HEIGHT}mm"),
+        "viewBox": f"0 0 {PAGE_WIDTH} {PAGE_HEIGHT}",
+        "profile": "tiny",
+    }
+    compress = output_file.endswith(".svgz")
+    if (writer or SVG_WRITER) == "stream":
+        dwg = svg_stream.StreamingDrawing(output_file, compress=compress, **options)
+    elif compress:
+        raise ValueError("svgz output needs the streaming writer")
+    else:
+        # svgwrite's validator rejects compact path data ("m54 249 119-32"), which is valid SVG
+        dwg = svgwrite.Drawing(output_file, debug=False, **options)
 
     main_g = dwg.g(id="text_group", fill="none", stroke="black", stroke_linecap="round", stroke_linejoin="round")
+    return dwg, main_g
 
-    wrapped_lines = []
-    for line in lines:
-        wrapped_lines.extend(wrap_text_to_width(line, glyphs, units_per_em, TEXT_HEIGHT_MM, MAX_LINE_WIDTH))
-
-    y = load_state()
-    final_y = y
-
-    for line in wrapped_lines:
-        x = START_X
-
-        for char in line:
-            if char == " ":
-                x += TEXT_HEIGHT_MM * 0.6
-                continue
-
-            if char not in glyphs:
-                continue
 
-            path_data, adv = glyphs[char]
+def draw_glyphs(dwg, group, chars, origins, glyphs, units_per_em, ascent, precision=None, paths=None):
+    """
+    Add one path per placed glyph, each char at its (x, y) top-left origin.
 
-            matrix_a = scale
-            matrix_d = -scale
-            matrix_e = x
-            matrix_f = y + (ascent * scale)
-
-            main_g.add(
+    With a precision (mm), path data is compacted and the placement snapped
+    to that grid; the stroke width is then left to the group. Glyphs in
+    `paths` (see glyph_paths) are drawn from that path data instead of the
+    font's own.
+    """
+    scale = TEXT_HEIGHT_MM / units_per_em
+    stroke_width_in = GLYPH_STROKE_WIDTH
+    if precision:
+        font_step = path_encoding.font_units_step(precision, scale)
+        decimals = path_encoding.step_decimals(precision)
+        scale_text = path_encoding.format_number(scale, 12)
+        flip_text = path_encoding.format_number(-scale, 12)
+        compact = {}
+
+    for char, (x, y) in zip(chars, origins):
+        path_data = paths[char] if paths and char in paths else glyphs[char].d
+
+        matrix_a = scale
+        matrix_d = -scale
+        matrix_e = x
+        matrix_f = y + (ascent * scale)
+
+        if precision:
+            e = path_encoding.format_number(path_encoding.quantize(matrix_e, precision), decimals)
+            f = path_encoding.format_number(path_encoding.quantize(matrix_f, precision), decimals)
+            if char not in compact:
+                compact[char] = path_encoding.compact_path_data(path_data, font_step)
+            group.add(
                 dwg.path(
-                    d=path_data,
-                    stroke_width=stroke_width_in,
-                    transform=f"matrix({matrix_a} 0 0 {matrix_d} {matrix_e} {matrix_f})",
+                    d=compact[char],
+                    transform=f"matrix({scale_text} 0 0 {flip_text} {e} {f})",
                 )
             )
+            continue
+
+        group.add(
+            dwg.path(
+                d=path_data,
+                stroke_width=stroke_width_in,
+                transform=f"matrix({matrix_a} 0 0 {matrix_d} {matrix_e} {matrix_f})",
+            )
+        )
+
+
+def split_runs_into_words(runs, table):
+    """Break (text, x, y, ...) runs into one run per word at its measured x."""
+    out = []
+    for run in runs:
+        text, x, y = run[0], run[1], run[2]
+        if not text:
+            continue
+        ends = np.cumsum(table.adv_mm[table.indices(text)]).tolist()
+        for m in re.finditer(r"\S+", text):
+            start = m.start()
+            out.append((m.group(), x + (ends[start - 1] if start else 0.0), y) + tuple(run[3:]))
+    return out
+
+
+def split_runs_into_glyphs(runs, table):
+    """Break (text, x, y, ...) runs into one run per non-space character at its x."""
+    out = []
+    for run in runs:
+        text, x, y = run[0], run[1], run[2]
+        if not text:
+            continue
+        adv = table.adv_mm[table.indices(text)]
+        starts = (np.cumsum(adv) - adv + x).tolist()
+        for char, gx in zip(text, starts):
+            if char != " ":
+                out.append((char, gx, y) + tuple(run[3:]))
+    return out
+
+
+def merged_outlines(glyphs, units_per_em):
+    """Glyphs whose strokes join within MERGE_TOLERANCE_MM, cached per font."""
+    return stroke_merge.merged_glyphs(glyphs, MERGE_TOLERANCE_MM * units_per_em / TEXT_HEIGHT_MM)
+
+
+def glyph_paths(glyphs, units_per_em, quality=None):
+    """
+    {char: d} in font units for every glyph with strokes, as glyph and symbol pages draw it.
+
+    Written from the strokes StrokePages are laid out from (merged within
+    MERGE_TOLERANCE_MM, simplified at the quality's tolerance, curves
+    flattened by parse_path), so the SVG and the preview, estimator and
+    plot backends see one geometry. Cached with the font.
+    """
+    cache = font_registry.derived(glyphs)
+    key = ("paths", units_per_em, MERGE_TOLERANCE_MM, quality_tolerance(quality))
+    if key not in cache:
+        units_per_mm = units_per_em / TEXT_HEIGHT_MM
+        merged = merged_outlines(glyphs, units_per_em)
+        simplified = simplify.simplified_glyphs(glyphs, quality_tolerance(quality) * units_per_mm, merged)
+        processed = {**merged, **simplified}
+        cache[key] = {
+            char: processed[char][3] if char in processed else stroke_merge.polyline_path_data(g.points, g.offsets)
+            for char, g in glyphs.items()
+            if len(g.points)
+        }
+    return cache[key]
+
+
+def quality_tolerance(quality=None):
+    """Simplification tolerance (mm) for a plot quality (default PLOT_QUALITY)."""
+    quality = quality or PLOT_QUALITY
+    if quality not in QUALITY_TOLERANCE_MM:
+        raise ValueError(f"Unknown plot quality: {quality}")
+    return QUALITY_TOLERANCE_MM[quality]
+
+
+def page_outlines(quality=None):
+    """ScaledOutlines at the writer's size, merge tolerance and plot quality."""
+    return outline_cache.get_outlines(FONT_PATH, TEXT_HEIGHT_MM, MERGE_TOLERANCE_MM, quality_tolerance(quality))
+
+
+def report_plot(estimate, quality=None):
+    print(f"[QUALITY] {quality or PLOT_QUALITY}: {estimate['vertices']} vertices, "
+          f"{estimate['strokes']} strokes, estimated plot {estimate['time_s']:.0f} s")
+    return estimate
+
+
+def report_merge(in_glyphs, on_page):
+    print(f"[MERGE] removed {in_glyphs + on_page} pen lifts "
+          f"({in_glyphs} inside glyphs, {on_page} between strokes on the page)")
+
+
+def report_travel(unit, before, after, seconds):
+    saved = 100.0 * (before - after) / before if before else 0.0
+    print(f"[TRAVEL] pen-up {before:.0f} mm -> {after:.0f} mm ({saved:.1f}% less, "
+          f"{unit} order, {seconds * 1000:.0f} ms)")
+
+
+def order_glyphs_for_travel(runs, quality=None):
+    """
+    Per-character runs in an order that cuts pen-up travel between glyphs.
+
+    Glyphs are drawn whole, in the font's stroke order, so only the moves
+    between them change.
+    """
+    t0 = time.perf_counter()
+    outlines = page_outlines(quality)
+    char_runs = split_runs_into_glyphs(runs, outlines.table)
+    points, offsets, glyph_strokes, run_glyphs = outlines.place_runs(char_runs)
+
+    drawn = run_glyphs[1:] > run_glyphs[:-1]
+    first = glyph_strokes[run_glyphs[:-1][drawn]]
+    last = glyph_strokes[run_glyphs[1:][drawn]]
+    starts = points[offsets[first]]
+    ends = points[offsets[last] - 1]
+
+    order, _ = pen_travel.optimize_order(starts, ends, False)
+    # Moves inside each glyph are unchanged, so the saving is all between glyphs
+    total = pen_travel.travel_distance(*pen_travel.stroke_endpoints(points, offsets))
+    saved = pen_travel.travel_distance(starts, ends) - pen_travel.travel_distance(starts, ends, order)
+    report_travel("glyph", total, total - saved, time.perf_counter() - t0)
+
+    drawable = [run for run, d in zip(char_runs, drawn.tolist()) if d]
+    return [drawable[i] for i in order.tolist()]
+
+
+def path_data(points, offsets, start, end):
+    """Absolute M/L path data for strokes start..end-1 of a placed stroke array."""
+    parts = []
+    for i in range(start, end):
+        coords = points[offsets[i]:offsets[i + 1]].tolist()
+        parts.append("M " + " L ".join(f"{x:.{COORD_DECIMALS}f} {y:.{COORD_DECIMALS}f}" for x, y in coords))
+    return " ".join(parts)
+
+
+def glyph_page(runs, page, mode, quality=None):
+    """
+    StrokePage drawing every glyph of the runs whole, one group per glyph.
+
+    Returns (page, lifts merged inside glyphs, lifts joined on the page).
+    """
+    outlines = page_outlines(quality)
+    if OPTIMIZE_TRAVEL:
+        char_runs = order_glyphs_for_travel(runs, quality)
+    else:
+        char_runs = split_runs_into_glyphs(runs, outlines.table)
+    points, offsets, glyph_strokes, run_glyphs = outlines.place_runs(char_runs)
+    # Characters without strokes place no glyph
+    drawn = run_glyphs[1:] > run_glyphs[:-1]
+    char_runs = [run for run, d in zip(char_runs, drawn.tolist()) if d]
+
+    groups = np.repeat(np.arange(len(char_runs)), np.diff(glyph_strokes))
+    strokes = stroke_page.StrokePage(page, (PAGE_WIDTH, PAGE_HEIGHT), mode, quality, points, offsets, groups,
+                                     [run[0] for run in char_runs], [(run[1], run[2]) for run in char_runs])
+    return strokes, outlines.merged_lifts(runs), 0
+
+
+def baked_page(runs, page, mode, quality=None):
+    """
+    StrokePage with one group per run ("line") or per word ("word"), strokes in page coordinates.
+
+    Returns (page, lifts merged inside glyphs, lifts joined on the page).
+    """
+    outlines = page_outlines(quality)
+    if mode == "word":
+        runs = split_runs_into_words(runs, outlines.table)
+
+    points, offsets, glyph_strokes, run_glyphs = outlines.place_runs(runs)
+    stroke_run = np.repeat(np.arange(len(runs)), np.diff(glyph_strokes[run_glyphs]))
+
+    if OPTIMIZE_TRAVEL and len(stroke_run) > 1:
+        # Reorder across runs; consecutive strokes of one run still share a path
+        t0 = time.perf_counter()
+        points, offsets, stroke_run, before, after = pen_travel.optimize_strokes(
+            points, offsets, stroke_run, TRAVEL_MAX_PASSES, TRAVEL_TIME_LIMIT_S
+        )
+        report_travel("stroke", before, after, time.perf_counter() - t0)
+
+    joined = 0
+    if MERGE_TOLERANCE_MM > 0:
+        starts, ends = pen_travel.stroke_endpoints(points, offsets)
+        offsets, stroke_run, joined = stroke_merge.join_consecutive(
+            offsets, starts, ends, MERGE_TOLERANCE_MM, stroke_run
+        )
+
+    # A run split up by reordering becomes several groups
+    groups = np.zeros(len(stroke_run), dtype=np.intp)
+    if len(stroke_run) > 1:
+        np.cumsum(np.diff(stroke_run) != 0, out=groups[1:])
+    strokes = stroke_page.StrokePage(page, (PAGE_WIDTH, PAGE_HEIGHT), mode, quality, points, offsets, groups)
+    return strokes, outlines.merged_lifts(runs), joined
+
+
+def check_layout_options(mode=None, quality=None):
+    """(mode, quality) with defaults filled in; raises ValueError on unknown ones."""
+    mode = mode or OUTPUT_MODE
+    if mode not in OUTPUT_MODES:
+        raise ValueError(f"Unknown output mode: {mode}")
+    quality = quality or PLOT_QUALITY
+    quality_tolerance(quality)  # raises on an unknown quality
+    return mode, quality
+
+
+def layout_strokes(runs, page=1, mode=None, quality=None):
+    """
+    Lay out one page of (text, x, y, ...) runs as a StrokePage for an output mode.
+
+    Glyphs are merged and simplified at the plot quality and the strokes
+    put in travel-optimized order; the page is then ready for the SVG
+    writer (draw_strokes), the preview, the estimator or a plot backend.
+    """
+    mode, quality = check_layout_options(mode, quality)
+    make_page = glyph_page if mode in ("glyph", "symbol") else baked_page
+    strokes, in_glyphs, on_page = make_page(runs, page, mode, quality)
+    if MERGE_TOLERANCE_MM > 0:
+        report_merge(in_glyphs, on_page)
+    return strokes
+
+
+def layout_pieces(runs, page=1, mode=None, quality=None):
+    """
+    Yield StrokePages that together lay out one page of runs, in plotting order.
+
+    Travel ordering needs every stroke of the page, so with OPTIMIZE_TRAVEL
+    the page is a single piece; without it every run is laid out on its
+    own, so only one line's strokes are held while writing.
+    """
+    mode, quality = check_layout_options(mode, quality)
+    make_page = glyph_page if mode in ("glyph", "symbol") else baked_page
+    step = len(runs) if OPTIMIZE_TRAVEL else PIECE_RUNS
+    chunks = [runs[i:i + step] for i in range(0, len(runs), max(step, 1))]
+    in_glyphs = on_page = 0
+    for chunk in chunks:
+        strokes, merged, joined = make_page(chunk, page, mode, quality)
+        in_glyphs += merged
+        on_page += joined
+        yield strokes
+    if MERGE_TOLERANCE_MM > 0:
+        report_merge(in_glyphs, on_page)
+
+
+def draw_baked(dwg, group, strokes, precision=None):
+    """Add one path per group of a line/word StrokePage, in page coordinates."""
+    ranges = stroke_page.group_ranges(strokes)
+    if precision and ranges:
+        for d in path_encoding.relative_paths(strokes.points, strokes.offsets, ranges, precision):
+            group.add(dwg.path(d=d))
+        return
+    for a, b in ranges:
+        group.add(dwg.path(d=path_data(strokes.points, strokes.offsets, a, b)))
+
+
+def symbol_id(char):
+    """<defs> id of a glyph symbol."""
+    return f"g{ord(char):x}"
+
+
+def define_symbols(dwg, chars, precision=None, paths=None):
+    """Add one <defs> path per character, in font units scaled to the text height."""
+    glyphs, units_per_em, ascent = load_svg_font(FONT_PATH)
+    scale = TEXT_HEIGHT_MM / units_per_em
+    if precision:
+        font_step = path_encoding.font_units_step(precision, scale)
+        scale_text = path_encoding.format_number(scale, 12)
+        flip_text = path_encoding.format_number(-scale, 12)
+        rise_text = path_encoding.format_number(ascent * scale, 12)
+    else:
+        scale_text, flip_text, rise_text = scale, -scale, ascent * scale
+
+    for char in sorted(set(chars)):
+        d = paths[char] if paths and char in paths else glyphs[char].d
+        dwg.defs.add(dwg.path(
+            id=symbol_id(char),
+            d=path_encoding.compact_path_data(d, font_step) if precision else d,
+            transform=f"matrix({scale_text} 0 0 {flip_text} 0 {rise_text})",
+        ))
+
+
+def place_symbols(dwg, group, chars, origins, precision=None):
+    """Place every character with a <use> of its symbol (see define_symbols)."""
+    if precision:
+        decimals = path_encoding.step_decimals(precision)
+
+        def number(v):
+            return path_encoding.format_number(path_encoding.quantize(v, precision), decimals)
+    else:
+        number = str
+
+    for char, (x, y) in zip(chars, origins):
+        group.add(dwg.use(f"#{symbol_id(char)}", transform=f"translate({number(x)} {number(y)})"))
+
+
+def draw_symbols(dwg, group, chars, origins, precision=None, paths=None):
+    """Define each glyph placed once, then place every character with <use>."""
+    define_symbols(dwg, chars, precision, paths)
+    place_symbols(dwg, group, chars, origins, precision)
+
+
+def writes_symbols(mode):
+    """Whether a page in this mode is written with <defs>/<use> (FLATTEN_SYMBOLS writes plain paths)."""
+    return mode == "symbol" and not FLATTEN_SYMBOLS
+
+
+def start_page(dwg, group, mode, quality, chars=(), precision=None):
+    """
+    Set up a drawing for a page's StrokePages; returns the glyph path data to draw with.
+
+    Puts the stroke width on the group and, for symbol pages, defines every
+    character in `chars` once, so both happen before the first element.
+    """
+    if mode in ("line", "word"):
+        group.update({"stroke_width": PEN_WIDTH_MM})
+        return None
+    glyphs, units_per_em, _ = load_svg_font(FONT_PATH)
+    paths = glyph_paths(glyphs, units_per_em, quality)
+    if writes_symbols(mode):
+        define_symbols(dwg, chars, precision, paths)
+        group.update({"stroke_width": GLYPH_STROKE_WIDTH})
+    elif precision:
+        # One width on the group instead of a copy on every glyph path
+        group.update({"stroke_width": GLYPH_STROKE_WIDTH})
+    return paths
+
+
+def draw_piece(dwg, group, strokes, precision, paths=None):
+    """Write a StrokePage (a page or part of one) into a group set up by start_page()."""
+    if strokes.mode in ("line", "word"):
+        draw_baked(dwg, group, strokes, precision)
+    elif writes_symbols(strokes.mode):
+        place_symbols(dwg, group, strokes.chars, strokes.origins, precision)
+    else:
+        glyphs, units_per_em, ascent = load_svg_font(FONT_PATH)
+        draw_glyphs(dwg, group, strokes.chars, strokes.origins, glyphs, units_per_em, ascent, precision, paths)
+
+
+def draw_strokes(dwg, group, strokes, precision=None):
+    """
+    Write a StrokePage into group in the output mode it was laid out for.
+
+    `precision` defaults to COORD_PRECISION_MM; pass 0 for full precision.
+    Glyph and symbol pages reference per-glyph path data written from the
+    page's own strokes (see glyph_paths), line and word pages write the
+    strokes themselves.
+    """
+    precision = COORD_PRECISION_MM if precision is None else precision
+    paths = start_page(dwg, group, strokes.mode, strokes.quality, strokes.chars, precision)
+    draw_piece(dwg, group, strokes, precision, paths)
+
+
+def drawn_chars(runs, quality=None):
+    """Distinct characters of runs that have strokes, i.e. the symbols a page needs."""
+    outlines = page_outlines(quality)
+    chars = set("".join(run[0] for run in runs))
+    return sorted(c for c in chars if outlines.slot_of[min(ord(c), outlines.table.missing)] >= 0)
+
+
+def draw_runs(dwg, group, runs, mode=None, precision=None, quality=None, page=1, on_piece=None):
+    """
+    Lay out (text, x, y, ...) runs and draw them into group piece by piece; see layout_pieces().
+
+    The plot estimate is summed over the pieces as they are written and
+    `on_piece(strokes)`, if given, sees every piece (e.g. for the sheet
+    preview). Returns the page's plot estimate (see plot_time.estimate_strokes).
+    """
+    mode, quality = check_layout_options(mode, quality)
+    precision = COORD_PRECISION_MM if precision is None else precision
+    chars = drawn_chars(runs, quality) if writes_symbols(mode) else ()
+    paths = start_page(dwg, group, mode, quality, chars, precision)
+
+    estimate = None
+    origin = pen_travel.ORIGIN
+    for strokes in layout_pieces(runs, page, mode, quality):
+        draw_piece(dwg, group, strokes, precision, paths)
+        estimate = plot_time.add_estimates(estimate, plot_time.estimate_page(strokes, origin=origin))
+        if len(strokes.points):
+            origin = strokes.points[-1]
+        if on_piece:
+            on_piece(strokes)
+    if estimate is None:
+        estimate = plot_time.estimate_strokes(np.zeros((0, 2)), np.zeros(1, dtype=np.intp))
+    return report_plot(estimate, quality)
+
+
+def text_to_svg(lines, output_file=OUTPUT_SVG, mode=None, quality=None):
+    """
+    Convert text lines to SVG using font glyphs.
+
+    Every line starts fresh and is wrapped to MAX_LINE_WIDTH. Returns the
+    PageFragments written, one SVG per page the text lands on. `mode` is
+    one of OUTPUT_MODES (default OUTPUT_MODE), `quality` one of
+    "draft", "normal" and "fine" (default PLOT_QUALITY).
+    """
+    layout = load_line_layout()
+
+    runs = []
+    for line in lines:
+        layout.close_line()
+        runs.extend(layout.add_text(line))
+    layout.close_line()
+
+    return write_runs(layout, runs, output_file, mode, quality)
+
+
+def write_runs(layout, runs, output_file=OUTPUT_SVG, mode=None, quality=None):
+    """
+    Draw (text, x, y, page) runs into one SVG per page and save the layout state.
+
+    Pages are written one at a time and their strokes are not kept, so
+    memory does not grow with the job; plot backends read the written file.
+    """
+    output_file = output_path(output_file)
+    groups = pagination.group_runs_by_page(runs)
+    if not groups:
+        dwg, main_g = new_drawing(output_file)
+        dwg.add(main_g)
+        dwg.save()
+
+    # A job that starts past the page the last job ended on needs a fresh sheet first
+    previous_page = pagination.last_page()
+    fragments = []
+    for i, (page, page_runs) in enumerate(groups):
+        path = pagination.fragment_path(output_file, page, i == 0)
+        sheet = SheetPreview() if SHEET_PREVIEW else None
+
+        dwg, main_g = new_drawing(path)
+        estimate = draw_runs(dwg, main_g, page_runs, mode, None, quality, page, sheet)
+        dwg.add(main_g)
+        dwg.save()
+        print(f"Saved SVG as: {path} (page {page})")
+        if sheet is not None:
+            sheet.save(page, path)
+
+        fragments.append(pagination.PageFragment(
+            page, path, len({run[2] for run in page_runs}), i < len(groups) - 1, round(estimate["time_s"], 1),
+            None, i == 0 and previous_page is not None and page != previous_page,
+        ))
+
+    save_layout_state(layout)
+    pagination.record_fragments(fragments)
+    return fragments
+
+
+class SheetPreview:
+    """Collects a fragment's StrokePage pieces into one preview image (an on_piece callback)."""
+
+    def __init__(self):
+        self.image = None
+
+    def __call__(self, strokes):
+        self.image = preview.render_page(strokes, image=self.image)
+
+    def save(self, page, path):
+        """Draw the fragment into its sheet preview and warn about overprinting."""
+        if self.image is None:
+            return
+        os.makedirs(PREVIEW_DIR, exist_ok=True)
+        sheet = preview.sheet_path(PREVIEW_DIR, page)
+        overlap = preview.add_to_sheet(self.image, sheet)
+        if overlap > OVERPRINT_MIN_MM2:
+            print(f"[PREVIEW] {path} overprints {overlap:.1f} mm^2 of earlier ink on page {page}: {sheet}")
+
+
+def load_line_layout():
+    """Create a LineLayout for the current font, restored from the state file."""
+    glyphs, units_per_em, ascent = load_svg_font(FONT_PATH)
+    table = text_layout.advance_table(glyphs, units_per_em, TEXT_HEIGHT_MM)
+
+    layout = text_layout.LineLayout(
+        table,
+        START_X,
+        START_Y,
+        MAX_LINE_WIDTH,
+        TEXT_HEIGHT_MM * LINE_SPACING,
+        PAGE_HEIGHT - MARGIN,
+    )
+    layout.restore(load_layout_state())
+    return layout
+
+
+def load_layout_state():
+    """Load the full layout state (open line cursor included) from state file."""
+    if os.path.exists(STATE_FILE):
+        try:
+            with open(STATE_FILE, 'r') as f:
+                return json.load(f)
+        except:
+            return {}
+    return {}
 
-            x += adv * scale
 
-        y += TEXT_HEIGHT_MM * LINE_SPACING
-        final_y = y
+def save_layout_state(layout):
+    """Save a LineLayout's state to the state file."""
+    with open(STATE_FILE, 'w') as f:
+        json.dump(layout.state(), f, separators=(",", ":"))
 
-        if y > PAGE_HEIGHT - MARGIN:
-            y = START_Y
 
-    save_state(final_y)
+def append_text_to_svg(layout, text, output_file=OUTPUT_SVG, mode=None, quality=None):
+    """
+    Continue text on the layout's open line and write only the new words.
 
-    dwg.add(main_g)
-    dwg.save()
-    print(f"Saved SVG as: {output_file}")
+    Returns the PageFragments written, like text_to_svg().
+    """
+    return write_runs(layout, layout.add_text(text), output_file, mode, quality)
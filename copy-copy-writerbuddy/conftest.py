@@ -0,0 +1,50 @@
+import os
+
+import pytest
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Two lines of text as (text, x, y, page) layout runs
+TWO_LINES = [("The quick brown fox", 15.0, 21.0, 1), ("jumps over the lazy dog.", 15.0, 29.4, 1)]
+
+
+def pytest_addoption(parser):
+    parser.addoption("--regenerate-golden", action="store_true",
+                     help="Rewrite the golden preview images from the current output")
+
+
+@pytest.fixture
+def regenerate_golden(request):
+    """True when the run was asked to rewrite golden images (--regenerate-golden)."""
+    return request.config.getoption("--regenerate-golden")
+
+
+@pytest.fixture(autouse=True)
+def writer_font(monkeypatch, tmp_path_factory):
+    """Point the writer at the font in the repo instead of the Pi's install path, cached in a temp dir."""
+    import cleaned_svgout
+    import font_cache
+
+    monkeypatch.setattr(cleaned_svgout, "FONT_PATH", os.path.join(SCRIPT_DIR, "EMSDelight.svg"))
+    monkeypatch.setattr(font_cache, "CACHE_DIR", str(tmp_path_factory.getbasetemp() / "font_cache"))
+
+
+@pytest.fixture
+def runs():
+    """Layout runs for two lines of text on page 1."""
+    return list(TWO_LINES)
+
+
+@pytest.fixture
+def write_page():
+    """Function writing a StrokePage to an SVG file with the current writer settings."""
+    import cleaned_svgout
+
+    def write(strokes, path, writer=None):
+        dwg, group = cleaned_svgout.new_drawing(str(path), writer)
+        cleaned_svgout.draw_strokes(dwg, group, strokes)
+        dwg.add(group)
+        dwg.save()
+        return str(path)
+
+    return write
@@ -0,0 +1,90 @@
+import hashlib
+import os
+
+import font_store
+from glyph import Glyph
+
+SVG_NS = "http://www.w3.org/2000/svg"
+
+# --- CACHE SETUP ---
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "writerbuddy")
+
+
+def parse_svg_font(svg_font_path):
+    """Extract glyphs and metrics from SVG font file (slow path, uses lxml)."""
+    # lxml is only needed when the cache is cold
+    from lxml import etree
+
+    tree = etree.parse(svg_font_path)
+    root = tree.getroot()
+
+    font = root.find(".//{%s}font" % SVG_NS)
+    font_face = root.find(".//{%s}font-face" % SVG_NS)
+
+    units_per_em = float(font_face.get("units-per-em", 1000))
+    ascent = float(font_face.get("ascent", units_per_em))
+    horiz_adv_x_default = float(font.get("horiz-adv-x", units_per_em))
+
+    glyphs = {}
+    for g in root.findall(".//{%s}glyph" % SVG_NS):
+        char = g.get("unicode")
+        path_data = g.get("d")
+        adv = float(g.get("horiz-adv-x", horiz_adv_x_default))
+
+        if char and path_data:
+            glyphs[char] = Glyph(path_data, adv)
+
+    return glyphs, units_per_em, ascent
+
+
+def font_key(svg_font_path):
+    """Identify a font file by absolute path, mtime and size."""
+    st = os.stat(svg_font_path)
+    return (os.path.abspath(svg_font_path), st.st_mtime_ns, st.st_size)
+
+
+def cache_path_for(svg_font_path, cache_dir=None):
+    """Cache file location for a font (one font store per font path) in cache_dir (default CACHE_DIR)."""
+    cache_dir = cache_dir or CACHE_DIR
+    abs_path = os.path.abspath(svg_font_path)
+    name = os.path.splitext(os.path.basename(abs_path))[0]
+    tag = hashlib.sha1(abs_path.encode("utf-8")).hexdigest()[:10]
+    return os.path.join(cache_dir, f"{name}.{tag}.fontstore")
+
+
+def read_cache(cache_file, key):
+    """Return the cached font if the store at cache_file matches key, else None."""
+    try:
+        store = font_store.FontStore(cache_file)
+    except (OSError, ValueError):
+        return None
+    if (store.mtime_ns, store.size) != key[1:]:
+        return None
+    return store.font()
+
+
+def write_cache(cache_file, key, font):
+    """Atomically write compiled font data to cache_file."""
+    font_store.write_font_store(cache_file, font, key[1], key[2])
+
+
+def load_cached_font(svg_font_path, cache_dir=None):
+    """
+    Load a font through the on-disk cache, a memory-mapped font store.
+
+    A hit costs one stat and one mmap. The cache is rebuilt from the SVG
+    font whenever its path, mtime or size changes, or the file is damaged.
+    """
+    key = font_key(svg_font_path)
+    cache_file = cache_path_for(svg_font_path, cache_dir)
+
+    font = read_cache(cache_file, key)
+    if font is not None:
+        return font
+
+    font = parse_svg_font(svg_font_path)
+    try:
+        write_cache(cache_file, key, font)
+    except OSError as e:
+        print(f"Font cache not written ({e}), continuing without it")
+    return font
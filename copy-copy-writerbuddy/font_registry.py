@@ -0,0 +1,84 @@
+from collections import OrderedDict
+import os
+
+import font_cache
+
+# --- REGISTRY SETUP ---
+MAX_FONTS = 4
+
+_fonts = OrderedDict()
+_max_fonts = MAX_FONTS
+_hits = 0
+_misses = 0
+
+
+def get_font(svg_font_path):
+    """
+    Return (glyphs, units_per_em, ascent) for a font, keeping it resident.
+
+    Fonts are keyed by absolute path and mtime, so an edited font file is
+    loaded again on the next call. Least recently used fonts are evicted
+    once more than the configured limit are held.
+    """
+    global _hits, _misses
+
+    abs_path = os.path.abspath(svg_font_path)
+    key = (abs_path, os.stat(abs_path).st_mtime_ns)
+
+    entry = _fonts.get(key)
+    if entry is not None:
+        _hits += 1
+        _fonts.move_to_end(key)
+        return entry[0]
+
+    _misses += 1
+    font = font_cache.load_cached_font(abs_path)
+
+    # Drop stale entries for the same path before inserting the new one
+    for old_key in [k for k in _fonts if k[0] == abs_path]:
+        del _fonts[old_key]
+
+    _fonts[key] = (font, {})
+    while len(_fonts) > _max_fonts:
+        _fonts.popitem(last=False)
+    return font
+
+
+def derived(glyphs):
+    """
+    Dict for data derived from a resident font's glyph dict, keyed by the caller.
+
+    Merged and simplified outlines and advance tables live
+    here so they are dropped together with the font when it is evicted. For
+    glyphs the registry does not hold, returns a new empty dict each time.
+    """
+    for font, data in _fonts.values():
+        if font[0] is glyphs:
+            return data
+    return {}
+
+
+def set_max_fonts(n):
+    """Change the LRU size limit (at least one font is always kept)."""
+    global _max_fonts
+    _max_fonts = max(1, int(n))
+    while len(_fonts) > _max_fonts:
+        _fonts.popitem(last=False)
+
+
+def stats():
+    """Hit/miss counters and current size, for logging."""
+    return {
+        "hits": _hits,
+        "misses": _misses,
+        "size": len(_fonts),
+        "max_size": _max_fonts,
+    }
+
+
+def clear():
+    """Forget all resident fonts and reset the counters."""
+    global _hits, _misses
+    _fonts.clear()
+    _hits = 0
+    _misses = 0
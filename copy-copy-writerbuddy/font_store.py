@@ -0,0 +1,147 @@
+import mmap
+import os
+import struct
+
+import numpy as np
+
+from glyph import Glyph, pack_glyphs
+
+# --- STORE FORMAT ---
+# Header, then 8-byte aligned sections:
+#   adv f8[n], point_starts i8[n+1], offset_starts i8[n+1], char_starts i8[n+1],
+#   d_starts i8[n+1], points f4[p, 2], offsets i4[o], text (utf-8: every
+#   glyph's unicode string, then every glyph's path data)
+# Plain numbers and text only: loading never runs code from the file.
+MAGIC = b"WBFS"
+STORE_VERSION = 2
+HEADER = struct.Struct("<4sIqqddIIIQ")
+
+_SECTIONS = [
+    ("adv", "<f8"),
+    ("point_starts", "<i8"),
+    ("offset_starts", "<i8"),
+    ("char_starts", "<i8"),
+    ("d_starts", "<i8"),
+    ("points", "<f4"),
+    ("offsets", "<i4"),
+]
+
+
+def _align(n):
+    return (n + 7) & ~7
+
+
+def _starts(chunks, base=0):
+    starts = np.full(len(chunks) + 1, base, dtype=np.int64)
+    np.cumsum([len(c) for c in chunks], out=starts[1:])
+    starts[1:] += base
+    return starts
+
+
+def write_font_store(store_path, font, mtime_ns, size):
+    """Write a parsed font (glyphs, units_per_em, ascent) to a binary store at store_path."""
+    glyphs, units_per_em, ascent = font
+    packed = pack_glyphs(glyphs)
+    char_bytes = [c.encode("utf-8") for c in packed["chars"]]
+    d_bytes = [d.encode("utf-8") for d in packed["d"]]
+    char_starts = _starts(char_bytes)
+    d_starts = _starts(d_bytes, int(char_starts[-1]))
+
+    arrays = {
+        "adv": packed["adv"].astype("<f8"),
+        "point_starts": packed["point_starts"].astype("<i8"),
+        "offset_starts": packed["offset_starts"].astype("<i8"),
+        "char_starts": char_starts.astype("<i8"),
+        "d_starts": d_starts.astype("<i8"),
+        "points": packed["points"].astype("<f4"),
+        "offsets": packed["offsets"].astype("<i4"),
+    }
+
+    header = HEADER.pack(
+        MAGIC, STORE_VERSION, mtime_ns, size, units_per_em, ascent,
+        len(packed["chars"]), len(packed["points"]), len(packed["offsets"]), int(d_starts[-1]),
+    )
+
+    os.makedirs(os.path.dirname(os.path.abspath(store_path)), exist_ok=True)
+    tmp_path = f"{store_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(header)
+        f.write(b"\0" * (_align(len(header)) - len(header)))
+        for name, _ in _SECTIONS:
+            raw = np.ascontiguousarray(arrays[name]).tobytes()
+            f.write(raw)
+            f.write(b"\0" * (_align(len(raw)) - len(raw)))
+        f.write(b"".join(char_bytes + d_bytes))
+    os.replace(tmp_path, store_path)
+    return store_path
+
+
+class FontStore:
+    """
+    A font store opened with mmap; glyph arrays are zero-copy views.
+
+    Every process that opens the same store file shares its pages through
+    the OS page cache, so no XML parsing happens in workers and resident
+    memory does not grow with the worker count. `mtime_ns` and `size` are
+    those of the SVG font it was compiled from. A file that is not a
+    complete store raises ValueError.
+    """
+
+    def __init__(self, store_path):
+        with open(store_path, "rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if len(self._mm) < HEADER.size:
+            raise ValueError(f"Truncated font store: {store_path}")
+        (magic, version, self.mtime_ns, self.size, self.units_per_em, self.ascent,
+         n_glyphs, n_points, n_offsets, n_text) = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != STORE_VERSION:
+            raise ValueError(f"Not a font store (or wrong version): {store_path}")
+
+        counts = {
+            "adv": n_glyphs,
+            "point_starts": n_glyphs + 1,
+            "offset_starts": n_glyphs + 1,
+            "char_starts": n_glyphs + 1,
+            "d_starts": n_glyphs + 1,
+            "points": n_points * 2,
+            "offsets": n_offsets,
+        }
+        pos = _align(HEADER.size)
+        for name, dtype in _SECTIONS:
+            # Raises ValueError when the file is shorter than the header says
+            arr = np.frombuffer(self._mm, dtype=dtype, count=counts[name], offset=pos)
+            setattr(self, name, arr)
+            pos = _align(pos + arr.nbytes)
+        self.points = self.points.reshape(-1, 2)
+        self._text_pos = pos
+        self._text_len = n_text
+        if pos + n_text != len(self._mm):
+            raise ValueError(f"Truncated font store: {store_path}")
+
+    def glyphs(self):
+        """Glyph dict backed by the mapped arrays (only the text is decoded)."""
+        text = self._mm[self._text_pos:self._text_pos + self._text_len]
+        ps = self.point_starts.tolist()
+        os_ = self.offset_starts.tolist()
+        cs = self.char_starts.tolist()
+        ds = self.d_starts.tolist()
+        advs = self.adv.tolist()
+
+        glyphs = {}
+        for i in range(len(advs)):
+            glyphs[text[cs[i]:cs[i + 1]].decode("utf-8")] = Glyph(
+                text[ds[i]:ds[i + 1]].decode("utf-8"), advs[i],
+                self.points[ps[i]:ps[i + 1]],
+                self.offsets[os_[i]:os_[i + 1]],
+            )
+        return glyphs
+
+    def font(self):
+        """(glyphs, units_per_em, ascent), the same shape load_svg_font() returns."""
+        return self.glyphs(), self.units_per_em, self.ascent
+
+
+def open_font_store(store_path):
+    """Open a font store in a worker process and return its font tuple."""
+    return FontStore(store_path).font()
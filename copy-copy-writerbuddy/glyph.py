@@ -0,0 +1,199 @@
+import re
+
+import numpy as np
+
+# Segments used to flatten each cubic Bezier into the polyline
+CURVE_SEGMENTS = 8
+
+_TOKEN_RE = re.compile(r"[MmLlHhVvCcZz]|[-+]?(?:\d+\.?\d*|\.\d+)(?:[eE][-+]?\d+)?")
+
+
+class Glyph:
+    """
+    One font glyph: advance plus strokes parsed once into float32 arrays.
+
+    `points` holds every stroke vertex in font units, shape (N, 2), and
+    `offsets` the start index of each stroke plus a final end index.
+    Unpacks like the old `(path_data, adv)` tuple, so `d, adv = glyph`
+    and `glyph[1]` keep working.
+    """
+
+    __slots__ = ("d", "adv", "points", "offsets")
+
+    def __init__(self, d, adv, points=None, offsets=None):
+        self.d = d
+        self.adv = float(adv)
+        if points is None:
+            points, offsets = parse_path(d)
+        self.points = points
+        self.offsets = offsets
+
+    @property
+    def strokes(self):
+        """List of (n, 2) views, one per M/L polyline."""
+        return [self.points[a:b] for a, b in zip(self.offsets[:-1], self.offsets[1:])]
+
+    @property
+    def stroke_count(self):
+        return len(self.offsets) - 1
+
+    def __iter__(self):
+        yield self.d
+        yield self.adv
+
+    def __getitem__(self, index):
+        return (self.d, self.adv)[index]
+
+    def __len__(self):
+        return 2
+
+    def __repr__(self):
+        return f"Glyph(adv={self.adv}, strokes={self.stroke_count}, points={len(self.points)})"
+
+
+def _cubic(p0, p1, p2, p3, segments=CURVE_SEGMENTS):
+    """Points along a cubic Bezier, excluding the start point."""
+    out = []
+    for i in range(1, segments + 1):
+        t = i / segments
+        u = 1.0 - t
+        a, b, c, d = u * u * u, 3 * u * u * t, 3 * u * t * t, t * t * t
+        out.append((
+            a * p0[0] + b * p1[0] + c * p2[0] + d * p3[0],
+            a * p0[1] + b * p1[1] + c * p2[1] + d * p3[1],
+        ))
+    return out
+
+
+def parse_path(d):
+    """
+    Parse SVG path data into (points, offsets) float32/int32 arrays.
+
+    Supports M, L, H, V, C and Z in absolute and relative form; curves
+    are flattened to CURVE_SEGMENTS line segments.
+    """
+    tokens = _TOKEN_RE.findall(d or "")
+    strokes = []
+    current = []
+    x = y = 0.0
+    start = (0.0, 0.0)
+    cmd = None
+    i = 0
+
+    def num():
+        nonlocal i
+        v = float(tokens[i])
+        i += 1
+        return v
+
+    while i < len(tokens):
+        tok = tokens[i]
+        if tok.isalpha():
+            cmd = tok
+            i += 1
+            if cmd in "Zz":
+                if current:
+                    current.append(start)
+                x, y = start
+                continue
+        elif cmd is None:
+            i += 1
+            continue
+
+        rel = cmd.islower()
+        c = cmd.upper()
+
+        if c == "M":
+            nx, ny = num(), num()
+            if rel:
+                nx, ny = x + nx, y + ny
+            if len(current) > 1:
+                strokes.append(current)
+            x, y = nx, ny
+            start = (x, y)
+            current = [(x, y)]
+            # Further coordinate pairs after a moveto are implicit linetos
+            cmd = "l" if rel else "L"
+        elif c == "L":
+            nx, ny = num(), num()
+            x, y = (x + nx, y + ny) if rel else (nx, ny)
+            current.append((x, y))
+        elif c == "H":
+            nx = num()
+            x = x + nx if rel else nx
+            current.append((x, y))
+        elif c == "V":
+            ny = num()
+            y = y + ny if rel else ny
+            current.append((x, y))
+        elif c == "C":
+            pts = [num() for _ in range(6)]
+            if rel:
+                pts = [v + (x if k % 2 == 0 else y) for k, v in enumerate(pts)]
+            p3 = (pts[4], pts[5])
+            current.extend(_cubic((x, y), (pts[0], pts[1]), (pts[2], pts[3]), p3))
+            x, y = p3
+        else:
+            # Unsupported command: skip its argument
+            i += 1
+
+    if len(current) > 1:
+        strokes.append(current)
+
+    offsets = [0]
+    for s in strokes:
+        offsets.append(offsets[-1] + len(s))
+
+    if strokes:
+        points = np.array([p for s in strokes for p in s], dtype=np.float32)
+    else:
+        points = np.zeros((0, 2), dtype=np.float32)
+    return points, np.array(offsets, dtype=np.int32)
+
+
+def pack_glyphs(glyphs):
+    """Flatten a glyph dict into plain lists and contiguous arrays."""
+    chars = list(glyphs)
+    ds = [glyphs[c].d for c in chars]
+    advs = np.array([glyphs[c].adv for c in chars], dtype=np.float64)
+
+    point_starts = [0]
+    offset_starts = [0]
+    for c in chars:
+        point_starts.append(point_starts[-1] + len(glyphs[c].points))
+        offset_starts.append(offset_starts[-1] + len(glyphs[c].offsets))
+
+    if chars:
+        points = np.concatenate([glyphs[c].points for c in chars]).astype(np.float32)
+        offsets = np.concatenate([glyphs[c].offsets for c in chars]).astype(np.int32)
+    else:
+        points = np.zeros((0, 2), dtype=np.float32)
+        offsets = np.zeros(0, dtype=np.int32)
+
+    return {
+        "chars": chars,
+        "d": ds,
+        "adv": advs,
+        "points": points,
+        "offsets": offsets,
+        "point_starts": np.array(point_starts, dtype=np.int64),
+        "offset_starts": np.array(offset_starts, dtype=np.int64),
+    }
+
+
+def unpack_glyphs(packed):
+    """Rebuild the glyph dict from pack_glyphs() output; arrays are views."""
+    points = packed["points"]
+    offsets = packed["offsets"]
+    ps = packed["point_starts"].tolist()
+    os_ = packed["offset_starts"].tolist()
+    advs = packed["adv"].tolist()
+
+    glyphs = {}
+    for i, (char, d) in enumerate(zip(packed["chars"], packed["d"])):
+        glyphs[char] = Glyph(
+            d, advs[i],
+            points[ps[i]:ps[i + 1]],
+            offsets[os_[i]:os_[i + 1]],
+        )
+    return glyphs
@@ -0,0 +1,239 @@
+import atexit
+import os
+import shutil
+import subprocess
+import time
+
+import atspi_utils
+import plot
+
+# --- SESSION SETUP ---
+# Every job is copied over this file, which the running Inkscape reloads
+SESSION_FILE = "inkscape_session.svg"
+START_TIMEOUT_S = 30
+DIALOG_TIMEOUT_S = 20
+# A plot started by Apply runs as a child process of Inkscape; the next job
+# waits for it to finish, for at most this long
+PLOT_TIMEOUT_S = 3600
+BUSY_POLL_S = 1.0
+# A plot leaves the document modified, so reverting it asks for confirmation
+# in a modal dialog first ("Changes will be lost! Are you sure ...")
+REVERT_CONFIRM_TEXT = "changes will be lost"
+REVERT_CONFIRM_TIMEOUT_S = 5
+
+INKSCAPE_DBUS_NAME = "org.inkscape.Inkscape"
+INKSCAPE_WINDOW_PATH = "/org/inkscape/Inkscape/window/1"
+
+EMPTY_SVG = '<svg xmlns="http://www.w3.org/2000/svg" width="210mm" height="297mm" viewBox="0 0 210 297" />\n'
+
+
+def _pid_alive(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def _child_pids(pid):
+    """Direct child processes of pid (Linux /proc), e.g. a running extension."""
+    children = []
+    try:
+        for task in os.listdir(f"/proc/{pid}/task"):
+            with open(f"/proc/{pid}/task/{task}/children") as f:
+                children.extend(int(c) for c in f.read().split())
+    except OSError:
+        pass
+    return children
+
+
+def _find_revert_ok(app):
+    """The OK button of Inkscape's revert confirmation dialog, or None."""
+    text = atspi_utils.Match(("label",), lambda name: REVERT_CONFIRM_TEXT in name.lower())
+    for i in range(atspi_utils.child_count(app)):
+        win = atspi_utils.child_at(app, i)
+        role = atspi_utils.role_name(win)
+        if ("alert" in role or "dialog" in role) and atspi_utils.search(win, text)[0] is not None:
+            return atspi_utils.search(win, atspi_utils.button_named("ok"))[0]
+    return None
+
+
+class InkscapeSession:
+    """
+    One Inkscape instance, started once and reused for every plot job.
+
+    Each job's SVG is copied over SESSION_FILE and the open document is
+    reverted to it, so the window and the AxiDraw Control dialog stay up.
+    The instance is restarted when its process dies or it drops off the
+    accessibility bus. `jobs` keeps the latency of every job.
+    """
+
+    def __init__(self, session_file=SESSION_FILE):
+        self.session_file = os.path.abspath(session_file)
+        self.proc = None
+        self.pid = None
+        self.app = None
+        self.dialog = None
+        self.starts = 0
+        self.jobs = []
+        atexit.register(self.close)
+
+    def alive(self):
+        """True while the Inkscape process runs and answers on the accessibility bus."""
+        if self.pid is None or not _pid_alive(self.pid):
+            return False
+        try:
+            return self.app is not None and self.app.childCount > 0
+        except Exception:
+            return False
+
+    def busy(self):
+        """True while Inkscape runs an extension (a plot started by Apply)."""
+        return self.pid is not None and bool(_child_pids(self.pid))
+
+    def wait_idle(self, timeout=PLOT_TIMEOUT_S):
+        """Wait for a running plot to finish; False if it is still running at timeout."""
+        deadline = time.monotonic() + timeout
+        while self.busy():
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(BUSY_POLL_S)
+        return True
+
+    def start(self):
+        """Start a fresh Inkscape on the session file, closing any previous one."""
+        self.close()
+        if not os.path.exists(self.session_file):
+            with open(self.session_file, "w") as f:
+                f.write(EMPTY_SVG)
+        self.proc = subprocess.Popen(
+            ["inkscape", self.session_file],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+        self.app = atspi_utils.wait_for_event(plot.find_inkscape_app, START_TIMEOUT_S, "Inkscape")
+        if not self.app:
+            self.close()
+            raise RuntimeError("Inkscape not found")
+        try:
+            # An instance that was already running takes the file over and our process exits
+            self.pid = self.app.get_process_id()
+        except Exception:
+            self.pid = self.proc.pid
+        self.dialog = None
+        self.starts += 1
+        print(f"[INKSCAPE] started (pid {self.pid}, start #{self.starts})")
+
+    def close(self):
+        """Stop the Inkscape this session started."""
+        if self.proc is not None and self.proc.poll() is None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(timeout=5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+        self.proc = None
+        self.pid = None
+        self.app = None
+        self.dialog = None
+
+    def _confirm_revert(self, finished):
+        """Press OK on the revert confirmation if it shows before finished() is true; True if pressed."""
+        found = atspi_utils.wait_for_event(lambda: _find_revert_ok(self.app) or finished(),
+                                           REVERT_CONFIRM_TIMEOUT_S, "revert confirmation")
+        if not found or found is True:
+            return False
+        if not plot.click(found):
+            raise RuntimeError("Failed to confirm the Inkscape revert")
+        return True
+
+    def _revert(self):
+        """
+        Make the open document reload the session file from disk.
+
+        The revert action asks for confirmation in a modal dialog when the
+        document was modified, which it is after a plot; the dialog is
+        found on the accessibility bus and its OK pressed.
+        """
+        if shutil.which("gdbus"):
+            # Activate only replies once the action is done, i.e. after the
+            # dialog is answered, so the call runs alongside the confirmation
+            call = subprocess.Popen(
+                ["gdbus", "call", "--session", "--dest", INKSCAPE_DBUS_NAME,
+                 "--object-path", INKSCAPE_WINDOW_PATH, "--method", "org.gtk.Actions.Activate",
+                 "document-revert", "[]", "{}"],
+                stdout=subprocess.DEVNULL,
+                stderr=subprocess.DEVNULL,
+            )
+            self._confirm_revert(lambda: call.poll() is not None)
+            try:
+                call.wait(timeout=DIALOG_TIMEOUT_S)
+            except subprocess.TimeoutExpired:
+                call.kill()
+                call.wait()
+                raise RuntimeError("Inkscape did not finish reverting")
+            if call.returncode == 0:
+                return
+        # No D-Bus actions: use File > Revert. A menu item's action runs from
+        # an idle callback, so this returns before the dialog shows.
+        item = plot.find_menu_item(self.app, "revert")
+        if not item:
+            raise RuntimeError("Inkscape Revert menu item not found")
+        plot.activate(item)
+        self._confirm_revert(lambda: False)
+
+    def _dialog_open(self):
+        try:
+            return self.dialog is not None and bool(self.dialog.name) and plot.find_apply(self.dialog) is not None
+        except Exception:
+            return False
+
+    def plot(self, filename):
+        """Load filename into the running Inkscape (starting it if needed) and click Apply."""
+        t0 = time.perf_counter()
+        saved_before = atspi_utils.stats()["saved_ms"]
+        reused = self.alive()
+        if reused and not self.wait_idle():
+            raise RuntimeError("Previous plot still running")
+        t_idle = time.perf_counter()
+
+        shutil.copyfile(filename, self.session_file + ".tmp")
+        os.replace(self.session_file + ".tmp", self.session_file)
+        if reused:
+            self._revert()
+        else:
+            self.start()
+        t_load = time.perf_counter()
+
+        if not self._dialog_open():
+            self.dialog = plot.open_axidraw_dialog(self.app, DIALOG_TIMEOUT_S)
+        t_dialog = time.perf_counter()
+        plot.press_apply(self.dialog)
+        t_apply = time.perf_counter()
+
+        job = {
+            "reused": reused,
+            "wait_s": t_idle - t0,
+            "load_s": t_load - t_idle,
+            "dialog_s": t_dialog - t_load,
+            "apply_s": t_apply - t_dialog,
+            "latency_s": t_apply - t_idle,
+            "atspi_saved_ms": atspi_utils.stats()["saved_ms"] - saved_before,
+        }
+        self.jobs.append(job)
+        print(f"[INKSCAPE] job {len(self.jobs)} ({'reused' if reused else 'started'}): "
+              f"{job['latency_s']:.2f} s to Apply (load {job['load_s']:.2f} s, dialog {job['dialog_s']:.2f} s, "
+              f"apply {job['apply_s']:.2f} s), waited {job['wait_s']:.1f} s for the previous plot, "
+              f"event waits saved {job['atspi_saved_ms']:.0f} ms")
+        return True
+
+    def stats(self):
+        """Job count, restarts and mean latency with and without reuse, for logging."""
+        out = {"jobs": len(self.jobs), "starts": self.starts}
+        for reused, key in ((True, "reused"), (False, "started")):
+            latencies = [j["latency_s"] for j in self.jobs if j["reused"] == reused]
+            out[f"{key}_jobs"] = len(latencies)
+            out[f"{key}_mean_s"] = sum(latencies) / len(latencies) if latencies else None
+        return out
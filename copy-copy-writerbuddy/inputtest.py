@@ -1,10 +1,10 @@
 import svgwrite
-from lxml import etree
 import subprocess
 import json
 import os
 
-SVG_NS = "http://www.w3.org/2000/svg"
+import font_registry
+
 FONT_PATH = "/home/pi/Desktop/writerbuddy/EMSDelight.svg"
 OUTPUT_SVG = "output_a4.svg"
 STATE_FILE = "text_state.json"
@@ -16,16 +16,7 @@ TEXT_HEIGHT_MM = 6
 LINE_SPACING = 6 
 
 def load_svg_font(svg_font_path):
-    tree = etree.parse(svg_font_path)
-    root = tree.getroot()
-    font_face = root.find(".//{%s}font-face" % SVG_NS)
-    glyphs = {}
-    for g in root.findall(".//{%s}glyph" % SVG_NS):
-        char = g.get("unicode")
-        path_data = g.get("d")
-        if char and path_data:
-            glyphs[char] = (path_data, float(g.get("horiz-adv-x", 1000)))
-    return glyphs, float(font_face.get("units-per-em", 1000)), float(font_face.get("ascent", 1000))
+    return font_registry.get_font(svg_font_path)
 
 def load_state():
     if os.path.exists(STATE_FILE):
@@ -1,37 +1,90 @@
-from realtime_vosk import VoskListener
+import startup_timer  # first, so the startup clock starts before any heavy import
 from tts import speak
-import cleaned_svgout
-from plot import plot
 import time
 
+# Heavy modules (vosk/sounddevice, svgwrite/numpy, pyatspi) are imported on
+# background threads inside main() while the greeting is being spoken.
+
 MODEL_PATH = "./model/en_in"
 OUTPUT_FILE = "output_1a4.svg"
 
+# Set to False to continue the previous session's page (open line included)
+RESET_ON_STARTUP = True
+
+# Announce the expected plot time for jobs at least this long (seconds)
+ANNOUNCE_MIN_PLOT_S = 30
+
+# "axidraw": plot over USB without Inkscape; "inkscape": drive the Inkscape
+# GUI (needs a desktop session); "fake": record the moves, plot nothing
+PLOT_BACKEND = "axidraw"
+
 # Modes
 MODE_SINGLE_LINE = "single"
 MODE_MULTI_LINE = "multi"
 
-def main():
+def load_listener(timer):
+    """Import the recognizer and load the Vosk model (runs in the background)."""
+    with timer.step("import realtime_vosk"):
+        from realtime_vosk import VoskListener
+    with timer.step("load vosk model"):
+        return VoskListener(MODEL_PATH)
+
+
+def load_writer(timer):
+    """Import the SVG writer and plotter, reset state and warm the font (background)."""
+    with timer.step("import cleaned_svgout"):
+        import cleaned_svgout
+    with timer.step("load plot backend"):
+        import plot_backend
+        try:
+            plot = plot_backend.get_plotter(PLOT_BACKEND)
+        except ImportError as e:
+            print(f"{e}; plotting through the Inkscape GUI instead")
+            plot = plot_backend.get_plotter("inkscape")
     # 1. Reset state on startup
-    cleaned_svgout.reset_state()
-    
-    # 2. Initialize Listener
-    speak("System initializing...")
-    listener = VoskListener(MODEL_PATH)
-    
+    if RESET_ON_STARTUP:
+        with timer.step("reset state"):
+            cleaned_svgout.reset_state()
+    with timer.step("load font"):
+        try:
+            cleaned_svgout.load_svg_font(cleaned_svgout.FONT_PATH)
+        except OSError as e:
+            print(f"Font not loaded yet: {e}")
+    return cleaned_svgout, plot
+
+
+def main():
+    timer = startup_timer.StartupTimer()
+
+    # 2. Initialize Listener and writer in the background while we talk
+    listener_task = timer.background("listener ready", lambda: load_listener(timer))
+    writer_task = timer.background("writer ready", lambda: load_writer(timer))
+
+    with timer.step("speak 'initializing'"):
+        speak("System initializing...")
+
     # 3. Default Settings
     current_mode = MODE_SINGLE_LINE
-    
-    speak("Hi! I'm your AI Writer Buddy. I'm ready to write.")
-    speak("I am currently in Single Line mode.")
+    layout = None  # open-line layout, kept in memory while in Multi Line mode
+
+    with timer.step("speak greeting"):
+        speak("Hi! I'm your AI Writer Buddy. I'm ready to write.")
+        speak("I am currently in Single Line mode.")
+
+    with timer.step("wait for listener"):
+        listener = listener_task.result()
 
     # Generator for voice input
     voice_stream = listener.listen()
+    first_listen = True
 
     while True:
         # --- WAIT FOR INPUT ---
         listener.reset_grammar() # Ensure we are in free-text mode
         print("\n[LISTENING]...")
+        if first_listen:
+            timer.report("time to first listen")
+            first_listen = False
         
         # Get next phrase
         try:
@@ -95,17 +148,36 @@ def main():
 
             if "yes" in confirmation:
                 speak("Writing it now.")
+                cleaned_svgout, plot = writer_task.result()
                 
                 # Plot logic
-                lines = split_to_lines(text)
-                cleaned_svgout.text_to_svg(lines, OUTPUT_FILE)
+                if current_mode == MODE_MULTI_LINE:
+                    # Continue on the open line; only the new words are drawn
+                    if layout is None:
+                        layout = cleaned_svgout.load_line_layout()
+                    fragments = cleaned_svgout.append_text_to_svg(layout, text, OUTPUT_FILE)
+                else:
+                    lines = split_to_lines(text)
+                    fragments = cleaned_svgout.text_to_svg(lines, OUTPUT_FILE)
+                    layout = None  # text_to_svg moved the cursor on disk
                 
+                announce_plot_time(fragments)
+
                 # speak("Sending to plotter...")
-                try:
-                    plot(OUTPUT_FILE)
-                except Exception as e:
-                    print(f"Plot error: {e}")
-                    speak("Oops, I had trouble sending that to the plotter.")
+                # One fragment per page; a full page needs a fresh sheet before the next
+                for fragment in fragments:
+                    if fragment.new_sheet:
+                        # The last job filled the sheet without knowing it
+                        wait_for_new_sheet(listener, voice_stream, fragment.page - 1)
+                    try:
+                        plot(fragment)
+                    except Exception as e:
+                        print(f"Plot error: {e}")
+                        speak("Oops, I had trouble sending that to the plotter.")
+                        break
+
+                    if fragment.page_full:
+                        wait_for_new_sheet(listener, voice_stream, fragment.page)
                 
                 speak("All done.")
                 
@@ -130,25 +202,40 @@ def main():
         listener.reset_grammar()
 
 
-def split_to_lines(text, max_words=8):
-    """Simple line breaker for SVG"""
-    words = text.split()
-    lines, current = [], []
+def announce_plot_time(fragments):
+    """Say how long plotting the new fragments should take (estimated while writing)."""
+    seconds = sum(fragment.plot_s or 0.0 for fragment in fragments)
+    print(f"[ESTIMATE] {len(fragments)} fragment(s), about {seconds:.0f} s of plotting")
+    if seconds >= ANNOUNCE_MIN_PLOT_S:
+        import plot_time
+        speak(f"This will take {plot_time.describe_duration(seconds)}.")
+
+
+def wait_for_new_sheet(listener, voice_stream, page):
+    """Page full: ask for a fresh sheet and wait until the user says yes."""
+    speak(f"Page {page} is full. Please put in a fresh sheet and say yes when it's ready.")
+    listener.set_grammar(["yes", "ready"])
+
+    for reply in voice_stream:
+        reply = reply.lower()
+        print(f"NEW SHEET HEARD: {reply}")
+        if "yes" in reply or "ready" in reply:
+            break
 
-    for w in words:
-        current.append(w)
-        if len(current) >= max_words:
-            lines.append(" ".join(current))
-            current = []
+    listener.set_grammar(["yes", "no", "sleep"])
 
-    if current:
-        lines.append(" ".join(current))
 
-    return lines
+def split_to_lines(text, max_width=None):
+    """Line breaker for SVG using the resident font's real glyph advances."""
+    import cleaned_svgout
+    return cleaned_svgout.split_text_to_lines(text, max_width)
 
 if __name__ == "__main__":
     try:
         main()
     except KeyboardInterrupt:
         print("\nExiting...")
+    finally:
+        import font_registry
+        print(f"Font registry: {font_registry.stats()}")
 
@@ -25,6 +25,8 @@ import subprocess
 import sys
 import time
 
+import atspi_utils
+
 try:
     import pyautogui
 except Exception as e:
@@ -186,21 +188,9 @@ def access_menu_atspi(menu_path, timeout=6):
         # try direct children first
         found = find_child_by_name(current, part)
         if not found:
-            # fallback: deep search
-            def deep_search(obj):
-                candidate = find_child_by_name(obj, part)
-                if candidate:
-                    return candidate
-                for k in range(obj.childCount):
-                    try:
-                        c = obj.getChildAtIndex(k)
-                        res = deep_search(c)
-                        if res:
-                            return res
-                    except Exception:
-                        continue
-                return None
-            found = deep_search(current)
+            # fallback: pruned search of the whole subtree (closed menus included)
+            match = atspi_utils.Match(None, lambda n: n.strip().lower() == part.lower(), ('menu',), atspi_utils.MENU_SKIP_ROLES)
+            found = atspi_utils.search(current, match)[0]
         if not found:
             print(f'Menu part "{part}" not found via AT-SPI.')
             return False
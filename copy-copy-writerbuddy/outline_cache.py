@@ -0,0 +1,185 @@
+from collections import OrderedDict
+import os
+
+import numpy as np
+
+import font_registry
+import simplify
+import stroke_merge
+import text_layout
+
+# --- CACHE SETUP ---
+MAX_SIZES = 4
+
+_outlines = OrderedDict()
+_hits = 0
+_misses = 0
+
+
+class ScaledOutlines:
+    """
+    Every glyph of one font pre-scaled to a text height and flipped to page axes.
+
+    Points are in mm relative to a glyph's top-left placement point, so
+    putting a glyph at (x, y) is a plain offset add. All glyphs share one
+    contiguous point array; `slot_of` maps a codepoint to a glyph slot
+    (-1 for characters with no strokes). With a merge tolerance, strokes of
+    a glyph that meet within it are joined first (see stroke_merge); with a
+    simplify tolerance, outlines are then thinned (see simplify).
+    """
+
+    def __init__(self, glyphs, units_per_em, ascent, text_height_mm, merge_tolerance_mm=0.0,
+                 simplify_tolerance_mm=0.0):
+        scale = text_height_mm / units_per_em
+        self.table = text_layout.advance_table(glyphs, units_per_em, text_height_mm)
+        self.text_height_mm = text_height_mm
+        merged = stroke_merge.merged_glyphs(glyphs, merge_tolerance_mm / scale)
+        simplified = simplify.simplified_glyphs(glyphs, simplify_tolerance_mm / scale, merged)
+
+        chars = [c for c, g in glyphs.items() if len(c) == 1 and len(g.points)]
+        self.slot_of = np.full(self.table.missing + 1, -1, dtype=np.intp)
+
+        points = []
+        stroke_starts = []
+        point_start = [0]
+        stroke_start = [0]
+        self.lifts_saved = np.zeros(len(chars), dtype=np.intp)
+        for slot, char in enumerate(chars):
+            g = glyphs[char]
+            g_points, g_offsets = g.points, g.offsets
+            if char in merged:
+                g_points, g_offsets, self.lifts_saved[slot], _ = merged[char]
+            if char in simplified:
+                g_points, g_offsets = simplified[char][:2]
+            self.slot_of[ord(char)] = slot
+            points.append(g_points)
+            stroke_starts.append(g_offsets[:-1])
+            point_start.append(point_start[-1] + len(g_points))
+            stroke_start.append(stroke_start[-1] + len(g_offsets) - 1)
+
+        if chars:
+            pts = np.concatenate(points).astype(np.float64)
+            self.stroke_starts = np.concatenate(stroke_starts).astype(np.intp)
+        else:
+            pts = np.zeros((0, 2), dtype=np.float64)
+            self.stroke_starts = np.zeros(0, dtype=np.intp)
+
+        # Same result as matrix(scale 0 0 -scale x y + ascent * scale)
+        pts[:, 0] *= scale
+        pts[:, 1] = (ascent - pts[:, 1]) * scale
+        self.points = np.ascontiguousarray(pts)
+
+        self.point_start = np.array(point_start, dtype=np.intp)
+        self.stroke_start = np.array(stroke_start, dtype=np.intp)
+
+    def place_runs(self, runs):
+        """
+        Place (text, x, y, ...) runs in one batched operation.
+
+        Returns (points, offsets, glyph_strokes, run_glyphs): points is (N, 2)
+        in mm page coordinates, offsets the stroke boundaries (len S + 1),
+        glyph_strokes the first stroke index of each placed glyph plus a
+        final S, and run_glyphs the first placed glyph of each run plus a
+        final total, so strokes can be grouped per glyph or per run.
+        """
+        slots = []
+        xs = []
+        ys = []
+        run_glyphs = [0]
+        for run in runs:
+            text, x, y = run[0], run[1], run[2]
+            if not text:
+                run_glyphs.append(run_glyphs[-1])
+                continue
+            cps = self.table.indices(text)
+            adv = self.table.adv_mm[cps]
+            # Glyph origins: run start plus the advances of everything before
+            pos = np.empty(len(adv))
+            pos[0] = x
+            np.cumsum(adv[:-1], out=pos[1:])
+            pos[1:] += x
+            slot = self.slot_of[cps]
+            keep = slot >= 0
+            slots.append(slot[keep])
+            xs.append(pos[keep])
+            ys.append(np.full(int(keep.sum()), float(y)))
+            run_glyphs.append(run_glyphs[-1] + len(slots[-1]))
+
+        run_glyphs = np.array(run_glyphs, dtype=np.intp)
+        if not slots:
+            return np.zeros((0, 2)), np.zeros(1, dtype=np.intp), np.zeros(1, dtype=np.intp), run_glyphs
+
+        points, offsets, glyph_strokes = self.place(np.concatenate(slots), np.concatenate(xs), np.concatenate(ys))
+        return points, offsets, glyph_strokes, run_glyphs
+
+    def merged_lifts(self, runs):
+        """Pen lifts the per-glyph merge saves when drawing runs."""
+        total = 0
+        for run in runs:
+            if run[0]:
+                slot = self.slot_of[self.table.indices(run[0])]
+                total += int(self.lifts_saved[slot[slot >= 0]].sum())
+        return total
+
+    def place(self, slots, xs, ys):
+        """Place glyph slots at origins (xs, ys); see place_runs() for the result."""
+        p0 = self.point_start[slots]
+        pn = self.point_start[slots + 1] - p0
+        s0 = self.stroke_start[slots]
+        sn = self.stroke_start[slots + 1] - s0
+
+        # Gather every placed glyph's point range into one index array
+        base = np.repeat(np.cumsum(pn) - pn, pn)
+        idx = np.repeat(p0, pn) + (np.arange(int(pn.sum())) - base)
+
+        points = self.points[idx]
+        points[:, 0] += np.repeat(xs, pn)
+        points[:, 1] += np.repeat(ys, pn)
+
+        # Stroke starts: glyph-relative starts shifted by the glyph's output base
+        sbase = np.repeat(np.cumsum(sn) - sn, sn)
+        sidx = np.repeat(s0, sn) + (np.arange(int(sn.sum())) - sbase)
+        offsets = np.empty(len(sidx) + 1, dtype=np.intp)
+        offsets[:-1] = self.stroke_starts[sidx] + np.repeat(np.cumsum(pn) - pn, sn)
+        offsets[-1] = len(points)
+
+        glyph_strokes = np.zeros(len(slots) + 1, dtype=np.intp)
+        np.cumsum(sn, out=glyph_strokes[1:])
+        return points, offsets, glyph_strokes
+
+
+def get_outlines(svg_font_path, text_height_mm, merge_tolerance_mm=0.0, simplify_tolerance_mm=0.0):
+    """Return ScaledOutlines for a font, text height and tolerances, kept in an LRU."""
+    global _hits, _misses
+
+    glyphs, units_per_em, ascent = font_registry.get_font(svg_font_path)
+    key = (os.path.abspath(svg_font_path), float(text_height_mm), float(merge_tolerance_mm),
+           float(simplify_tolerance_mm))
+
+    entry = _outlines.get(key)
+    if entry is not None and entry[0] is glyphs:
+        _hits += 1
+        _outlines.move_to_end(key)
+        return entry[1]
+
+    _misses += 1
+    outlines = ScaledOutlines(glyphs, units_per_em, ascent, text_height_mm, merge_tolerance_mm,
+                              simplify_tolerance_mm)
+    _outlines[key] = (glyphs, outlines)
+    _outlines.move_to_end(key)
+    while len(_outlines) > MAX_SIZES:
+        _outlines.popitem(last=False)
+    return outlines
+
+
+def stats():
+    """Hit/miss counters and current size, for logging."""
+    return {"hits": _hits, "misses": _misses, "size": len(_outlines), "max_size": MAX_SIZES}
+
+
+def clear():
+    """Forget all cached outlines and reset the counters."""
+    global _hits, _misses
+    _outlines.clear()
+    _hits = 0
+    _misses = 0
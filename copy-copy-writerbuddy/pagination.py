@@ -0,0 +1,95 @@
+from collections import namedtuple
+import json
+import os
+import time
+
+# --- FILES ---
+PAGE_INDEX_FILE = "page_index.json"
+
+# One SVG written for one page: `page_full` is set when the layout moved
+# on to a new page after it, i.e. the sheet must be swapped before the
+# next fragment is plotted. `new_sheet` is set on the first fragment of a
+# job that starts a later page than the last one recorded, i.e. the sheet
+# must be swapped before this fragment is plotted. `plot_s` is the
+# estimated plot time and `strokes` the fragment's StrokePage (see
+# stroke_page) for a caller that laid the page out itself; the writer does
+# not keep it, so plotting reads `path`. The page index only records what
+# is on disk.
+PageFragment = namedtuple(
+    "PageFragment", ["page", "path", "lines", "page_full", "plot_s", "strokes", "new_sheet"],
+    defaults=(None, None, False),
+)
+
+
+def group_runs_by_page(runs):
+    """Split (text, x, y, page) runs into [(page, runs)] in layout order."""
+    groups = []
+    for run in runs:
+        page = run[3]
+        if not groups or groups[-1][0] != page:
+            groups.append((page, []))
+        groups[-1][1].append(run)
+    return groups
+
+
+def fragment_path(output_file, page, first):
+    """First fragment keeps output_file; later pages get a page suffix."""
+    if first:
+        return output_file
+    stem, ext = os.path.splitext(output_file)
+    return f"{stem}_page{page:03d}{ext or '.svg'}"
+
+
+def load_page_index(index_file=PAGE_INDEX_FILE):
+    """Load the page index ({"pages": [...]}) from disk."""
+    if os.path.exists(index_file):
+        try:
+            with open(index_file, 'r') as f:
+                index = json.load(f)
+                if isinstance(index.get("pages"), list):
+                    return index
+        except:
+            pass
+    return {"pages": []}
+
+
+def save_page_index(index, index_file=PAGE_INDEX_FILE):
+    """Write the page index to disk."""
+    with open(index_file, 'w') as f:
+        json.dump(index, f, indent=1)
+
+
+def reset_page_index(index_file=PAGE_INDEX_FILE):
+    """Start a new session with an empty page index."""
+    save_page_index({"pages": []}, index_file)
+
+
+def last_page(index_file=PAGE_INDEX_FILE):
+    """Page of the last fragment recorded this session, or None."""
+    pages = load_page_index(index_file)["pages"]
+    return pages[-1]["id"] if pages else None
+
+
+def record_fragments(fragments, index_file=PAGE_INDEX_FILE):
+    """Add written fragments to the page index, creating page entries as needed."""
+    index = load_page_index(index_file)
+    pages = {p["id"]: p for p in index["pages"]}
+
+    for frag in fragments:
+        if frag.new_sheet and index["pages"]:
+            index["pages"][-1]["full"] = True
+        entry = pages.get(frag.page)
+        if entry is None:
+            entry = {"id": frag.page, "fragments": 0, "lines": 0, "full": False, "started": time.time()}
+            pages[frag.page] = entry
+            index["pages"].append(entry)
+        entry["fragments"] += 1
+        entry["lines"] += frag.lines
+        entry["last_fragment"] = frag.path
+        if frag.page_full:
+            entry["full"] = True
+        if frag.plot_s is not None:
+            entry["plot_s"] = round(entry.get("plot_s", 0.0) + frag.plot_s, 1)
+
+    save_page_index(index, index_file)
+    return index
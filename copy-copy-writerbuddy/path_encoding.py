@@ -0,0 +1,169 @@
+import math
+from decimal import Decimal
+from functools import lru_cache
+
+import numpy as np
+
+from glyph import _TOKEN_RE
+
+# Arguments taken by each path command we rewrite
+_ARG_COUNT = {"M": 2, "L": 2, "H": 1, "V": 1, "C": 6, "Z": 0}
+
+
+def step_decimals(step):
+    """Decimal places needed to write multiples of step exactly (0.01 -> 2, 5 -> 0)."""
+    return max(0, -Decimal(str(step)).normalize().as_tuple().exponent)
+
+
+def format_number(value, decimals):
+    """Shortest fixed-point text for value: 0.500 -> .5, -0.25 -> -.25, 3.0 -> 3."""
+    text = f"{value:.{decimals}f}"
+    if decimals:
+        text = text.rstrip("0").rstrip(".")
+    if text.startswith("0.") or text.startswith("-0."):
+        text = text.replace("0.", ".", 1)
+    return "0" if text in ("-0", "", "-") else text
+
+
+@lru_cache(maxsize=65536)
+def grid_number(k, step):
+    """format_number() of k grid steps; cached, as deltas repeat across paths and pages."""
+    return format_number(k * step, step_decimals(step))
+
+
+def join_numbers(numbers):
+    """Numbers separated by spaces, except where a minus sign already separates them."""
+    return " ".join(numbers).replace(" -", "-")
+
+
+def quantize(value, step):
+    """Snap a value to the step grid."""
+    return round(value / step) * step
+
+
+def font_units_step(precision_mm, scale):
+    """Power-of-ten grid in font units no coarser than precision_mm after scaling."""
+    return 10.0 ** math.floor(math.log10(precision_mm / scale))
+
+
+def relative_path(points, offsets, start, end, step):
+    """Compact relative path data for strokes start..end-1 of a placed stroke array."""
+    return relative_paths(points, offsets, [(start, end)], step)[0]
+
+
+def relative_paths(points, offsets, ranges, step):
+    """
+    Compact relative path data for each (start, end) stroke range.
+
+    Points are snapped to the step grid first and the deltas taken on the
+    grid, so the relative form does not accumulate rounding error. Each
+    path starts with an absolute moveto.
+    """
+    grid = np.rint(points / step).astype(np.int64)
+    deltas = np.diff(grid, axis=0, prepend=np.zeros((1, 2), dtype=np.int64))
+    firsts = offsets[[start for start, _ in ranges]]
+    deltas[firsts] = grid[firsts]
+    deltas = deltas.ravel().tolist()
+    offsets = offsets.tolist()
+
+    # Deltas repeat a lot, so format each distinct grid value once
+    text = {k: grid_number(k, step) for k in set(deltas)}
+
+    paths = []
+    for start, end in ranges:
+        parts = []
+        for i in range(start, end):
+            # After `m`, further pairs are implicit relative linetos
+            parts.append("m" + join_numbers([text[k] for k in deltas[2 * offsets[i]:2 * offsets[i + 1]]]))
+        paths.append("".join(parts))
+    return paths
+
+
+@lru_cache(maxsize=4096)
+def compact_path_data(d, step):
+    """
+    Rewrite font path data with relative commands on a step grid.
+
+    Handles M, L, H, V, C and Z in absolute or relative form; the result
+    draws the same outline to within half a step. Cached per (d, step).
+    """
+    decimals = step_decimals(step)
+    tokens = _TOKEN_RE.findall(d or "")
+    parts = []
+    gx = gy = 0          # current point on the grid
+    sx = sy = 0          # subpath start on the grid
+    x = y = 0.0          # current point, exact
+    cmd = None
+    last = None
+    i = 0
+
+    def grid(v):
+        return int(round(v / step))
+
+    def num(k):
+        return format_number(k * step, decimals)
+
+    def emit(letter, numbers):
+        nonlocal last
+        body = join_numbers(numbers)
+        # Repeated commands (and linetos right after a moveto) can drop the letter
+        if letter != "m" and (letter == last or (letter == "l" and last == "m")):
+            parts.append(body if body.startswith("-") else " " + body)
+        else:
+            parts.append(letter + body)
+        last = letter
+
+    while i < len(tokens):
+        tok = tokens[i]
+        if tok.isalpha():
+            cmd = tok
+            i += 1
+            if cmd in "Zz":
+                parts.append("z")
+                last = "z"
+                gx, gy = sx, sy
+                x, y = sx * step, sy * step
+                continue
+        elif cmd is None:
+            i += 1
+            continue
+
+        c = cmd.upper()
+        n = _ARG_COUNT.get(c)
+        if n is None or i + n > len(tokens):
+            i += 1
+            continue
+        args = [float(t) for t in tokens[i:i + n]]
+        i += n
+        rel = cmd.islower()
+
+        if c in "ML":
+            nx, ny = (x + args[0], y + args[1]) if rel else args
+            qx, qy = grid(nx), grid(ny)
+            emit(c.lower(), [num(qx - gx), num(qy - gy)])
+            if c == "M":
+                sx, sy = qx, qy
+                # Further coordinate pairs after a moveto are implicit linetos
+                cmd = "l" if rel else "L"
+        elif c == "H":
+            nx = x + args[0] if rel else args[0]
+            qx, qy = grid(nx), gy
+            ny = y
+            emit("h", [num(qx - gx)])
+        elif c == "V":
+            ny = y + args[0] if rel else args[0]
+            qx, qy = gx, grid(ny)
+            nx = x
+            emit("v", [num(qy - gy)])
+        else:
+            if rel:
+                args = [v + (x if k % 2 == 0 else y) for k, v in enumerate(args)]
+            q = [grid(v) for v in args]
+            emit("c", [num(v - (gx if k % 2 == 0 else gy)) for k, v in enumerate(q)])
+            nx, ny = args[4], args[5]
+            qx, qy = q[4], q[5]
+
+        x, y = nx, ny
+        gx, gy = qx, qy
+
+    return "".join(parts)
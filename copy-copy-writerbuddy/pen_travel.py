@@ -0,0 +1,163 @@
+import time
+
+import numpy as np
+
+# --- OPTIMIZER SETUP ---
+# The AxiDraw parks at the page's top-left corner
+ORIGIN = (0.0, 0.0)
+
+
+def stroke_endpoints(points, offsets):
+    """First and last point of every stroke in a (points, offsets) stroke array."""
+    offsets = np.asarray(offsets)
+    return points[offsets[:-1]], points[offsets[1:] - 1]
+
+
+def travel_distance(starts, ends, order=None, flipped=None, origin=ORIGIN):
+    """Pen-up distance (mm) drawing units in `order`, `flipped` ones end-first."""
+    if order is None:
+        order = np.arange(len(starts))
+    if len(order) == 0:
+        return 0.0
+    entry = starts[order].copy()
+    exit_ = ends[order].copy()
+    if flipped is not None:
+        entry[flipped] = ends[order][flipped]
+        exit_[flipped] = starts[order][flipped]
+    hops = np.empty_like(entry)
+    hops[0] = entry[0] - np.asarray(origin, dtype=float)
+    hops[1:] = entry[1:] - exit_[:-1]
+    return float(np.hypot(hops[:, 0], hops[:, 1]).sum())
+
+
+def nearest_neighbour(starts, ends, reversible=True, origin=ORIGIN):
+    """Greedy order: always draw the closest remaining unit next, from either end."""
+    n = len(starts)
+    order = np.empty(n, dtype=np.intp)
+    flipped = np.zeros(n, dtype=bool)
+    free = np.ones(n, dtype=bool)
+    pos = np.asarray(origin, dtype=float)
+    sx, sy = starts[:, 0].copy(), starts[:, 1].copy()
+    ex, ey = ends[:, 0].copy(), ends[:, 1].copy()
+
+    for k in range(n):
+        d = (sx - pos[0]) ** 2 + (sy - pos[1]) ** 2
+        d[~free] = np.inf
+        best = int(np.argmin(d))
+        flip = False
+        if reversible:
+            de = (ex - pos[0]) ** 2 + (ey - pos[1]) ** 2
+            de[~free] = np.inf
+            best_end = int(np.argmin(de))
+            if de[best_end] < d[best]:
+                best, flip = best_end, True
+        order[k] = best
+        flipped[best] = flip
+        free[best] = False
+        pos = starts[best] if flip else ends[best]
+
+    return order, flipped[order]
+
+
+def two_opt(starts, ends, order, flipped, max_passes=None, deadline=None, origin=ORIGIN):
+    """
+    Improve a reversible order with 2-opt moves until a pass gains nothing.
+
+    At most max_passes passes (None: until no gain), so the result only
+    depends on the input; a deadline (perf_counter time) is a safety stop.
+
+    Reversing positions i..j also flips every unit in between, so only the
+    two hops at the segment's ends change; all candidate j for one i are
+    scored in a single vector operation.
+    """
+    order = order.copy()
+    flipped = flipped.copy()
+    n = len(order)
+    entry = np.where(flipped[:, None], ends[order], starts[order])
+    exit_ = np.where(flipped[:, None], starts[order], ends[order])
+    # Exit point before each position (the origin before the first)
+    prev = np.vstack([np.asarray(origin, dtype=float)[None, :], exit_[:-1]])
+
+    improved = True
+    passes = 0
+    while improved and (max_passes is None or passes < max_passes):
+        improved = False
+        passes += 1
+        for i in range(n - 1):
+            if deadline is not None and time.perf_counter() >= deadline:
+                print(f"[TRAVEL] 2-opt hit its time limit after {passes - 1} full passes")
+                return order, flipped
+            j = np.arange(i + 1, n)
+            head = np.hypot(*(entry[i] - prev[i]))
+            old = np.full(len(j), head)
+            old[:-1] += np.hypot(*(entry[j[:-1] + 1] - exit_[j[:-1]]).T)
+            new = np.hypot(*(exit_[j] - prev[i]).T)
+            new[:-1] += np.hypot(*(entry[j[:-1] + 1] - entry[i]).T)
+            gain = old - new
+            k = int(np.argmax(gain))
+            if gain[k] <= 1e-9:
+                continue
+
+            j = i + 1 + k
+            order[i:j + 1] = order[i:j + 1][::-1]
+            flipped[i:j + 1] = ~flipped[i:j + 1][::-1]
+            entry[i:j + 1], exit_[i:j + 1] = exit_[i:j + 1][::-1].copy(), entry[i:j + 1][::-1].copy()
+            prev[i + 1:j + 2] = exit_[i:min(j + 1, n - 1)]
+            improved = True
+
+    return order, flipped
+
+
+def optimize_order(starts, ends, reversible=True, max_passes=None, time_limit=None, origin=ORIGIN):
+    """
+    Order (and, if reversible, direction) for drawing units to cut pen-up travel.
+
+    Nearest-neighbour seeding (always run to the end: a cut-short seed
+    leaves the rest in original order and does worse than plain nearest
+    neighbour), then up to max_passes 2-opt passes, stopped early only if
+    time_limit (s) runs out. Returns (order, flipped), never worse than
+    the original order.
+    """
+    n = len(starts)
+    identity = np.arange(n), np.zeros(n, dtype=bool)
+    if n < 2:
+        return identity
+
+    deadline = None if time_limit is None else time.perf_counter() + time_limit
+    order, flipped = nearest_neighbour(starts, ends, reversible, origin)
+    if reversible:
+        order, flipped = two_opt(starts, ends, order, flipped, max_passes, deadline, origin)
+
+    if travel_distance(starts, ends, order, flipped, origin) > travel_distance(starts, ends, origin=origin):
+        return identity
+    return order, flipped
+
+
+def reorder_strokes(points, offsets, order, flipped):
+    """Stroke array with strokes in `order`, the `flipped` ones reversed."""
+    offsets = np.asarray(offsets)
+    lengths = offsets[1:] - offsets[:-1]
+    pieces = []
+    for s, flip in zip(order.tolist(), flipped.tolist()):
+        stroke = points[offsets[s]:offsets[s + 1]]
+        pieces.append(stroke[::-1] if flip else stroke)
+    new_offsets = np.zeros(len(order) + 1, dtype=np.intp)
+    np.cumsum(lengths[order], out=new_offsets[1:])
+    if not pieces:
+        return points[:0], new_offsets
+    return np.concatenate(pieces), new_offsets
+
+
+def optimize_strokes(points, offsets, labels, max_passes=None, time_limit=None, origin=ORIGIN):
+    """
+    Reorder and reverse the strokes of a page to cut pen-up travel.
+
+    `labels` tags each stroke (e.g. with its run) and is reordered along
+    with it. Returns (points, offsets, labels, before_mm, after_mm).
+    """
+    starts, ends = stroke_endpoints(points, offsets)
+    before = travel_distance(starts, ends, origin=origin)
+    order, flipped = optimize_order(starts, ends, True, max_passes, time_limit, origin)
+    after = travel_distance(starts, ends, order, flipped, origin)
+    points, offsets = reorder_strokes(points, offsets, order, flipped)
+    return points, offsets, np.asarray(labels)[order], before, after
@@ -1,13 +1,108 @@
 # axidraw_plot.py
 import subprocess
-import time
-import sys
 import pyatspi
 
+import atspi_utils
+
+
+def find_inkscape_app():
+    """The Inkscape application on the accessibility bus, or None."""
+    desktop = pyatspi.Registry.getDesktop(0)
+    for app in desktop:
+        if app.name and "inkscape" in app.name.lower():
+            return app
+    return None
+
+
+def find_menu_item(acc, text):
+    """The first menu item under acc whose name contains text (lowercase), or None."""
+    return atspi_utils.search(acc, atspi_utils.menu_item_named(text))[0]
+
+
+def find_axidraw(acc):
+    """The AxiDraw menu item under acc (path cached across jobs), or None."""
+    return atspi_utils.paths.find("AxiDraw menu item", acc, atspi_utils.menu_item_named("axidraw"))
+
+
+def find_axidraw_window():
+    """The AxiDraw Control window of any application, or None."""
+    desktop = pyatspi.Registry.getDesktop(0)
+    for app in desktop:
+        for i in range(app.childCount):
+            win = app.getChildAtIndex(i)
+            if win.name and "axidraw" in win.name.lower():
+                return win
+    return None
+
+
+def find_apply(acc):
+    """The Apply button under acc (path cached across jobs), or None."""
+    return atspi_utils.paths.find("Apply button", acc, atspi_utils.button_named("apply"))
+
+
+def click_at(acc):
+    """Click the middle of acc with xdotool."""
+    comp = acc.queryComponent()
+    x, y, w, h = comp.getExtents(pyatspi.DESKTOP_COORDS)
+    subprocess.run(
+        ["xdotool", "mousemove", str(x + w // 2), str(y + h // 2), "click", "1"],
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        check=False,
+    )
+
+
+def activate(item):
+    """Run a menu item's default action, clicking it if it has none."""
+    try:
+        item.queryAction().doAction(0)
+    except Exception:
+        click_at(item)
+
+
+def click(acc):
+    """Press a button through its click/press action, else with the mouse."""
+    try:
+        action = acc.queryAction()
+        for i in range(action.nActions):
+            if action.getName(i).lower() in ("click", "press"):
+                action.doAction(i)
+                return True
+    except Exception:
+        pass
+
+    try:
+        click_at(acc)
+        return True
+    except Exception:
+        return False
+
+
+def open_axidraw_dialog(inkscape_app, axidraw_timeout=20):
+    """Open AxiDraw Control from Inkscape's menu and return its window."""
+    axidraw_item = find_axidraw(inkscape_app)
+    if not axidraw_item:
+        raise RuntimeError("AxiDraw menu item not found")
+    activate(axidraw_item)
+
+    axidraw_window = atspi_utils.wait_for_event(find_axidraw_window, axidraw_timeout, "AxiDraw Control")
+    if not axidraw_window:
+        raise RuntimeError("AxiDraw Control window not found")
+    return axidraw_window
+
+
+def press_apply(axidraw_window):
+    """Click Apply in the AxiDraw Control window, which starts the plot."""
+    apply_btn = find_apply(axidraw_window)
+    if not apply_btn or not click(apply_btn):
+        raise RuntimeError("Failed to click Apply")
+
 
 def plot(filename, inkscape_timeout=30, axidraw_timeout=20):
     """
     Open an SVG in Inkscape, open AxiDraw Control, and click Apply.
+
+    Every call starts a new Inkscape; see inkscape_session for reusing one.
     """
 
     # --------------------------------------------------
@@ -22,17 +117,7 @@ def plot(filename, inkscape_timeout=30, axidraw_timeout=20):
     # --------------------------------------------------
     # 2. WAIT FOR INKSCAPE
     # --------------------------------------------------
-    inkscape_app = None
-    for _ in range(inkscape_timeout):
-        desktop = pyatspi.Registry.getDesktop(0)
-        for app in desktop:
-            if app.name and "inkscape" in app.name.lower():
-                inkscape_app = app
-                break
-        if inkscape_app:
-            break
-        time.sleep(1)
-
+    inkscape_app = atspi_utils.wait_for_event(find_inkscape_app, inkscape_timeout, "Inkscape")
     if not inkscape_app:
         raise RuntimeError("Inkscape not found")
 
@@ -43,106 +128,13 @@ def plot(filename, inkscape_timeout=30, axidraw_timeout=20):
     # time.sleep(1)
 
     # --------------------------------------------------
-    # 4. FIND AXIDRAW MENU ITEM
-    # --------------------------------------------------
-    def find_axidraw(acc):
-        try:
-            if (
-                "menu item" in (acc.getRoleName() or "").lower()
-                and acc.name
-                and "axidraw" in acc.name.lower()
-            ):
-                return acc
-            for i in range(acc.childCount):
-                found = find_axidraw(acc.getChildAtIndex(i))
-                if found:
-                    return found
-        except Exception:
-            pass
-        return None
-
-    axidraw_item = find_axidraw(inkscape_app)
-    if not axidraw_item:
-        raise RuntimeError("AxiDraw menu item not found")
-
-    # --------------------------------------------------
-    # 5. CLICK AXIDRAW
+    # 4-6. CLICK AXIDRAW, WAIT FOR ITS WINDOW
     # --------------------------------------------------
-    try:
-        axidraw_item.queryAction().doAction(0)
-    except Exception:
-        comp = axidraw_item.queryComponent()
-        x, y, w, h = comp.getExtents(pyatspi.DESKTOP_COORDS)
-        subprocess.run(
-            ["xdotool", "mousemove", str(x + w // 2), str(y + h // 2), "click", "1"],
-            check=False,
-        )
-
-    # --------------------------------------------------
-    # 6. WAIT FOR AXIDRAW WINDOW
-    # --------------------------------------------------
-    axidraw_window = None
-    for _ in range(axidraw_timeout):
-        desktop = pyatspi.Registry.getDesktop(0)
-        for app in desktop:
-            for i in range(app.childCount):
-                win = app.getChildAtIndex(i)
-                if win.name and "axidraw" in win.name.lower():
-                    axidraw_window = win
-                    break
-            if axidraw_window:
-                break
-        if axidraw_window:
-            break
-        time.sleep(1)
-
-    if not axidraw_window:
-        raise RuntimeError("AxiDraw Control window not found")
+    axidraw_window = open_axidraw_dialog(inkscape_app, axidraw_timeout)
 
     # --------------------------------------------------
     # 7. FIND & CLICK APPLY
     # --------------------------------------------------
-    def find_apply(acc):
-        try:
-            role = (acc.getRoleName() or "").lower()
-            name = (acc.name or "").strip().lower()
-
-            if "button" in role and name == "apply":
-                return acc
-
-            for i in range(acc.childCount):
-                found = find_apply(acc.getChildAtIndex(i))
-                if found:
-                    return found
-        except Exception:
-            pass
-        return None
-
-    def click(acc):
-        try:
-            action = acc.queryAction()
-            for i in range(action.nActions):
-                if action.getName(i).lower() in ("click", "press"):
-                    action.doAction(i)
-                    return True
-        except Exception:
-            pass
-
-        try:
-            comp = acc.queryComponent()
-            x, y, w, h = comp.getExtents(pyatspi.DESKTOP_COORDS)
-            subprocess.run(
-                ["xdotool", "mousemove", str(x + w // 2), str(y + h // 2), "click", "1"],
-                stdout=subprocess.DEVNULL,
-                stderr=subprocess.DEVNULL,
-                check=False,
-            )
-            return True
-        except Exception:
-            return False
-
-    apply_btn = find_apply(axidraw_window)
-    if not apply_btn or not click(apply_btn):
-        raise RuntimeError("Failed to click Apply")
+    press_apply(axidraw_window)
 
     return True
@@ -0,0 +1,182 @@
+import math
+import shutil
+import subprocess
+import time
+import types
+
+import stroke_page
+
+# --- BACKENDS ---
+# "inkscape": load the SVG in the Inkscape GUI and click AxiDraw > Apply (plot.py)
+# "axidraw":  drive the plotter over USB with pyaxidraw (or the axicli tool), no GUI
+# "fake":     record the moves in memory instead of plotting (CI, dry runs)
+BACKENDS = ("inkscape", "axidraw", "fake")
+# pyaxidraw interactive-mode units: 0 inches, 1 cm, 2 mm
+AXIDRAW_UNITS_MM = 2
+AXICLI_TIMEOUT_S = 3600
+# Keep one Inkscape open across jobs (inkscape_session) instead of
+# starting a new one per job
+INKSCAPE_REUSE = True
+
+
+class FakeAxiDraw:
+    """
+    Stand-in for pyaxidraw's AxiDraw that records moves instead of driving a plotter.
+
+    Supports the calls the AxiDraw backend makes, in interactive mode
+    (connect, moveto, lineto, penup, disconnect) and plot mode
+    (plot_setup, plot_run; the SVG is replayed as moves). Distances are in
+    the units the moves were given in.
+    """
+
+    def __init__(self, connected=True):
+        self.options = types.SimpleNamespace(units=0)
+        self.connected = connected
+        self.moves = []
+        self.svg_path = None
+        self.pen_up = True
+        self.x = self.y = 0.0
+        self.draw_distance = 0.0
+        self.travel_distance = 0.0
+        self.lowers = 0
+
+    def interactive(self):
+        pass
+
+    def connect(self):
+        return self.connected
+
+    def disconnect(self):
+        self.penup()
+
+    def penup(self):
+        self.pen_up = True
+
+    def _go(self, x, y):
+        d = math.hypot(x - self.x, y - self.y)
+        self.x, self.y = x, y
+        return d
+
+    def moveto(self, x, y):
+        self.penup()
+        self.moves.append(("moveto", x, y))
+        self.travel_distance += self._go(x, y)
+
+    def lineto(self, x, y):
+        if self.pen_up:
+            self.pen_up = False
+            self.lowers += 1
+        self.moves.append(("lineto", x, y))
+        self.draw_distance += self._go(x, y)
+
+    def plot_setup(self, svg_path):
+        self.svg_path = svg_path
+
+    def plot_run(self):
+        draw_polylines(self, stroke_page.stroke_list(stroke_page.read_svg(self.svg_path)))
+        self.moveto(0.0, 0.0)
+
+
+def draw_polylines(device, polylines):
+    """Pen-down draw every (n, 2) mm polyline with an interactive-mode device."""
+    for stroke in polylines:
+        coords = stroke.tolist()
+        if not coords:
+            continue
+        device.moveto(*coords[0])
+        # A single-point stroke still puts a dot on the page
+        for x, y in coords[1:] or coords:
+            device.lineto(x, y)
+
+
+class AxiDrawPlotter:
+    """
+    Plots fragments straight through the AxiDraw Python API, without Inkscape.
+
+    A fragment carrying its StrokePage is drawn in interactive mode from
+    the strokes, in their plotting order; otherwise its SVG is plotted in
+    plot mode. `device` is a pyaxidraw AxiDraw or a FakeAxiDraw.
+    """
+
+    def __init__(self, device):
+        self.device = device
+
+    def plot_strokes(self, strokes):
+        ad = self.device
+        ad.interactive()
+        ad.options.units = AXIDRAW_UNITS_MM
+        if not ad.connect():
+            raise RuntimeError("AxiDraw not connected")
+        try:
+            draw_polylines(ad, stroke_page.stroke_list(strokes))
+        finally:
+            # Park at the origin, so the next fragment starts where layout assumes
+            ad.moveto(0.0, 0.0)
+            ad.disconnect()
+
+    def plot_file(self, svg_path):
+        ad = self.device
+        ad.plot_setup(svg_path)
+        ad.plot_run()
+        errors = getattr(ad, "errors", None)
+        if errors is not None and getattr(errors, "code", 0):
+            raise RuntimeError(f"AxiDraw error {errors.code} plotting {svg_path}")
+
+    def __call__(self, fragment):
+        t0 = time.perf_counter()
+        if fragment.strokes is not None:
+            self.plot_strokes(fragment.strokes)
+        else:
+            self.plot_file(fragment.path)
+        print(f"[PLOT] {fragment.path} (page {fragment.page}) plotted in {time.perf_counter() - t0:.1f} s")
+        return True
+
+
+class AxiCliPlotter:
+    """Plots fragment SVGs with the `axicli` command-line tool, for installs without pyaxidraw."""
+
+    def __call__(self, fragment):
+        subprocess.run(["axicli", fragment.path], check=True, timeout=AXICLI_TIMEOUT_S)
+        return True
+
+
+def launch_inkscape(fragment):
+    """Plot a fragment through a new Inkscape instance (plot.plot), logging the latency."""
+    from plot import plot
+
+    import atspi_utils
+
+    t0 = time.perf_counter()
+    saved_before = atspi_utils.stats()["saved_ms"]
+    plot(fragment.path)
+    print(f"[INKSCAPE] {fragment.path}: {time.perf_counter() - t0:.2f} s to Apply (new instance), "
+          f"event waits saved {atspi_utils.stats()['saved_ms'] - saved_before:.0f} ms")
+    return True
+
+
+def get_plotter(backend, device=None):
+    """
+    Callable that plots one PageFragment with the given backend (see BACKENDS).
+
+    "axidraw" uses pyaxidraw when it is installed and falls back to axicli;
+    with neither it raises ImportError. `device` overrides the AxiDraw
+    object, e.g. a FakeAxiDraw.
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown plot backend: {backend}")
+    if backend == "inkscape":
+        # The GUI path needs pyatspi, which is only imported when chosen
+        if INKSCAPE_REUSE:
+            import inkscape_session
+            session = inkscape_session.InkscapeSession()
+            return lambda fragment: session.plot(fragment.path)
+        return launch_inkscape
+    if backend == "fake" or device is not None:
+        return AxiDrawPlotter(device or FakeAxiDraw())
+    try:
+        from pyaxidraw import axidraw
+    except ImportError:
+        if shutil.which("axicli"):
+            return AxiCliPlotter()
+        raise ImportError("AxiDraw backend needs pyaxidraw or the axicli tool")
+    return AxiDrawPlotter(axidraw.AxiDraw())
@@ -0,0 +1,263 @@
+from collections import namedtuple
+from functools import lru_cache
+import re
+
+import numpy as np
+
+import pen_travel
+import svg_symbols
+from glyph import parse_path
+
+# --- PLOTTER MODEL (AxiDraw defaults) ---
+PEN_DOWN_SPEED = 95.0      # mm/s, 25% of the ~380 mm/s carriage maximum
+PEN_UP_SPEED = 285.0       # mm/s, 75%
+ACCELERATION = 1000.0      # mm/s^2
+PEN_LIFT_S = 0.15          # servo raise plus settle
+PEN_LOWER_S = 0.15
+
+# Speeds in mm/s, acceleration in mm/s^2, pen moves in seconds
+PlotterSettings = namedtuple(
+    "PlotterSettings", ["pen_down_speed", "pen_up_speed", "acceleration", "pen_lift_s", "pen_lower_s"]
+)
+DEFAULT_SETTINGS = PlotterSettings(PEN_DOWN_SPEED, PEN_UP_SPEED, ACCELERATION, PEN_LIFT_S, PEN_LOWER_S)
+
+# mm per unit for SVG lengths (user units without a viewBox are CSS px)
+UNIT_MM = {"mm": 1.0, "cm": 10.0, "in": 25.4, "pt": 25.4 / 72, "pc": 25.4 / 6, "px": 25.4 / 96, "": 25.4 / 96}
+
+_TRANSFORM_RE = re.compile(r"(matrix|translate|scale)\s*\(([^)]*)\)")
+_LENGTH_RE = re.compile(r"^\s*([-+]?[\d.]+(?:[eE][-+]?\d+)?)\s*([a-z]*)\s*$")
+
+
+def segment_times(lengths, entry, exit_, speed, accel):
+    """Trapezoidal (or triangular) profile time for each segment."""
+    v_peak = np.sqrt((2.0 * accel * lengths + entry ** 2 + exit_ ** 2) / 2.0)
+    v_peak = np.maximum(np.minimum(v_peak, speed), np.maximum(entry, exit_))
+    ramp = (2 * v_peak ** 2 - entry ** 2 - exit_ ** 2) / (2.0 * accel)
+    cruise = np.maximum(lengths - ramp, 0.0) / np.maximum(v_peak, 1e-9)
+    return (v_peak - entry) / accel + (v_peak - exit_) / accel + cruise
+
+
+def stroke_time(points, offsets, speed=PEN_DOWN_SPEED, accel=ACCELERATION):
+    """
+    Pen-down drawing time (s) for every stroke vertex-to-vertex.
+
+    The pen stops at stroke ends; at an interior vertex it slows with the
+    turn angle (straight through keeps full speed, a reversal stops) and
+    never faster than the shorter neighbouring segment allows.
+    """
+    offsets = np.asarray(offsets)
+    if len(points) < 2:
+        return 0.0
+    delta = np.diff(points, axis=0)
+    lengths = np.hypot(delta[:, 0], delta[:, 1])
+    # Segments between strokes are pen-up moves, not drawn
+    drawn = np.ones(len(delta), dtype=bool)
+    drawn[offsets[1:-1] - 1] = False
+
+    # Junction speed at every point (stroke ends stop)
+    junction = np.zeros(len(points))
+    inner = np.arange(1, len(points) - 1)
+    inner = inner[drawn[inner - 1] & drawn[inner]]
+    if len(inner):
+        a, b = delta[inner - 1], delta[inner]
+        la, lb = lengths[inner - 1], lengths[inner]
+        cos = (a * b).sum(axis=1) / np.maximum(la * lb, 1e-12)
+        turn_speed = speed * np.clip((1.0 + cos) / 2.0, 0.0, 1.0)
+        reach = np.sqrt(accel * np.minimum(la, lb))
+        junction[inner] = np.minimum(turn_speed, reach)
+
+    times = segment_times(lengths, junction[:-1], junction[1:], speed, accel)
+    return float(times[drawn].sum())
+
+
+def estimate_strokes(points, offsets, settings=None, origin=pen_travel.ORIGIN):
+    """
+    Estimated plot of a (points, offsets) stroke array in mm, drawn in order.
+
+    Returns a dict: time_s (total) and its parts draw_s, travel_s, pen_s;
+    pen-down draw_mm and pen-up travel_mm; lifts, strokes and vertices.
+    """
+    settings = settings or DEFAULT_SETTINGS
+    offsets = np.asarray(offsets)
+    strokes = len(offsets) - 1
+    if strokes < 1:
+        return {"time_s": 0.0, "draw_s": 0.0, "travel_s": 0.0, "pen_s": 0.0,
+                "draw_mm": 0.0, "travel_mm": 0.0, "lifts": 0, "strokes": 0, "vertices": 0}
+
+    delta = np.diff(points, axis=0)
+    lengths = np.hypot(delta[:, 0], delta[:, 1])
+    hop_mask = np.zeros(len(delta), dtype=bool)
+    hop_mask[offsets[1:-1] - 1] = True
+    draw_mm = float(lengths[~hop_mask].sum())
+
+    starts, ends = pen_travel.stroke_endpoints(points, offsets)
+    hops = np.vstack([np.asarray(origin, dtype=float)[None, :], ends[:-1]])
+    hop_len = np.hypot(*(starts - hops).T)
+    zero = np.zeros(strokes)
+    travel_s = float(segment_times(hop_len, zero, zero, settings.pen_up_speed, settings.acceleration).sum())
+
+    draw_s = stroke_time(points, offsets, settings.pen_down_speed, settings.acceleration)
+    pen_s = strokes * (settings.pen_lift_s + settings.pen_lower_s)
+    return {
+        "time_s": draw_s + travel_s + pen_s,
+        "draw_s": draw_s,
+        "travel_s": travel_s,
+        "pen_s": pen_s,
+        "draw_mm": draw_mm,
+        "travel_mm": float(hop_len.sum()),
+        "lifts": strokes,
+        "strokes": strokes,
+        "vertices": len(points),
+    }
+
+
+def estimate_page(strokes, settings=None, origin=pen_travel.ORIGIN):
+    """Estimate for plotting a StrokePage (see stroke_page); see estimate_strokes()."""
+    return estimate_strokes(strokes.points, strokes.offsets, settings, origin)
+
+
+def add_estimates(total, estimate):
+    """Sum of two estimates, e.g. for pages or parts of a page plotted one after another."""
+    return estimate if total is None else {k: total[k] + v for k, v in estimate.items()}
+
+
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+
+
+def compose(m, n):
+    """Affine (a, b, c, d, e, f) for applying n, then m (SVG matrix order)."""
+    a, b, c, d, e, f = m
+    a2, b2, c2, d2, e2, f2 = n
+    return (a * a2 + c * b2, b * a2 + d * b2,
+            a * c2 + c * d2, b * c2 + d * d2,
+            a * e2 + c * f2 + e, b * e2 + d * f2 + f)
+
+
+@lru_cache(maxsize=4096)
+def parse_transform(text):
+    """Affine (a, b, c, d, e, f) for an SVG transform list (matrix, translate, scale)."""
+    m = IDENTITY
+    for name, args in _TRANSFORM_RE.findall(text or ""):
+        v = [float(x) for x in re.split(r"[\s,]+", args.strip()) if x]
+        if name == "matrix" and len(v) == 6:
+            t = tuple(v)
+        elif name == "translate" and v:
+            t = (1.0, 0.0, 0.0, 1.0, v[0], v[1] if len(v) > 1 else 0.0)
+        elif name == "scale" and v:
+            t = (v[0], 0.0, 0.0, v[1] if len(v) > 1 else v[0], 0.0, 0.0)
+        else:
+            continue
+        m = compose(m, t)
+    return m
+
+
+@lru_cache(maxsize=4096)
+def _path_strokes(d):
+    points, offsets = parse_path(d)
+    return points.astype(np.float64), offsets
+
+
+def _mm_per_user_unit(root):
+    """Scale from the document's user units to mm, from width and viewBox."""
+    match = _LENGTH_RE.match(root.get("width") or "")
+    view_box = (root.get("viewBox") or "").replace(",", " ").split()
+    if match and len(view_box) == 4 and float(view_box[2]) > 0:
+        value, unit = float(match.group(1)), match.group(2)
+        return value * UNIT_MM.get(unit, UNIT_MM["px"]) / float(view_box[2])
+    return UNIT_MM["px"]
+
+
+def _length_mm(text, scale):
+    """An SVG width/height in mm; unitless lengths are user units at `scale`."""
+    match = _LENGTH_RE.match(text or "")
+    if not match:
+        return 0.0
+    value, unit = float(match.group(1)), match.group(2)
+    return value * scale if not unit else value * UNIT_MM.get(unit, UNIT_MM["px"])
+
+
+def svg_page(svg_path):
+    """
+    (points, offsets, elements, (width_mm, height_mm)) for a written SVG page.
+
+    Points are in mm for every <path> and <use>, in document order;
+    elements gives the index of the element each stroke came from.
+    Transforms on the element, its groups and the referenced symbol are
+    applied; <defs> content is only drawn through <use>. Reads .svgz too.
+    """
+    root = svg_symbols.parse_svg(svg_path)
+    symbols = svg_symbols.symbol_table(root)
+    path_tag, use_tag, g_tag, defs_tag = ("{%s}%s" % (svg_symbols.SVG_NS, t) for t in ("path", "use", "g", "defs"))
+
+    pieces = []
+    sizes = []
+    elements = []
+
+    def add(d, m):
+        points, offsets = _path_strokes(d)
+        if len(offsets) < 2:
+            return
+        a, b, c, d_, e, f = m
+        out = np.empty_like(points)
+        out[:, 0] = points[:, 0] * a + points[:, 1] * c + e
+        out[:, 1] = points[:, 0] * b + points[:, 1] * d_ + f
+        pieces.append(out)
+        sizes.append(np.diff(offsets))
+        elements.append(len(offsets) - 1)
+
+    def walk(el, matrix):
+        for child in el:
+            tag = child.tag
+            if tag == defs_tag:
+                continue
+            transform = child.get("transform")
+            m = compose(matrix, parse_transform(transform)) if transform else matrix
+            if tag == path_tag:
+                add(child.get("d"), m)
+            elif tag == use_tag:
+                target = svg_symbols.use_target(child, symbols)
+                if target is not None and target.tag == path_tag:
+                    if child.get("x") or child.get("y"):
+                        m = compose(m, (1.0, 0.0, 0.0, 1.0, float(child.get("x", 0)), float(child.get("y", 0))))
+                    add(target.get("d"), compose(m, parse_transform(target.get("transform"))))
+            elif tag == g_tag:
+                walk(child, m)
+
+    scale = _mm_per_user_unit(root)
+    walk(root, (scale, 0.0, 0.0, scale, 0.0, 0.0))
+    size = (_length_mm(root.get("width"), scale), _length_mm(root.get("height"), scale))
+
+    if not pieces:
+        return np.zeros((0, 2)), np.zeros(1, dtype=np.intp), np.zeros(0, dtype=np.intp), size
+    offsets = np.zeros(sum(len(s) for s in sizes) + 1, dtype=np.intp)
+    np.cumsum(np.concatenate(sizes), out=offsets[1:])
+    labels = np.repeat(np.arange(len(elements)), elements)
+    return np.concatenate(pieces), offsets, labels, size
+
+
+def svg_strokes(svg_path):
+    """(points, offsets) in mm for every <path> and <use> of an SVG; see svg_page()."""
+    points, offsets, _, _ = svg_page(svg_path)
+    return points, offsets
+
+
+def estimate_svg(svg_path, settings=None):
+    """Estimate for plotting a written SVG page; see estimate_strokes()."""
+    points, offsets = svg_strokes(svg_path)
+    return estimate_strokes(points, offsets, settings)
+
+
+def estimate_files(svg_paths, settings=None):
+    """Combined estimate for several pages, e.g. a job's page fragments."""
+    total = None
+    for path in svg_paths:
+        total = add_estimates(total, estimate_svg(path, settings))
+    return total or estimate_strokes(np.zeros((0, 2)), np.zeros(1, dtype=np.intp), settings)
+
+
+def describe_duration(seconds):
+    """Spoken form of a duration: 'about 40 seconds', 'about 3 minutes'."""
+    if seconds < 60:
+        return f"about {max(5, int(round(seconds / 5.0)) * 5)} seconds"
+    minutes = int(round(seconds / 60.0))
+    return "about 1 minute" if minutes == 1 else f"about {minutes} minutes"
@@ -0,0 +1,276 @@
+import os
+import struct
+import zlib
+
+import numpy as np
+
+import plot_time
+
+# --- PREVIEW SETUP ---
+PREVIEW_DPMM = 2.0         # pixels per mm: 420 x 594 for A4
+PEN_WIDTH_MM = 0.5
+PAPER = 255
+INK = 0
+# Golden comparisons forgive strokes that moved by up to this many pixels
+GOLDEN_SHIFT_PX = 1
+
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+
+def page_shape(size_mm, dpmm=PREVIEW_DPMM):
+    """(rows, cols) of a preview for a (width_mm, height_mm) page."""
+    width, height = size_mm
+    return max(1, int(np.ceil(height * dpmm))), max(1, int(np.ceil(width * dpmm)))
+
+
+def _pen_offsets(pen_mm, dpmm):
+    """(dy, dx) pixel offsets covered by a round pen centred on a pixel."""
+    r = pen_mm * dpmm / 2.0
+    span = int(np.floor(r))
+    dy, dx = np.mgrid[-span:span + 1, -span:span + 1]
+    inside = dy ** 2 + dx ** 2 <= max(r * r, 0.0)
+    return dy[inside], dx[inside]
+
+
+def ink_pixels(points, offsets, shape, dpmm=PREVIEW_DPMM, pen_mm=PEN_WIDTH_MM):
+    """
+    (pixels, strokes): flat pixel index and stroke number for every inked sample.
+
+    Each drawn segment is sampled at least twice per pixel, every vertex is
+    drawn (so single-point strokes leave a dot) and the samples are widened
+    to the pen's footprint. Pixels may repeat; off-page ink is dropped.
+    """
+    offsets = np.asarray(offsets)
+    if len(points) == 0:
+        return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+    px = points * dpmm
+    vertex_stroke = np.repeat(np.arange(len(offsets) - 1), np.diff(offsets))
+
+    drawn = np.ones(max(len(px) - 1, 0), dtype=bool)
+    drawn[offsets[1:-1] - 1] = False
+    seg = np.flatnonzero(drawn)
+    a, b = px[seg], px[seg + 1]
+    counts = np.ceil(2.0 * np.hypot(*(b - a).T)).astype(np.intp) + 1
+    which = np.repeat(np.arange(len(seg)), counts)
+    first = np.repeat(np.cumsum(counts) - counts, counts)
+    t = (np.arange(int(counts.sum())) - first) / np.maximum(counts[which] - 1, 1)
+    samples = np.vstack([px, a[which] + (b - a)[which] * t[:, None]])
+    strokes = np.concatenate([vertex_stroke, vertex_stroke[seg][which]])
+
+    cols = np.floor(samples[:, 0]).astype(np.intp)
+    rows = np.floor(samples[:, 1]).astype(np.intp)
+    dy, dx = _pen_offsets(pen_mm, dpmm)
+    if len(dy) > 1:
+        rows = (rows[:, None] + dy).ravel()
+        cols = (cols[:, None] + dx).ravel()
+        strokes = np.repeat(strokes, len(dy))
+
+    height, width = shape
+    on_page = (rows >= 0) & (rows < height) & (cols >= 0) & (cols < width)
+    return rows[on_page] * width + cols[on_page], strokes[on_page]
+
+
+def render_strokes(points, offsets, size_mm, dpmm=PREVIEW_DPMM, pen_mm=PEN_WIDTH_MM, image=None):
+    """Grayscale uint8 preview of a stroke array in mm: INK on PAPER (drawn into `image` if given)."""
+    shape = page_shape(size_mm, dpmm)
+    if image is None:
+        image = np.full(shape, PAPER, dtype=np.uint8)
+    pixels, _ = ink_pixels(points, offsets, shape, dpmm, pen_mm)
+    image.ravel()[pixels] = INK
+    return image
+
+
+def overprints(points, offsets, labels, size_mm, dpmm=PREVIEW_DPMM, pen_mm=PEN_WIDTH_MM):
+    """
+    [(label_a, label_b, pixels, x_mm, y_mm)] for every pair of labels whose ink overlaps.
+
+    `labels` tags each stroke (e.g. with its placed glyph); strokes sharing a
+    label may cross freely. Pairs come most-overlapping first, with the
+    position of one shared pixel.
+    """
+    shape = page_shape(size_mm, dpmm)
+    pixels, strokes = ink_pixels(points, offsets, shape, dpmm, pen_mm)
+    labels = np.asarray(labels, dtype=np.intp)
+    n_labels = int(labels.max()) + 1 if len(labels) else 1
+    keys = np.unique(pixels * n_labels + labels[strokes])
+    pixel, label = np.divmod(keys, n_labels)
+
+    # Keys are sorted by pixel: a pixel repeated means more than one label inked it
+    shared = np.flatnonzero(pixel[1:] == pixel[:-1])
+    if not len(shared):
+        return []
+    pairs = label[shared] * n_labels + label[shared + 1]
+    found, first, count = np.unique(pairs, return_index=True, return_counts=True)
+    result = []
+    for k in np.argsort(-count, kind="stable"):
+        a, b = divmod(int(found[k]), n_labels)
+        row, col = divmod(int(pixel[shared[first[k]]]), shape[1])
+        result.append((a, b, int(count[k]), (col + 0.5) / dpmm, (row + 0.5) / dpmm))
+    return result
+
+
+def render_page(strokes, dpmm=PREVIEW_DPMM, pen_mm=PEN_WIDTH_MM, image=None):
+    """Preview image of a StrokePage (see stroke_page), or of part of a page added to `image`."""
+    return render_strokes(strokes.points, strokes.offsets, strokes.size_mm, dpmm, pen_mm, image)
+
+
+def render_svg(svg_path, dpmm=PREVIEW_DPMM, pen_mm=PEN_WIDTH_MM):
+    """Preview image of a written .svg/.svgz page."""
+    points, offsets, _, size = plot_time.svg_page(svg_path)
+    return render_strokes(points, offsets, size, dpmm, pen_mm)
+
+
+def preview_svg(svg_path, png_path=None, dpmm=PREVIEW_DPMM, pen_mm=PEN_WIDTH_MM):
+    """Render a written page to a PNG next to it (or png_path); returns the image."""
+    image = render_svg(svg_path, dpmm, pen_mm)
+    write_png(png_path or os.path.splitext(svg_path)[0] + ".png", image)
+    return image
+
+
+def sheet_path(preview_dir, page):
+    """Preview PNG that collects everything plotted on one page's sheet."""
+    return os.path.join(preview_dir, f"page{page:03d}.png")
+
+
+def add_to_sheet(image, sheet_png):
+    """
+    Draw a fragment's preview into its sheet preview; returns the overprinted area in mm^2.
+
+    The overprint is the ink the fragment puts on ink already on the sheet,
+    i.e. new text written over text plotted earlier. The sheet PNG is
+    created on the first fragment of a page; image and sheet share one
+    resolution (PREVIEW_DPMM).
+    """
+    overlap = 0.0
+    if os.path.exists(sheet_png):
+        sheet = read_png(sheet_png)
+        if sheet.shape == image.shape:
+            overlap = float(((image < PAPER) & (sheet < PAPER)).sum()) / (PREVIEW_DPMM * PREVIEW_DPMM)
+            image = np.minimum(image, sheet)
+    write_png(sheet_png, image)
+    return overlap
+
+
+def clear_sheets(preview_dir):
+    """Remove every sheet preview, e.g. when the session starts on a fresh page."""
+    if not os.path.isdir(preview_dir):
+        return
+    for name in os.listdir(preview_dir):
+        if name.startswith("page") and name.endswith(".png"):
+            os.remove(os.path.join(preview_dir, name))
+
+
+def _chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+
+
+def write_png(png_path, image):
+    """Write a 2-D uint8 array as an 8-bit grayscale PNG."""
+    image = np.ascontiguousarray(image, dtype=np.uint8)
+    height, width = image.shape
+    # Filter type 0 (none) in front of every row
+    raw = np.hstack([np.zeros((height, 1), dtype=np.uint8), image]).tobytes()
+    data = (PNG_SIGNATURE
+            + _chunk(b"IHDR", struct.pack(">IIBBBBB", width, height, 8, 0, 0, 0, 0))
+            + _chunk(b"IDAT", zlib.compress(raw, 6))
+            + _chunk(b"IEND", b""))
+    tmp_path = f"{png_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, png_path)
+
+
+def read_png(png_path):
+    """
+    2-D uint8 array from an 8-bit grayscale PNG as written by write_png().
+
+    Other PNG flavours (colour, palettes, interlacing, row filters) raise
+    ValueError.
+    """
+    with open(png_path, "rb") as f:
+        data = f.read()
+    if not data.startswith(PNG_SIGNATURE):
+        raise ValueError(f"{png_path} is not a PNG")
+
+    pos = len(PNG_SIGNATURE)
+    header = None
+    idat = []
+    while pos < len(data):
+        (length,) = struct.unpack(">I", data[pos:pos + 4])
+        kind = data[pos + 4:pos + 8]
+        body = data[pos + 8:pos + 8 + length]
+        pos += 12 + length
+        if kind == b"IHDR":
+            header = struct.unpack(">IIBBBBB", body)
+        elif kind == b"IDAT":
+            idat.append(body)
+        elif kind == b"IEND":
+            break
+
+    if header is None or header[2:] != (8, 0, 0, 0, 0):
+        raise ValueError(f"{png_path}: only 8-bit grayscale, non-interlaced PNGs are supported")
+    width, height = header[:2]
+    rows = np.frombuffer(zlib.decompress(b"".join(idat)), dtype=np.uint8).reshape(height, width + 1)
+    if rows[:, 0].any():
+        raise ValueError(f"{png_path}: filtered PNG rows are not supported")
+    return rows[:, 1:].copy()
+
+
+def _spread(ink, shift_px):
+    """Ink mask grown by shift_px pixels in every direction."""
+    out = ink.copy()
+    height, width = ink.shape
+    for dy in range(-shift_px, shift_px + 1):
+        for dx in range(-shift_px, shift_px + 1):
+            out[max(dy, 0):height + min(dy, 0), max(dx, 0):width + min(dx, 0)] |= \
+                ink[max(-dy, 0):height + min(-dy, 0), max(-dx, 0):width + min(-dx, 0)]
+    return out
+
+
+def compare_images(image, golden, shift_px=GOLDEN_SHIFT_PX):
+    """
+    (extra, missing) ink pixels of image against golden.
+
+    Ink within shift_px of ink in the other image counts as matching, so
+    sub-pixel rounding changes do not fail a comparison.
+    """
+    if image.shape != golden.shape:
+        raise ValueError(f"image is {image.shape}, golden is {golden.shape}")
+    ink, gold = image < PAPER, golden < PAPER
+    extra = int((ink & ~_spread(gold, shift_px)).sum())
+    missing = int((gold & ~_spread(ink, shift_px)).sum())
+    return extra, missing
+
+
+def diff_image(image, golden, shift_px=GOLDEN_SHIFT_PX):
+    """Grayscale diff: shared ink light gray, extra ink black, missing ink mid gray."""
+    ink, gold = image < PAPER, golden < PAPER
+    out = np.full(image.shape, PAPER, dtype=np.uint8)
+    out[ink & gold] = 200
+    out[gold & ~_spread(ink, shift_px)] = 128
+    out[ink & ~_spread(gold, shift_px)] = INK
+    return out
+
+
+def matches_golden(image, golden_path, shift_px=GOLDEN_SHIFT_PX, max_pixels=0, diff_path=None, regenerate=False):
+    """
+    True if image matches the golden PNG to within max_pixels differing pixels.
+
+    A missing golden raises FileNotFoundError; with regenerate=True the
+    golden is (re)written from image instead. On a mismatch the diff is
+    saved to diff_path, if given (the golden's directory is left alone).
+    """
+    if regenerate:
+        write_png(golden_path, image)
+        print(f"[PREVIEW] Wrote golden image: {golden_path}")
+        return True
+    if not os.path.exists(golden_path):
+        raise FileNotFoundError(f"No golden image {golden_path} (regenerate it to create one)")
+    golden = read_png(golden_path)
+    extra, missing = compare_images(image, golden, shift_px)
+    if extra + missing <= max_pixels:
+        return True
+    if diff_path:
+        write_png(diff_path, diff_image(image, golden, shift_px))
+    print(f"[PREVIEW] {golden_path}: {extra} extra, {missing} missing ink pixels (diff: {diff_path or 'not saved'})")
+    return False
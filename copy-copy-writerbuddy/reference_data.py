@@ -0,0 +1,150 @@
+"""
+Reference inputs and legacy implementations shared by bench.py and the tests.
+"""
+
+import random
+
+import atspi_utils
+
+
+# Dictation-style utterances used as the line-breaking reference corpus
+REFERENCE_UTTERANCES = [
+    "dear grandma thank you for the lovely birthday present",
+    "i hope you are feeling better and that the garden is growing well this spring",
+    "we went to the beach on sunday and built a very big sandcastle with a moat",
+    "please remember to buy milk eggs bread and some apples on the way home",
+    "the meeting has been moved to thursday afternoon at three o clock",
+    "it was a dark and stormy night and the rain fell in torrents",
+    "happy anniversary to the most wonderful parents anyone could ask for",
+    "notes for chapter four photosynthesis converts light energy into chemical energy",
+    "i am writing to let you know that your order has been shipped",
+    "a b c d e f g h i j k l m n o p",
+    "internationalization and telecommunications infrastructure modernization",
+    "see you soon",
+    "the quick brown fox jumps over the lazy dog while the cat watches from the window",
+    "thank you",
+    "remember to water the plants feed the cat and lock the back door before you leave",
+]
+
+
+def legacy_split_to_lines(text, max_words=8):
+    """Original word-count line breaker from main.py."""
+    words = text.split()
+    lines, current = [], []
+
+    for w in words:
+        current.append(w)
+        if len(current) >= max_words:
+            lines.append(" ".join(current))
+            current = []
+
+    if current:
+        lines.append(" ".join(current))
+
+    return lines
+
+
+def legacy_wrap_text_to_width(text, glyphs, units_per_em, text_height_mm, max_width):
+    """Original per-character wrap loop, kept as the reference for `wrap`."""
+    scale = text_height_mm / units_per_em
+    space_width = text_height_mm * 0.6
+
+    words = text.split()
+    lines = []
+    current_line = ""
+    current_width = 0
+
+    for word in words:
+        word_width = 0
+        for char in word:
+            if char in glyphs:
+                adv = glyphs[char][1]
+                word_width += adv * scale
+
+        if current_line:
+            word_width += space_width
+
+        if current_width + word_width <= max_width:
+            if current_line:
+                current_line += " " + word
+                current_width += space_width
+            else:
+                current_line = word
+            current_width += word_width - (space_width if current_line != word else 0)
+        else:
+            if current_line:
+                lines.append(current_line)
+            current_line = word
+            current_width = word_width - space_width if word_width > space_width else word_width
+
+    if current_line:
+        lines.append(current_line)
+
+    return lines
+
+
+def random_corpus(glyphs, n_words, seed):
+    """Random words from the font's characters, with some unknown characters mixed in."""
+    rng = random.Random(seed)
+    alphabet = [c for c in glyphs if len(c) == 1 and not c.isspace()]
+    alphabet += ["\u4e2d", "\U0001F600"]
+    words = []
+    for _ in range(n_words):
+        n = rng.choice([1, 2, 3, 4, 5, 6, 8, 12, 20, 60])
+        words.append("".join(rng.choice(alphabet) for _ in range(n)))
+    return " ".join(words)
+
+
+class TreeNode:
+    """Accessible-like node (name, role, SHOWING, children) standing in for a D-Bus accessible."""
+
+    def __init__(self, name, role, children=(), showing=True):
+        self.name = name
+        self.role = role
+        self.children = list(children)
+        self.showing = showing
+
+    def getRoleName(self):
+        return self.role
+
+    @property
+    def childCount(self):
+        return len(self.children)
+
+    def getChildAtIndex(self, i):
+        return self.children[i]
+
+    def getState(self):
+        return self
+
+    def contains(self, state):
+        return state == atspi_utils.STATE_SHOWING and self.showing
+
+
+def inkscape_tree(menus, items, widgets):
+    """
+    Inkscape-shaped window: a menu bar with AxiDraw last under Extensions,
+    a toolbar, and docked dialogs of which only the front tab is showing.
+    Items of the closed menus are not showing.
+    """
+    bar = [TreeNode(f"Menu {m}", "menu", [TreeNode(f"Item {m}.{i}", "menu item", showing=False)
+                                          for i in range(items)]) for m in range(menus)]
+    extensions = [TreeNode(f"Extension {i}", "menu item", showing=False) for i in range(items)]
+    extensions.append(TreeNode("AxiDraw", "menu", [TreeNode("AxiDraw Control...", "menu item", showing=False)],
+                               showing=False))
+    bar.append(TreeNode("Extensions", "menu", extensions))
+    tools = TreeNode("", "tool bar", [TreeNode(f"Tool {w}", "push button") for w in range(widgets)])
+    docks = [TreeNode(f"Dialog {d}", "panel", [TreeNode(f"Field {d}.{w}", "text") for w in range(widgets)],
+                      showing=d == 0) for d in range(10)]
+    window = TreeNode("drawing.svg - Inkscape", "frame",
+                      [TreeNode("", "menu bar", bar), tools, TreeNode("", "page tab list", docks)])
+    return TreeNode("inkscape", "application", [window])
+
+
+def axidraw_dialog(widgets):
+    """AxiDraw Control-shaped window: tabs of options (one showing), Apply at the bottom."""
+    tabs = [TreeNode(f"Tab {t}", "page tab", [TreeNode(f"Option {t}.{w}", "check box") for w in range(widgets)],
+                     showing=t == 0) for t in range(8)]
+    return TreeNode("AxiDraw Control", "dialog", [TreeNode("", "page tab list", tabs),
+                                                    TreeNode("", "filler", [TreeNode("Close", "push button"),
+                                                                            TreeNode("Apply", "push button")])])
@@ -0,0 +1,98 @@
+import numpy as np
+
+import font_registry
+from stroke_merge import polyline_path_data
+
+_NO_MERGE = {}
+
+
+def _ranges(starts, ends):
+    """Indices starts[i]+1 .. ends[i]-1 for every segment, plus the segment of each."""
+    counts = ends - starts - 1
+    seg = np.repeat(np.arange(len(starts)), counts)
+    base = np.repeat(np.cumsum(counts) - counts, counts)
+    return np.repeat(starts + 1, counts) + (np.arange(int(counts.sum())) - base), seg
+
+
+def simplify_strokes(points, offsets, tolerance):
+    """
+    Ramer-Douglas-Peucker simplification of every stroke at once.
+
+    Each round measures all interior points of all open segments against
+    their chords in one vector pass and splits every segment whose farthest
+    point is beyond tolerance. Stroke endpoints are always kept. Returns
+    (points, offsets).
+    """
+    offsets = np.asarray(offsets)
+    if tolerance <= 0 or len(points) == 0:
+        return points, offsets
+
+    keep = np.zeros(len(points), dtype=bool)
+    keep[offsets[:-1]] = True
+    keep[offsets[1:] - 1] = True
+
+    starts = offsets[:-1].astype(np.intp)
+    ends = offsets[1:].astype(np.intp) - 1
+    open_ = ends - starts >= 2
+    starts, ends = starts[open_], ends[open_]
+
+    while len(starts):
+        idx, seg = _ranges(starts, ends)
+        a = points[starts][seg]
+        chord = points[ends][seg] - a
+        rel = points[idx] - a
+        # Distance to the chord segment, not its line: a point past either end
+        # (e.g. a stroke doubling back) must not be dropped. Closed segments
+        # (chord of zero length) measure distance to the start.
+        length2 = chord[:, 0] ** 2 + chord[:, 1] ** 2
+        t = (rel[:, 0] * chord[:, 0] + rel[:, 1] * chord[:, 1]) / np.where(length2 > 0, length2, 1.0)
+        t = np.clip(t, 0.0, 1.0)
+        dist = np.hypot(rel[:, 0] - t * chord[:, 0], rel[:, 1] - t * chord[:, 1])
+
+        # Farthest point per segment: first entry of each segment sorted by distance
+        order = np.lexsort((-dist, seg))
+        first = np.r_[0, np.flatnonzero(np.diff(seg[order])) + 1]
+        far = order[first]
+        split = dist[far] > tolerance
+
+        mid = idx[far][split]
+        keep[mid] = True
+        s, e = starts[split], ends[split]
+        starts = np.concatenate([s, mid])
+        ends = np.concatenate([mid, e])
+        open_ = ends - starts >= 2
+        starts, ends = starts[open_], ends[open_]
+
+    counts = np.add.reduceat(keep, offsets[:-1]) if len(offsets) > 1 else np.zeros(0, dtype=np.intp)
+    new_offsets = np.zeros(len(offsets), dtype=offsets.dtype)
+    np.cumsum(counts, out=new_offsets[1:])
+    return points[keep], new_offsets
+
+
+def simplified_glyphs(glyphs, tolerance, merged=None):
+    """
+    {char: (points, offsets, vertices_removed, d)} for glyphs simplification changes.
+
+    Tolerance is in font units. Glyphs in `merged` (see
+    stroke_merge.merged_glyphs) are simplified from their merged strokes.
+    Computed once per resident font, tolerance and merged outlines (see
+    font_registry.derived).
+    """
+    merged = merged or _NO_MERGE
+    cache = font_registry.derived(glyphs)
+    key = ("simplified", tolerance, id(merged))
+    entry = cache.get(key)
+    if entry is not None and entry[0] is merged:
+        return entry[1]
+
+    simplified = {}
+    if tolerance > 0:
+        for char, g in glyphs.items():
+            points, offsets = merged[char][:2] if char in merged else (g.points, g.offsets)
+            new_points, new_offsets = simplify_strokes(points, offsets, tolerance)
+            if len(new_points) < len(points):
+                simplified[char] = (new_points, new_offsets, len(points) - len(new_points),
+                                    polyline_path_data(new_points, new_offsets))
+
+    cache[key] = (merged, simplified)
+    return simplified
@@ -0,0 +1,69 @@
+import threading
+import time
+from contextlib import contextmanager
+
+# Taken when this module is first imported; main.py imports it before anything heavy
+PROCESS_T0 = time.perf_counter()
+
+
+class BackgroundTask:
+    """Run fn in a daemon thread; result() joins and re-raises its exception."""
+
+    def __init__(self, fn, name=None):
+        self._result = None
+        self._error = None
+        self._thread = threading.Thread(target=self._run, args=(fn,), name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self, fn):
+        try:
+            self._result = fn()
+        except BaseException as e:
+            self._error = e
+
+    def done(self):
+        return not self._thread.is_alive()
+
+    def result(self):
+        self._thread.join()
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+
+class StartupTimer:
+    """Records named startup steps (from any thread) and prints a breakdown."""
+
+    def __init__(self, t0=PROCESS_T0):
+        self.t0 = t0
+        self.steps = []
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def step(self, name):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            with self._lock:
+                self.steps.append((name, threading.current_thread().name, start - self.t0, end - start))
+
+    def background(self, name, fn):
+        """Start fn on a background thread, timed as step `name`."""
+        def run():
+            with self.step(name):
+                return fn()
+        return BackgroundTask(run, name)
+
+    def report(self, label="time to first listen"):
+        """Print every step and the total since t0; returns the total in seconds."""
+        total = time.perf_counter() - self.t0
+        print("\n[STARTUP]")
+        with self._lock:
+            steps = sorted(self.steps, key=lambda s: s[2])
+        for name, thread, start, duration in steps:
+            where = "" if thread == "MainThread" else f" ({thread})"
+            print(f"  {start * 1000:8.1f} ms  +{duration * 1000:8.1f} ms  {name}{where}")
+        print(f"[STARTUP] {label}: {total:.2f} s")
+        return total
@@ -0,0 +1,137 @@
+import numpy as np
+
+import font_registry
+
+
+def _closest(p, starts, ends, free, tolerance):
+    """(stroke, at_end) of the free stroke endpoint nearest p within tolerance, or None."""
+    ds = np.hypot(starts[:, 0] - p[0], starts[:, 1] - p[1])
+    de = np.hypot(ends[:, 0] - p[0], ends[:, 1] - p[1])
+    ds[~free] = np.inf
+    de[~free] = np.inf
+    i, j = int(np.argmin(ds)), int(np.argmin(de))
+    if min(ds[i], de[j]) > tolerance:
+        return None
+    return (i, False) if ds[i] <= de[j] else (j, True)
+
+
+def merge_strokes(points, offsets, tolerance):
+    """
+    Join strokes whose endpoints lie within tolerance into longer polylines.
+
+    Each chain grows from its tail, then its head, with the nearest free
+    stroke endpoint, reversing strokes as needed. A gap up to tolerance is
+    bridged by a straight segment; exactly shared points are not repeated.
+    Returns (points, offsets, lifts_removed).
+    """
+    offsets = np.asarray(offsets)
+    n = len(offsets) - 1
+    if n < 2:
+        return points, offsets, 0
+
+    starts, ends = points[offsets[:-1]], points[offsets[1:] - 1]
+    free = np.ones(n, dtype=bool)
+    chains = []
+    for seed in range(n):
+        if not free[seed]:
+            continue
+        free[seed] = False
+        chain = [(seed, False)]
+        tail, head = ends[seed], starts[seed]
+
+        while free.any():
+            hit = _closest(tail, starts, ends, free, tolerance)
+            if hit is None:
+                break
+            i, flip = hit
+            chain.append((i, flip))
+            free[i] = False
+            tail = starts[i] if flip else ends[i]
+
+        while free.any():
+            hit = _closest(head, starts, ends, free, tolerance)
+            if hit is None:
+                break
+            # A stroke ending at the head goes first as is; one starting there is reversed
+            i, at_end = hit
+            chain.insert(0, (i, not at_end))
+            free[i] = False
+            head = ends[i] if not at_end else starts[i]
+
+        chains.append(chain)
+
+    if len(chains) == n:
+        return points, offsets, 0
+
+    pieces = []
+    new_offsets = [0]
+    for chain in chains:
+        length = 0
+        last = None
+        for i, flip in chain:
+            stroke = points[offsets[i]:offsets[i + 1]]
+            if flip:
+                stroke = stroke[::-1]
+            if last is not None and np.array_equal(stroke[0], last):
+                stroke = stroke[1:]
+            pieces.append(stroke)
+            length += len(stroke)
+            last = stroke[-1] if len(stroke) else last
+        new_offsets.append(new_offsets[-1] + length)
+
+    return np.concatenate(pieces), np.array(new_offsets, dtype=offsets.dtype), n - len(chains)
+
+
+def join_consecutive(offsets, starts, ends, tolerance, labels=None):
+    """
+    Drop the pen lift between consecutive strokes whose end and start meet.
+
+    For a page whose strokes are already ordered and oriented (see
+    pen_travel): stroke i+1 continues stroke i when its start lies within
+    tolerance of stroke i's end and, if labels are given, both share a
+    label. Returns (offsets, labels, lifts_removed).
+    """
+    offsets = np.asarray(offsets)
+    if len(offsets) < 3:
+        return offsets, labels, 0
+    gaps = np.hypot(*(starts[1:] - ends[:-1]).T)
+    join = gaps <= tolerance
+    if labels is not None:
+        labels = np.asarray(labels)
+        join &= labels[1:] == labels[:-1]
+        labels = labels[np.r_[True, ~join]]
+    keep = np.r_[True, ~join, True]
+    return offsets[keep], labels, int(join.sum())
+
+
+def polyline_path_data(points, offsets):
+    """M/L path data for a stroke array."""
+    parts = []
+    for a, b in zip(offsets[:-1].tolist(), offsets[1:].tolist()):
+        coords = points[a:b].tolist()
+        parts.append("M " + " L ".join(f"{x:g} {y:g}" for x, y in coords))
+    return " ".join(parts)
+
+
+def merged_glyphs(glyphs, tolerance):
+    """
+    {char: (points, offsets, lifts_removed, d)} for glyphs that merging changes.
+
+    Tolerance is in font units. Computed once per resident font and
+    tolerance (see font_registry.derived); glyphs with nothing to merge are
+    left out and keep their own outline.
+    """
+    cache = font_registry.derived(glyphs)
+    key = ("merged", tolerance)
+    if key in cache:
+        return cache[key]
+
+    merged = {}
+    if tolerance > 0:
+        for char, g in glyphs.items():
+            points, offsets, removed = merge_strokes(g.points, g.offsets, tolerance)
+            if removed:
+                merged[char] = (points, offsets, removed, polyline_path_data(points, offsets))
+
+    cache[key] = merged
+    return merged
@@ -0,0 +1,49 @@
+from collections import namedtuple
+
+import numpy as np
+
+import plot_time
+
+# One page of pen strokes in plotting order: the hand-off from layout to the
+# SVG writer, preview, estimator and plot backends.
+#   page      layout page id
+#   size_mm   (width, height) of the sheet
+#   mode      output mode the page was laid out for (see cleaned_svgout)
+#   quality   plot quality its outlines were built at
+#   points    (N, 2) float mm page coordinates
+#   offsets   stroke boundaries into points (len S + 1)
+#   groups    output element of every stroke (len S, non-decreasing): one
+#             glyph in glyph/symbol pages, one path in line/word pages
+#   chars     glyph/symbol pages: the character drawn as each group
+#   origins   glyph/symbol pages: (x, y) top-left placement of each group
+StrokePage = namedtuple(
+    "StrokePage",
+    ["page", "size_mm", "mode", "quality", "points", "offsets", "groups", "chars", "origins"],
+    defaults=((), ()),
+)
+
+
+def group_ranges(strokes):
+    """[(first_stroke, end_stroke)] of every group, in order."""
+    groups = np.asarray(strokes.groups)
+    if not len(groups):
+        return []
+    bounds = np.concatenate([[0], np.flatnonzero(np.diff(groups)) + 1, [len(groups)]]).tolist()
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+def stroke_list(strokes):
+    """Every stroke as its own (n, 2) point array view, for backends that draw one at a time."""
+    offsets = np.asarray(strokes.offsets).tolist()
+    return [strokes.points[a:b] for a, b in zip(offsets[:-1], offsets[1:])]
+
+
+def read_svg(svg_path, page=None):
+    """
+    StrokePage from a written .svg/.svgz page, for work that only has the file.
+
+    Every <path> or <use> element becomes one group; mode and quality are
+    unknown (None).
+    """
+    points, offsets, elements, size = plot_time.svg_page(svg_path)
+    return StrokePage(page, size, None, None, points, offsets, elements)
@@ -0,0 +1,168 @@
+import gzip
+import os
+from xml.sax.saxutils import escape
+
+# Attribute escaping as done by ElementTree when svgwrite serializes
+_ATTR_ENTITIES = {'"': "&quot;", "\n": "&#10;", "\r": "&#13;", "\t": "&#09;"}
+
+SVG_HEADER = '<?xml version="1.0" encoding="utf-8" ?>\n'
+SVG_NAMESPACES = {
+    "xmlns": "http://www.w3.org/2000/svg",
+    "xmlns:ev": "http://www.w3.org/2001/xml-events",
+    "xmlns:xlink": "http://www.w3.org/1999/xlink",
+}
+
+
+def attr_name(name):
+    """svgwrite keyword naming: stroke_width -> stroke-width, class_ -> class."""
+    return name.rstrip("_").replace("_", "-")
+
+
+def attr_string(attribs, tiny=True):
+    """Serialize attributes the way svgwrite does: sorted, empty ones dropped."""
+    parts = []
+    for name, value in sorted(attribs.items()):
+        if value is None:
+            continue
+        if isinstance(value, float) and tiny:
+            value = round(value, 4)
+        value = str(value)
+        if value:
+            parts.append(f' {name}="{escape(value, _ATTR_ENTITIES)}"')
+    return "".join(parts)
+
+
+class StreamElement:
+    """A leaf element (e.g. <path>) waiting to be written."""
+
+    __slots__ = ("name", "attribs")
+
+    def __init__(self, name, attribs):
+        self.name = name
+        self.attribs = attribs
+
+
+class StreamGroup:
+    """
+    A <g> whose children are written as soon as they are added.
+
+    The start tag is written with the first child, so update() may still
+    change the group's attributes until then.
+    """
+
+    def __init__(self, drawing, attribs):
+        self.drawing = drawing
+        self.attribs = attribs
+        self.started = False
+        self.closed = False
+
+    def update(self, attribs):
+        if self.started:
+            raise RuntimeError("Group attributes must be set before adding children")
+        self.attribs.update({attr_name(k): v for k, v in attribs.items()})
+
+    def add(self, element):
+        if not self.started:
+            self.drawing.start_body()
+            self.drawing.write(f"<g{attr_string(self.attribs, self.drawing.tiny)}>")
+            self.started = True
+        self.drawing.write_element(element)
+        return element
+
+    def close(self):
+        if self.closed:
+            return
+        if self.started:
+            self.drawing.write("</g>")
+        else:
+            self.drawing.start_body()
+            self.drawing.write(f"<g{attr_string(self.attribs, self.drawing.tiny)} />")
+        self.closed = True
+
+
+class StreamDefs:
+    """The document's <defs>; elements can be added until the body starts."""
+
+    def __init__(self, drawing):
+        self.drawing = drawing
+        self.opened = False
+
+    def add(self, element):
+        if self.drawing.body_started:
+            raise RuntimeError("Definitions must be added before the drawing body")
+        if not self.opened:
+            self.drawing.write("<defs>")
+            self.opened = True
+        self.drawing.write_element(element)
+        return element
+
+
+class StreamingDrawing:
+    """
+    Drop-in for the svgwrite.Drawing calls the writers use, without a DOM.
+
+    Elements go straight to a temporary file with constant memory; save()
+    closes the document and moves it into place. Output matches what
+    svgwrite.Drawing(profile=...) would write for the same calls; with
+    compress=True it is gzipped (.svgz).
+    """
+
+    def __init__(self, filename, size=("100%", "100%"), profile="full", compress=False, **extra):
+        self.filename = filename
+        self.tiny = profile == "tiny"
+        self._tmp = f"{filename}.{os.getpid()}.tmp"
+        if compress:
+            self._f = gzip.open(self._tmp, "wt", encoding="utf-8", compresslevel=6)
+        else:
+            self._f = open(self._tmp, "w", encoding="utf-8", buffering=1 << 16)
+
+        attribs = {
+            "width": size[0],
+            "height": size[1],
+            "baseProfile": profile,
+            "version": "1.2" if self.tiny else "1.1",
+        }
+        attribs.update(SVG_NAMESPACES)
+        attribs.update({attr_name(k): v for k, v in extra.items()})
+
+        self.write(SVG_HEADER)
+        self.write(f"<svg{attr_string(attribs, self.tiny)}>")
+        self.defs = StreamDefs(self)
+        self.body_started = False
+
+    def write(self, text):
+        self._f.write(text)
+
+    def start_body(self):
+        """Close <defs>; called before the first element outside it."""
+        if not self.body_started:
+            self.write("</defs>" if self.defs.opened else "<defs />")
+            self.body_started = True
+
+    def write_element(self, element):
+        self.write(f"<{element.name}{attr_string(element.attribs, self.tiny)} />")
+
+    def g(self, **attribs):
+        return StreamGroup(self, {attr_name(k): v for k, v in attribs.items()})
+
+    def path(self, **attribs):
+        return StreamElement("path", {attr_name(k): v for k, v in attribs.items()})
+
+    def use(self, href, **attribs):
+        attribs = {attr_name(k): v for k, v in attribs.items()}
+        attribs["xlink:href"] = href
+        return StreamElement("use", attribs)
+
+    def add(self, element):
+        if isinstance(element, StreamGroup):
+            element.close()
+        else:
+            self.start_body()
+            self.write_element(element)
+        return element
+
+    def save(self):
+        self.start_body()
+        self.write("</svg>")
+        self._f.close()
+        os.replace(self._tmp, self.filename)
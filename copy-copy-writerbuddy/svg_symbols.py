@@ -0,0 +1,107 @@
+import gzip
+import os
+
+SVG_NS = "http://www.w3.org/2000/svg"
+XLINK_HREF = "{http://www.w3.org/1999/xlink}href"
+
+
+def parse_svg(svg_path):
+    """lxml root of a .svg or .svgz file."""
+    # lxml is only needed when a written page is read back
+    from lxml import etree
+
+    opener = gzip.open if svg_path.endswith(".svgz") else open
+    with opener(svg_path, "rb") as f:
+        return etree.fromstring(f.read())
+
+
+def symbol_table(root):
+    """id -> element for everything defined in <defs>."""
+    return {
+        el.get("id"): el
+        for defs in root.iter("{%s}defs" % SVG_NS)
+        for el in defs
+        if el.get("id")
+    }
+
+
+def use_target(use, symbols):
+    """The element a <use> references in symbols (see symbol_table), or None."""
+    href = use.get(XLINK_HREF) or use.get("href") or ""
+    return symbols.get(href[1:]) if href.startswith("#") else None
+
+
+def check_symbols(svg_path):
+    """
+    Problems a plotter would hit drawing the <use> placements of svg_path.
+
+    Every <use> must point at a <path> in <defs> with non-empty path data;
+    anything else (missing ids, nested uses, external links) is reported.
+    An empty list means the geometry resolves.
+    """
+    root = parse_svg(svg_path)
+    symbols = symbol_table(root)
+    problems = []
+    for use in root.iter("{%s}use" % SVG_NS):
+        href = use.get(XLINK_HREF) or use.get("href") or ""
+        target = use_target(use, symbols)
+        if target is None:
+            problems.append(f"unresolved reference {href!r}")
+        elif target.tag != "{%s}path" % SVG_NS:
+            problems.append(f"{href} is a <{target.tag.split('}')[-1]}>, not a <path>")
+        elif not (target.get("d") or "").strip():
+            problems.append(f"{href} has no path data")
+    return problems
+
+
+def flatten_symbols(svg_path, out_path=None):
+    """
+    Replace every <use> with a copy of the path it references.
+
+    The copy carries the use's transform followed by the symbol's own, so
+    the geometry is unchanged; used definitions are then dropped. Writes
+    to out_path (default: in place) and returns the number of uses expanded.
+    """
+    from lxml import etree
+
+    root = parse_svg(svg_path)
+    symbols = symbol_table(root)
+    expanded = 0
+    used = set()
+    for use in list(root.iter("{%s}use" % SVG_NS)):
+        href = use.get(XLINK_HREF) or use.get("href") or ""
+        target = use_target(use, symbols)
+        if target is None:
+            continue
+
+        path = etree.Element(target.tag)
+        for name, value in target.attrib.items():
+            if name not in ("id", "transform"):
+                path.set(name, value)
+        for name, value in use.attrib.items():
+            if name not in (XLINK_HREF, "href", "transform", "x", "y"):
+                path.set(name, value)
+        transforms = [use.get("transform"), target.get("transform")]
+        if use.get("x") or use.get("y"):
+            transforms.insert(1, f"translate({use.get('x', '0')} {use.get('y', '0')})")
+        transform = " ".join(t for t in transforms if t)
+        if transform:
+            path.set("transform", transform)
+
+        path.tail = use.tail
+        use.getparent().replace(use, path)
+        used.add(href[1:])
+        expanded += 1
+
+    for symbol_id in used:
+        symbol = symbols[symbol_id]
+        symbol.getparent().remove(symbol)
+
+    data = etree.tostring(root, xml_declaration=True, encoding="utf-8")
+    out_path = out_path or svg_path
+    tmp_path = f"{out_path}.{os.getpid()}.tmp"
+    opener = gzip.open if out_path.endswith(".svgz") else open
+    with opener(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, out_path)
+    return expanded
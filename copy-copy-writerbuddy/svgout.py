@@ -1,11 +1,10 @@
 import random
 import svgwrite
-from lxml import etree
 import subprocess
 import json
 import os
 
-SVG_NS = "http://www.w3.org/2000/svg"
+import font_registry
 
 # --- FILES ---
 FONT_PATH = "/home/pi/Desktop/writerbuddy/EMSDelight.svg"
@@ -37,26 +36,7 @@ def random_line():
 
 
 def load_svg_font(svg_font_path):
-    tree = etree.parse(svg_font_path)
-    root = tree.getroot()
-
-    font = root.find(".//{%s}font" % SVG_NS)
-    font_face = root.find(".//{%s}font-face" % SVG_NS)
-
-    units_per_em = float(font_face.get("units-per-em", 1000))
-    ascent = float(font_face.get("ascent", units_per_em))
-    horiz_adv_x_default = float(font.get("horiz-adv-x", units_per_em))
-
-    glyphs = {}
-    for g in root.findall(".//{%s}glyph" % SVG_NS):
-        char = g.get("unicode")
-        path_data = g.get("d")
-        adv = float(g.get("horiz-adv-x", horiz_adv_x_default))
-
-        if char and path_data:
-            glyphs[char] = (path_data, adv)
-
-    return glyphs, units_per_em, ascent
+    return font_registry.get_font(svg_font_path)
 
 
 def load_state():
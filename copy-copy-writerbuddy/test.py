@@ -4,6 +4,8 @@ import sys
 import shutil
 import pyatspi
 
+import atspi_utils
+
 # ---------------- CONFIG ----------------
 INKSCAPE_WAIT = 30
 AXIDRAW_WAIT = 20
@@ -19,36 +21,10 @@ def wait_for_app(name, timeout):
     return None
 
 def find_menu_item(acc, text):
-    try:
-        if (
-            "menu item" in acc.getRoleName().lower()
-            and acc.name
-            and text.lower() in acc.name.lower()
-        ):
-            return acc
-        for i in range(acc.childCount):
-            found = find_menu_item(acc.getChildAtIndex(i), text)
-            if found:
-                return found
-    except Exception:
-        pass
-    return None
+    return atspi_utils.search(acc, atspi_utils.menu_item_named(text.lower()))[0]
 
 def find_apply_button(acc):
-    try:
-        if (
-            acc.getRoleName().lower() == "push button"
-            and acc.name
-            and acc.name.lower() == "apply"
-        ):
-            return acc
-        for i in range(acc.childCount):
-            found = find_apply_button(acc.getChildAtIndex(i))
-            if found:
-                return found
-    except Exception:
-        pass
-    return None
+    return atspi_utils.search(acc, atspi_utils.Match(("push button",), lambda name: name.lower() == "apply"))[0]
 
 def click_accessible(acc):
     try:
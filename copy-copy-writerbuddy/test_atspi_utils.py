@@ -0,0 +1,181 @@
+import heapq
+import sys
+import types
+
+import pytest
+
+import atspi_utils
+from reference_data import TreeNode, axidraw_dialog, inkscape_tree
+
+
+@pytest.mark.parametrize("role", ["menu item", "check menu item", "radio menu item", "tearoff menu item"])
+def test_menu_items_of_any_kind_are_found(role):
+    app = inkscape_tree(3, 4, 5)
+    axidraw = app.children[0].children[0].children[-1].children[-1].children[0]
+    axidraw.role = role
+    match = atspi_utils.menu_item_named("axidraw")
+    assert atspi_utils.search(app, match)[0] is axidraw
+    assert atspi_utils.find_path(app, match)[0] is axidraw
+
+
+@pytest.mark.parametrize("role", ["push button", "toggle button"])
+def test_buttons_of_any_kind_are_found(role):
+    dialog = axidraw_dialog(5)
+    apply = dialog.children[1].children[1]
+    apply.role = role
+    assert atspi_utils.search(dialog, atspi_utils.button_named("apply")) == (apply, (1, 1))
+
+
+def test_search_skips_hidden_tabs():
+    dialog = axidraw_dialog(40)
+    nodes = atspi_utils.nodes_visited()
+    hidden = dialog.children[0].children[3].children[0]
+    hidden.role = "push button"
+    assert atspi_utils.search(dialog, atspi_utils.button_named(hidden.name.lower()))[0] is None
+    assert atspi_utils.nodes_visited() - nodes < 60
+
+
+def test_path_cache_hits_and_recovers_from_a_stale_path():
+    app = inkscape_tree(3, 4, 5)
+    cache = atspi_utils.PathCache()
+    match = atspi_utils.menu_item_named("axidraw")
+    first = cache.find("axidraw", app, match)
+    assert cache.find("axidraw", app, match) is first
+    assert cache.hits == 1
+
+    app.children[0].children[0].children[-1].children.insert(0, TreeNode("Another", "menu item"))
+    assert cache.find("axidraw", app, match) is first
+    assert cache.stale == 1
+
+
+class FakeBus:
+    """
+    GLib main loop, pyatspi registry and clock on simulated time.
+
+    at(t, fn) runs fn t seconds into the wait, e.g. to make the target
+    appear or to send an event to the registered listeners.
+    """
+
+    def __init__(self):
+        self.now = 0.0
+        self.queue = []
+        self.timers = {}
+        self.listeners = []
+        self.running = False
+        self.seq = 0
+
+    def monotonic(self):
+        return self.now
+
+    def _push(self, t, item):
+        self.seq += 1
+        heapq.heappush(self.queue, (t, self.seq, item))
+
+    def at(self, t, fn):
+        self._push(t, ("call", fn))
+
+    def event(self, t, kind="window:create"):
+        self.at(t, lambda: [listener(kind) for listener in list(self.listeners)])
+
+    # GLib
+    def timeout_add(self, ms, fn):
+        self.seq += 1
+        source = self.seq
+        self.timers[source] = (ms / 1000.0, fn)
+        self._push(self.now + ms / 1000.0, ("timer", source))
+        return source
+
+    def source_remove(self, source):
+        del self.timers[source]
+
+    def find_source_by_id(self, source):
+        return source in self.timers
+
+    def run(self):
+        self.running = True
+        while self.running and self.queue:
+            t, _, (kind, what) = heapq.heappop(self.queue)
+            if kind == "timer" and what not in self.timers:
+                continue
+            self.now = max(self.now, t)
+            if kind == "call":
+                what()
+                continue
+            interval, fn = self.timers[what]
+            if fn():
+                self._push(self.now + interval, ("timer", what))
+            else:
+                del self.timers[what]
+
+    def quit(self):
+        self.running = False
+
+    # pyatspi
+    def registerEventListener(self, fn, *events):
+        self.listeners.append(fn)
+
+    def deregisterEventListener(self, fn, *events):
+        self.listeners.remove(fn)
+
+
+@pytest.fixture
+def bus(monkeypatch):
+    fake = FakeBus()
+    glib = types.SimpleNamespace(MainLoop=lambda: fake, timeout_add=fake.timeout_add,
+                                 source_remove=fake.source_remove,
+                                 MainContext=types.SimpleNamespace(default=lambda: fake))
+    monkeypatch.setitem(sys.modules, "gi", types.ModuleType("gi"))
+    monkeypatch.setitem(sys.modules, "gi.repository", types.SimpleNamespace(GLib=glib))
+    monkeypatch.setitem(sys.modules, "pyatspi", types.SimpleNamespace(Registry=fake))
+    monkeypatch.setattr(atspi_utils, "time", types.SimpleNamespace(monotonic=fake.monotonic))
+    monkeypatch.setattr(atspi_utils, "_waits", [])
+    return fake
+
+
+def appears(bus, t):
+    """A find() for a target that exists from t on, and the target."""
+    target = object()
+    return (lambda: target if bus.now >= t else None), target
+
+
+def test_event_ends_the_wait_and_counts_its_saving(bus):
+    find, target = appears(bus, 2.3)
+    bus.event(2.3)
+    assert atspi_utils.wait_for_event(find, 10) is target
+    assert bus.now == pytest.approx(2.3 + atspi_utils.CHECK_DELAY_S)
+    # Still missing at the 2.0 s poll, so one-second polling would have seen it at 3.0 s
+    wait = atspi_utils._waits[-1]
+    assert wait["source"] == "event" and wait["saved_s"] == pytest.approx(3.0 - bus.now)
+    assert bus.listeners == [] and bus.timers == {}
+
+
+def test_missed_event_is_found_by_the_poll_and_saves_nothing(bus):
+    find, target = appears(bus, 0.7)
+    assert atspi_utils.wait_for_event(find, 10) is target
+    assert bus.now == pytest.approx(atspi_utils.FALLBACK_POLL_S)
+    assert atspi_utils._waits[-1]["source"] == "poll"
+    assert atspi_utils.stats()["saved_ms"] == 0
+
+
+def test_target_named_after_its_event_is_found_by_a_follow_up_check(bus):
+    # The window is created at 0.3 s but only matches (gets its name) at 0.35 s, with no event
+    find, target = appears(bus, 0.35)
+    bus.event(0.3)
+    assert atspi_utils.wait_for_event(find, 10) is target
+    assert bus.now < 0.3 + 4 * atspi_utils.CHECK_DELAY_S
+    assert atspi_utils._waits[-1]["source"] == "event"
+
+
+def test_burst_of_events_is_checked_once_per_delay(bus):
+    calls = []
+    bus.at(0.0, lambda: [bus.event(0.1 + i * 0.001) for i in range(10)])
+
+    def find():
+        calls.append(bus.now)
+        return None
+
+    assert atspi_utils.wait_for_event(find, 0.5) is None
+    # The first call, then one check after the burst and its follow-ups
+    assert len([t for t in calls if 0.1 <= t < 0.1 + atspi_utils.CHECK_DELAY_S * 1.5]) == 1
+    assert atspi_utils._waits[-1] == {"label": "target", "elapsed_s": 0.5, "found": False, "source": None,
+                                      "saved_s": 0.0}
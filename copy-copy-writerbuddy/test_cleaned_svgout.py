@@ -0,0 +1,130 @@
+import re
+
+import numpy as np
+import pytest
+
+import cleaned_svgout
+import plot_time
+from reference_data import REFERENCE_UTTERANCES, legacy_split_to_lines
+
+
+def emitted_lines(split, glyphs, upm):
+    """Lines text_to_svg ends up writing for the reference corpus with a given splitter."""
+    out = []
+    for text in REFERENCE_UTTERANCES:
+        for line in split(text):
+            out.extend(cleaned_svgout.wrap_text_to_width(
+                line, glyphs, upm, cleaned_svgout.TEXT_HEIGHT_MM, cleaned_svgout.MAX_LINE_WIDTH))
+    return out
+
+
+def test_glyph_metric_split_emits_fewer_lines():
+    glyphs, upm, _ = cleaned_svgout.load_svg_font(cleaned_svgout.FONT_PATH)
+    old = emitted_lines(legacy_split_to_lines, glyphs, upm)
+    new = emitted_lines(cleaned_svgout.split_text_to_lines, glyphs, upm)
+    assert len(new) < len(old)
+    # Same words, only broken differently
+    assert " ".join(new).split() == " ".join(old).split()
+
+
+def sheet_swaps(fragments):
+    """Pages after which the user is asked for a fresh sheet, in plotting order (as main.py does)."""
+    swaps = []
+    for fragment in fragments:
+        if fragment.new_sheet:
+            swaps.append(fragment.page - 1)
+        if fragment.page_full:
+            swaps.append(fragment.page)
+    return swaps
+
+
+def test_new_page_across_jobs_asks_for_a_fresh_sheet(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cleaned_svgout.reset_state()
+    fragments = []
+    for i in range(40):
+        fragments.extend(cleaned_svgout.text_to_svg([f"line {i}"]))
+
+    pages = [f.page for f in fragments]
+    assert pages[0] == 1 and pages[-1] == 2
+    assert sheet_swaps(fragments) == [1]
+    assert fragments[pages.index(2)].new_sheet
+
+
+def test_new_page_when_appending_asks_for_a_fresh_sheet(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cleaned_svgout.reset_state()
+    layout = cleaned_svgout.load_line_layout()
+    fragments = []
+    for i in range(60):
+        fragments.extend(cleaned_svgout.append_text_to_svg(layout, f"a few more words for sentence {i}."))
+
+    assert fragments[-1].page > 1
+    assert sheet_swaps(fragments) == list(range(1, fragments[-1].page))
+
+
+def test_page_full_within_one_job(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cleaned_svgout.reset_state()
+    fragments = cleaned_svgout.text_to_svg([f"line {i}" for i in range(40)])
+
+    assert [f.page for f in fragments] == [1, 2]
+    assert sheet_swaps(fragments) == [1]
+
+
+def test_svgwrite_and_stream_writers_match(tmp_path, runs, write_page):
+    for mode in cleaned_svgout.OUTPUT_MODES:
+        strokes = cleaned_svgout.layout_strokes(runs, mode=mode)
+        written = []
+        for writer in ("svgwrite", "stream"):
+            with open(write_page(strokes, tmp_path / f"{mode}_{writer}.svg", writer), "rb") as f:
+                written.append(f.read())
+        assert written[0] == written[1], mode
+
+
+@pytest.mark.parametrize("mode", ["glyph", "symbol"])
+def test_glyph_svg_draws_the_stroke_page_geometry(tmp_path, write_page, mode):
+    # Curved glyphs at "fine" (every vertex kept) are where the two used to differ
+    runs = [("Ça ğüçlü Ğ", 15.0, 21.0, 1)]
+    strokes = cleaned_svgout.layout_strokes(runs, mode=mode, quality="fine")
+    path = write_page(strokes, tmp_path / "page.svg")
+    points, offsets, _, _ = plot_time.svg_page(path)
+    assert np.array_equal(offsets, strokes.offsets)
+    assert np.abs(points - strokes.points).max() <= cleaned_svgout.COORD_PRECISION_MM
+    # Written as the flattened polylines, not curves a plotter would flatten its own way
+    d = " ".join(re.findall(r' d="([^"]*)"', open(path).read()))
+    assert not set(re.findall(r"[A-Za-z]", d)) - set("MmLl")
+
+
+@pytest.mark.parametrize("mode", cleaned_svgout.OUTPUT_MODES)
+def test_pieces_write_the_same_page(tmp_path, monkeypatch, mode):
+    monkeypatch.setattr(cleaned_svgout, "OPTIMIZE_TRAVEL", False)
+    runs = [(f"line {i} of a page written a few lines at a time", 15.0, 21.0 + 8.4 * i, 1) for i in range(10)]
+
+    strokes = cleaned_svgout.layout_strokes(runs, mode=mode)
+    whole = tmp_path / "whole.svg"
+    dwg, group = cleaned_svgout.new_drawing(str(whole))
+    cleaned_svgout.draw_strokes(dwg, group, strokes)
+    dwg.add(group)
+    dwg.save()
+
+    pieces = []
+    in_pieces = tmp_path / "pieces.svg"
+    dwg, group = cleaned_svgout.new_drawing(str(in_pieces))
+    estimate = cleaned_svgout.draw_runs(dwg, group, runs, mode, on_piece=pieces.append)
+    dwg.add(group)
+    dwg.save()
+
+    assert len(pieces) > 1
+    assert whole.read_bytes() == in_pieces.read_bytes()
+    expected = plot_time.estimate_page(strokes)
+    assert estimate.keys() == expected.keys()
+    for key, value in expected.items():
+        assert estimate[key] == pytest.approx(value), key
+
+
+def test_fragments_do_not_keep_their_strokes(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cleaned_svgout.reset_state()
+    fragments = cleaned_svgout.text_to_svg([f"line {i}" for i in range(40)])
+    assert [f.strokes for f in fragments] == [None, None]
@@ -0,0 +1,69 @@
+import os
+import pickle
+import shutil
+
+import pytest
+
+import font_cache
+
+FONT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "EMSDelight.svg")
+
+
+@pytest.fixture
+def font_copy(tmp_path):
+    path = tmp_path / "font.svg"
+    shutil.copyfile(FONT, path)
+    return str(path)
+
+
+def same_font(a, b):
+    (ga, ua, aa), (gb, ub, ab) = a, b
+    assert (ua, aa) == (ub, ab)
+    assert list(ga) == list(gb)
+    for char in ga:
+        assert (ga[char].d, ga[char].adv) == (gb[char].d, gb[char].adv)
+        assert (ga[char].points == gb[char].points).all()
+        assert (ga[char].offsets == gb[char].offsets).all()
+
+
+def test_cache_hit_matches_parse(font_copy, tmp_path):
+    parsed = font_cache.parse_svg_font(font_copy)
+    same_font(font_cache.load_cached_font(font_copy, str(tmp_path)), parsed)
+    assert os.path.exists(font_cache.cache_path_for(font_copy, str(tmp_path)))
+    same_font(font_cache.load_cached_font(font_copy, str(tmp_path)), parsed)
+
+
+def test_rebuilt_when_font_changes(font_copy, tmp_path):
+    glyphs, _, _ = font_cache.load_cached_font(font_copy, str(tmp_path))
+    st = os.stat(font_copy)
+    text = open(font_copy).read()
+    old_adv = glyphs["a"].adv
+
+    # Same size, new mtime
+    with open(font_copy, "w") as f:
+        f.write(text.replace('glyph-name="a" horiz-adv-x="498"', 'glyph-name="a" horiz-adv-x="598"', 1))
+    os.utime(font_copy, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert os.path.getsize(font_copy) == st.st_size
+    glyphs, _, _ = font_cache.load_cached_font(font_copy, str(tmp_path))
+    assert glyphs["a"].adv != old_adv
+
+    # New size, mtime put back to the cached one
+    mtime = os.stat(font_copy).st_mtime_ns
+    with open(font_copy, "w") as f:
+        f.write(text + "\n")
+    os.utime(font_copy, ns=(st.st_atime_ns, mtime))
+    glyphs, _, _ = font_cache.load_cached_font(font_copy, str(tmp_path))
+    assert glyphs["a"].adv == old_adv
+
+
+@pytest.mark.parametrize("content", [b"", b"garbage", b"WBFS" + b"\0" * 100,
+                                     pickle.dumps({"version": 2, "glyphs": {}})])
+def test_damaged_cache_falls_back_to_parsing(font_copy, tmp_path, content):
+    cache_file = font_cache.cache_path_for(font_copy, str(tmp_path))
+    font_cache.load_cached_font(font_copy, str(tmp_path))
+    good = open(cache_file, "rb").read()
+    for damaged in (content, good[:len(good) // 2]):
+        with open(cache_file, "wb") as f:
+            f.write(damaged)
+        same_font(font_cache.load_cached_font(font_copy, str(tmp_path)), font_cache.parse_svg_font(font_copy))
+        assert open(cache_file, "rb").read() == good
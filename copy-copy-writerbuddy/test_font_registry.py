@@ -0,0 +1,58 @@
+import os
+import shutil
+
+import pytest
+
+import font_registry
+
+FONT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "EMSDelight.svg")
+
+
+@pytest.fixture
+def registry():
+    font_registry.clear()
+    yield font_registry
+    font_registry.set_max_fonts(font_registry.MAX_FONTS)
+    font_registry.clear()
+
+
+def font_copies(tmp_path, n):
+    paths = []
+    for i in range(n):
+        paths.append(str(tmp_path / f"font{i}.svg"))
+        shutil.copyfile(FONT, paths[-1])
+    return paths
+
+
+def test_hits_and_misses(registry, tmp_path):
+    a, b = font_copies(tmp_path, 2)
+    first = registry.get_font(a)
+    assert registry.get_font(a) is first
+    registry.get_font(b)
+    registry.get_font(a)
+    assert registry.stats() == {"hits": 2, "misses": 2, "size": 2, "max_size": registry.MAX_FONTS}
+
+
+def test_least_recently_used_font_is_evicted(registry, tmp_path):
+    a, b, c = font_copies(tmp_path, 3)
+    registry.set_max_fonts(2)
+    font_a = registry.get_font(a)
+    registry.get_font(b)
+    registry.get_font(a)
+    registry.get_font(c)  # evicts b, the least recently used
+    assert registry.stats()["size"] == 2
+
+    assert registry.get_font(a) is font_a
+    misses = registry.stats()["misses"]
+    registry.get_font(b)
+    assert registry.stats()["misses"] == misses + 1
+
+
+def test_edited_font_is_loaded_again(registry, tmp_path):
+    (a,) = font_copies(tmp_path, 1)
+    first = registry.get_font(a)
+    st = os.stat(a)
+    os.utime(a, ns=(st.st_atime_ns, st.st_mtime_ns + 10 ** 9))
+    assert registry.get_font(a) is not first
+    # The stale entry for the same path is dropped, not kept alongside
+    assert registry.stats()["size"] == 1
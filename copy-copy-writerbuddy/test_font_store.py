@@ -0,0 +1,45 @@
+import os
+
+import pytest
+
+import font_cache
+import font_store
+
+FONT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "EMSDelight.svg")
+
+
+@pytest.fixture
+def store(tmp_path):
+    return font_store.write_font_store(str(tmp_path / "font.wbfs"), font_cache.parse_svg_font(FONT), 123, 456)
+
+
+def test_store_round_trips_the_font(store):
+    glyphs, units_per_em, ascent = font_cache.parse_svg_font(FONT)
+    opened = font_store.FontStore(store)
+    assert (opened.mtime_ns, opened.size) == (123, 456)
+
+    stored, stored_upm, stored_ascent = opened.font()
+    assert (stored_upm, stored_ascent) == (units_per_em, ascent)
+    assert list(stored) == list(glyphs)
+    for char, g in glyphs.items():
+        assert (stored[char].d, stored[char].adv) == (g.d, g.adv)
+        assert (stored[char].points == g.points).all() and (stored[char].offsets == g.offsets).all()
+
+
+def test_glyph_arrays_are_read_only_views_of_the_file(store):
+    glyphs, _, _ = font_store.open_font_store(store)
+    points = next(g.points for g in glyphs.values() if len(g.points))
+    # Views into the shared mapping: no copy per worker, and no writing through them
+    assert not points.flags.owndata and not points.flags.writeable
+    with pytest.raises(ValueError):
+        points[0, 0] = 1.0
+
+
+def test_incomplete_store_raises_value_error(store, tmp_path):
+    data = open(store, "rb").read()
+    bad = tmp_path / "bad.wbfs"
+    wrong_version = data[:4] + (font_store.STORE_VERSION + 1).to_bytes(4, "little") + data[8:]
+    for content in (data[:font_store.HEADER.size - 1], data[:-1], data + b"\0", wrong_version):
+        bad.write_bytes(content)
+        with pytest.raises(ValueError):
+            font_store.FontStore(str(bad))
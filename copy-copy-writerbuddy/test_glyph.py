@@ -0,0 +1,63 @@
+import os
+
+import numpy as np
+
+import font_cache
+import glyph
+from glyph import Glyph
+
+FONT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "EMSDelight.svg")
+
+
+def strokes(d):
+    points, offsets = glyph.parse_path(d)
+    return [points[a:b].tolist() for a, b in zip(offsets[:-1], offsets[1:])]
+
+
+def test_lines_absolute_and_relative():
+    assert strokes("M 0 0 L 10 0 H 20 V 5") == [[[0, 0], [10, 0], [20, 0], [20, 5]]]
+    assert strokes("m 1 1 l 10 0 h 5 v -1") == [[[1, 1], [11, 1], [16, 1], [16, 0]]]
+    # Extra pairs after a moveto are linetos
+    assert strokes("M 0 0 5 5 10 0") == [[[0, 0], [5, 5], [10, 0]]]
+
+
+def test_close_path_returns_to_the_subpath_start():
+    assert strokes("M 0 0 L 4 0 L 4 4 Z M 10 10 l 1 0 z") == [
+        [[0, 0], [4, 0], [4, 4], [0, 0]],
+        [[10, 10], [11, 10], [10, 10]],
+    ]
+
+
+def test_cubic_is_flattened():
+    (stroke,) = strokes("M 0 0 C 0 10 10 10 10 0")
+    assert len(stroke) == glyph.CURVE_SEGMENTS + 1
+    assert stroke[0] == [0, 0] and stroke[-1] == [10, 0]
+    assert stroke[glyph.CURVE_SEGMENTS // 2] == [5, 7.5]
+    assert strokes("M 0 0 c 0 10 10 10 10 0") == [stroke]
+
+
+def test_single_point_subpaths_are_dropped():
+    points, offsets = glyph.parse_path("M 5 5 M 0 0 L 1 1")
+    assert points.dtype == np.float32 and offsets.dtype == np.int32
+    assert offsets.tolist() == [0, 2]
+    assert glyph.parse_path("")[1].tolist() == [0]
+
+
+def test_glyph_unpacks_like_the_old_tuple():
+    g = Glyph("M 0 0 L 1 0", 500)
+    d, adv = g
+    assert (d, adv, g[1], len(g)) == ("M 0 0 L 1 0", 500.0, 500.0, 2)
+    assert g.stroke_count == 1
+
+
+def test_pack_unpack_round_trip():
+    glyphs, _, _ = font_cache.parse_svg_font(FONT)
+    packed = glyph.pack_glyphs(glyphs)
+    assert packed["points"].dtype == np.float32
+    unpacked = glyph.unpack_glyphs(packed)
+    assert list(unpacked) == list(glyphs)
+    for char, g in glyphs.items():
+        u = unpacked[char]
+        assert (u.d, u.adv) == (g.d, g.adv)
+        assert np.array_equal(u.points, g.points) and np.array_equal(u.offsets, g.offsets)
+    assert glyph.unpack_glyphs(glyph.pack_glyphs({})) == {}
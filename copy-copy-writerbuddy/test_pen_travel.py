@@ -0,0 +1,38 @@
+import numpy as np
+
+import pen_travel
+
+
+def random_strokes(n, seed=1):
+    rng = np.random.default_rng(seed)
+    starts = rng.uniform(0, 200, (n, 2))
+    return starts, starts + rng.uniform(-3, 3, (n, 2))
+
+
+def test_exhausted_time_limit_still_finishes_nearest_neighbour():
+    starts, ends = random_strokes(500)
+    nn = pen_travel.travel_distance(starts, ends, *pen_travel.nearest_neighbour(starts, ends))
+    order, flipped = pen_travel.optimize_order(starts, ends, time_limit=0.0)
+    assert sorted(order.tolist()) == list(range(500))
+    assert pen_travel.travel_distance(starts, ends, order, flipped) <= nn
+
+
+def test_two_opt_improves_on_nearest_neighbour():
+    starts, ends = random_strokes(200)
+    nn = pen_travel.travel_distance(starts, ends, *pen_travel.nearest_neighbour(starts, ends))
+    order, flipped = pen_travel.optimize_order(starts, ends)
+    assert pen_travel.travel_distance(starts, ends, order, flipped) < nn
+
+
+def test_pass_cap_gives_the_same_order_every_time():
+    starts, ends = random_strokes(300, seed=2)
+    runs = [pen_travel.optimize_order(starts, ends, max_passes=1) for _ in range(3)]
+    for order, flipped in runs[1:]:
+        assert np.array_equal(order, runs[0][0]) and np.array_equal(flipped, runs[0][1])
+
+    # No passes is the nearest-neighbour seed; more passes never do worse
+    nn = pen_travel.nearest_neighbour(starts, ends)
+    assert np.array_equal(pen_travel.optimize_order(starts, ends, max_passes=0)[0], nn[0])
+    distances = [pen_travel.travel_distance(starts, ends, *pen_travel.optimize_order(starts, ends, max_passes=k))
+                 for k in (0, 1, 2, None)]
+    assert distances == sorted(distances, reverse=True)
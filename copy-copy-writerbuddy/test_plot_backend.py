@@ -0,0 +1,47 @@
+import pytest
+
+import cleaned_svgout
+import pagination
+import plot_backend
+import plot_time
+
+@pytest.mark.parametrize("mode", cleaned_svgout.OUTPUT_MODES)
+def test_fake_plot_matches_estimate(tmp_path, mode, runs, write_page):
+    strokes = cleaned_svgout.layout_strokes(runs, mode=mode)
+    path = write_page(strokes, tmp_path / "page.svg")
+    estimate = plot_time.estimate_page(strokes)
+
+    for fragment in (pagination.PageFragment(1, path, 2, False, None, strokes),
+                     pagination.PageFragment(1, path, 2, False)):
+        device = plot_backend.FakeAxiDraw()
+        assert plot_backend.get_plotter("fake", device)(fragment)
+        assert device.lowers == estimate["lifts"]
+        assert device.draw_distance == pytest.approx(estimate["draw_mm"], rel=1e-3)
+        assert device.pen_up and (device.x, device.y) == (0.0, 0.0)
+
+
+def test_strokes_and_svg_plot_the_same_moves(tmp_path, runs, write_page):
+    strokes = cleaned_svgout.layout_strokes(runs)
+    path = write_page(strokes, tmp_path / "page.svg")
+
+    from_strokes, from_svg = plot_backend.FakeAxiDraw(), plot_backend.FakeAxiDraw()
+    plot_backend.AxiDrawPlotter(from_strokes).plot_strokes(strokes)
+    plot_backend.AxiDrawPlotter(from_svg).plot_file(path)
+    assert len(from_strokes.moves) == len(from_svg.moves)
+    # The SVG holds coordinates rounded to COORD_PRECISION_MM
+    for a, b in zip(from_strokes.moves, from_svg.moves):
+        assert a[0] == b[0]
+        assert a[1:] == pytest.approx(b[1:], abs=cleaned_svgout.COORD_PRECISION_MM)
+
+
+def test_get_plotter():
+    assert isinstance(plot_backend.get_plotter("fake"), plot_backend.AxiDrawPlotter)
+    assert isinstance(plot_backend.get_plotter("fake").device, plot_backend.FakeAxiDraw)
+    with pytest.raises(ValueError):
+        plot_backend.get_plotter("plotter9000")
+
+
+def test_disconnected_device_raises(runs):
+    strokes = cleaned_svgout.layout_strokes(runs)
+    with pytest.raises(RuntimeError):
+        plot_backend.AxiDrawPlotter(plot_backend.FakeAxiDraw(connected=False)).plot_strokes(strokes)
@@ -0,0 +1,77 @@
+import math
+
+import numpy as np
+import pytest
+
+import cleaned_svgout
+import plot_time
+
+# Two straight strokes: (10, 0) -> (20, 0), then (20, 10) -> (20, 30)
+POINTS = np.array([[10.0, 0.0], [20.0, 0.0], [20.0, 10.0], [20.0, 30.0]])
+OFFSETS = np.array([0, 2, 4])
+
+
+def stop_to_stop(length, speed, accel):
+    """Time for a move that starts and ends at rest, worked out by hand."""
+    ramp = speed ** 2 / accel
+    if length <= ramp:
+        return 2 * math.sqrt(length / accel)
+    return 2 * speed / accel + (length - ramp) / speed
+
+
+def test_known_page():
+    s = plot_time.DEFAULT_SETTINGS
+    estimate = plot_time.estimate_strokes(POINTS, OFFSETS)
+
+    draw_s = stop_to_stop(10, s.pen_down_speed, s.acceleration) + stop_to_stop(20, s.pen_down_speed, s.acceleration)
+    # Pen-up from the origin to the first stroke, then between the strokes: 10 mm each
+    travel_s = 2 * stop_to_stop(10, s.pen_up_speed, s.acceleration)
+    pen_s = 2 * (s.pen_lift_s + s.pen_lower_s)
+
+    assert estimate["draw_mm"] == pytest.approx(30.0)
+    assert estimate["travel_mm"] == pytest.approx(20.0)
+    assert estimate["draw_s"] == pytest.approx(draw_s)
+    assert estimate["travel_s"] == pytest.approx(travel_s)
+    assert estimate["pen_s"] == pytest.approx(pen_s)
+    assert estimate["time_s"] == pytest.approx(draw_s + travel_s + pen_s)
+    assert (estimate["lifts"], estimate["strokes"], estimate["vertices"]) == (2, 2, 4)
+
+
+def test_corners_slow_the_pen():
+    straight = plot_time.stroke_time(np.array([[0.0, 0.0], [10.0, 0.0], [20.0, 0.0]]), np.array([0, 3]))
+    corner = plot_time.stroke_time(np.array([[0.0, 0.0], [10.0, 0.0], [10.0, 10.0]]), np.array([0, 3]))
+    reversal = plot_time.stroke_time(np.array([[0.0, 0.0], [10.0, 0.0], [0.0, 0.0]]), np.array([0, 3]))
+    assert straight < corner < reversal
+    # Doubling back stops at the turn: two separate stop-to-stop moves
+    s = plot_time.DEFAULT_SETTINGS
+    assert reversal == pytest.approx(2 * stop_to_stop(10, s.pen_down_speed, s.acceleration))
+
+
+def test_svg_in_other_units_estimates_the_same(tmp_path):
+    # 1 user unit = 0.1 mm, strokes nested in a translated group
+    path = tmp_path / "page.svg"
+    path.write_text(
+        '<svg xmlns="http://www.w3.org/2000/svg" width="210mm" height="297mm" viewBox="0 0 2100 2970">'
+        '<g transform="translate(100 0)"><path d="M 0 0 L 100 0 M 100 100 L 100 300" /></g></svg>'
+    )
+    points, offsets, elements, size = plot_time.svg_page(str(path))
+    assert size == pytest.approx((210.0, 297.0))
+    assert np.array_equal(offsets, OFFSETS) and elements.tolist() == [0, 0]
+    assert points == pytest.approx(POINTS)
+    assert plot_time.estimate_svg(str(path)) == pytest.approx(plot_time.estimate_strokes(POINTS, OFFSETS))
+
+
+@pytest.mark.parametrize("mode", cleaned_svgout.OUTPUT_MODES)
+def test_written_page_estimates_like_its_strokes(tmp_path, runs, write_page, mode):
+    strokes = cleaned_svgout.layout_strokes(runs, mode=mode)
+    from_file = plot_time.estimate_svg(write_page(strokes, tmp_path / "page.svg"))
+    from_strokes = plot_time.estimate_page(strokes)
+    assert from_file["strokes"] == from_strokes["strokes"]
+    assert from_file["time_s"] == pytest.approx(from_strokes["time_s"], rel=1e-3)
+
+
+def test_describe_duration():
+    assert plot_time.describe_duration(3) == "about 5 seconds"
+    assert plot_time.describe_duration(42) == "about 40 seconds"
+    assert plot_time.describe_duration(80) == "about 1 minute"
+    assert plot_time.describe_duration(200) == "about 3 minutes"
@@ -0,0 +1,70 @@
+import os
+
+import numpy as np
+import pytest
+
+import cleaned_svgout
+import preview
+
+GOLDEN_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "golden")
+
+
+def test_page_matches_golden(tmp_path, runs, regenerate_golden):
+    golden = os.path.join(GOLDEN_DIR, "two_lines.png")
+    for mode in cleaned_svgout.OUTPUT_MODES:
+        image = preview.render_page(cleaned_svgout.layout_strokes(runs, mode=mode))
+        # Every mode draws the same page; the first one rewrites the golden if asked to
+        regenerate = regenerate_golden and mode == cleaned_svgout.OUTPUT_MODES[0]
+        diff = str(tmp_path / f"two_lines_{mode}.diff.png")
+        assert preview.matches_golden(image, golden, diff_path=diff, regenerate=regenerate), f"{mode}: see {diff}"
+
+
+def test_golden_compare_tolerates_a_pixel_shift_only(tmp_path, runs):
+    image = preview.render_page(cleaned_svgout.layout_strokes(runs))
+    golden = str(tmp_path / "page.png")
+    preview.write_png(golden, image)
+    assert preview.matches_golden(image, golden)
+    assert preview.matches_golden(np.roll(image, 1, axis=1), golden)
+
+    missing_fox = preview.render_page(cleaned_svgout.layout_strokes([("The quick brown", 15.0, 21.0, 1), runs[1]]))
+    diff = str(tmp_path / "out" / "page.diff.png")
+    os.makedirs(os.path.dirname(diff))
+    assert not preview.matches_golden(missing_fox, golden, diff_path=diff)
+    assert os.path.exists(diff)
+    assert sorted(os.listdir(tmp_path)) == ["out", "page.png"]
+
+
+def test_missing_golden_fails_unless_regenerating(tmp_path, runs):
+    image = preview.render_page(cleaned_svgout.layout_strokes(runs))
+    golden = str(tmp_path / "new.png")
+    with pytest.raises(FileNotFoundError):
+        preview.matches_golden(image, golden)
+    assert not os.path.exists(golden)
+
+    assert preview.matches_golden(image, golden, regenerate=True)
+    assert preview.matches_golden(image, golden)
+
+
+def test_overprints_of_crossing_strokes():
+    points = np.array([[10.0, 10.0], [30.0, 10.0], [20.0, 0.0], [20.0, 20.0], [0.0, 30.0], [40.0, 30.0]])
+    offsets = [0, 2, 4, 6]
+    size = (40.0, 40.0)
+
+    pairs = preview.overprints(points, offsets, [0, 1, 2], size)
+    assert [(a, b) for a, b, *_ in pairs] == [(0, 1)]
+    _, _, pixels, x, y = pairs[0]
+    assert pixels > 0
+    assert abs(x - 20.0) <= 1.0 and abs(y - 10.0) <= 1.0
+    # Strokes of one glyph may cross
+    assert preview.overprints(points, offsets, [0, 0, 1], size) == []
+
+
+def test_overprints_on_a_page(runs):
+    strokes = cleaned_svgout.layout_strokes(runs)
+    assert preview.overprints(strokes.points, strokes.offsets, strokes.groups, strokes.size_mm) == []
+
+    # "lazy" written again over itself, shifted half a letter
+    strokes = cleaned_svgout.layout_strokes(runs + [("lazy", 60.0, 29.4, 1)])
+    pairs = preview.overprints(strokes.points, strokes.offsets, strokes.groups, strokes.size_mm)
+    assert pairs
+    assert {strokes.chars[g] for a, b, *_ in pairs for g in (a, b)} <= set("lazy")
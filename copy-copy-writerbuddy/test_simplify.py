@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+import cleaned_svgout
+import font_registry
+import simplify
+
+
+def point_to_polyline(p, line):
+    """Distance from p to the nearest segment of a polyline."""
+    a, b = line[:-1], line[1:]
+    ab = b - a
+    length2 = (ab ** 2).sum(axis=1)
+    t = np.clip(((p - a) * ab).sum(axis=1) / np.where(length2 > 0, length2, 1.0), 0.0, 1.0)
+    return float(np.hypot(*(a + t[:, None] * ab - p).T).min())
+
+
+def assert_within(points, offsets, new_points, new_offsets, tolerance):
+    assert len(new_offsets) == len(offsets)
+    for i in range(len(offsets) - 1):
+        old = points[offsets[i]:offsets[i + 1]]
+        new = new_points[new_offsets[i]:new_offsets[i + 1]]
+        # Endpoints stay, and every dropped vertex is within tolerance of what is left
+        assert np.array_equal(new[0], old[0]) and np.array_equal(new[-1], old[-1])
+        if len(new) > 1:
+            assert max(point_to_polyline(p, new) for p in old) <= tolerance + 1e-9
+
+
+def test_rdp_stays_within_tolerance():
+    rng = np.random.default_rng(3)
+    t = np.linspace(0, 2 * np.pi, 200)
+    wave = np.c_[t * 10, np.sin(t) * 5 + rng.normal(0, 0.05, len(t))]
+    loop = np.c_[np.cos(t), np.sin(t)] * 4 + 30  # closed: first point == last
+    loop[-1] = loop[0]
+    points = np.concatenate([wave, loop, [[0.0, 0.0], [1.0, 1.0]]])
+    offsets = np.array([0, 200, 400, 402])
+
+    for tolerance in (0.01, 0.1, 0.5):
+        new_points, new_offsets = simplify.simplify_strokes(points, offsets, tolerance)
+        assert len(new_points) < len(points)
+        assert_within(points, offsets, new_points, new_offsets, tolerance)
+
+
+def test_zero_tolerance_keeps_every_vertex():
+    points = np.array([[0.0, 0.0], [1.0, 0.001], [2.0, 0.0]])
+    offsets = np.array([0, 3])
+    new_points, new_offsets = simplify.simplify_strokes(points, offsets, 0.0)
+    assert new_points is points and new_offsets is offsets
+
+
+@pytest.mark.parametrize("quality", ["draft", "normal"])
+def test_font_outlines_stay_within_quality_tolerance(quality):
+    glyphs, units_per_em, _ = cleaned_svgout.load_svg_font(cleaned_svgout.FONT_PATH)
+    tolerance = cleaned_svgout.QUALITY_TOLERANCE_MM[quality] * units_per_em / cleaned_svgout.TEXT_HEIGHT_MM
+    simplified = simplify.simplified_glyphs(glyphs, tolerance)
+    assert simplified
+    for char, (points, offsets, removed, _) in simplified.items():
+        g = glyphs[char]
+        assert removed == len(g.points) - len(points)
+        assert_within(g.points, g.offsets, points, offsets, tolerance * (1 + 1e-6))
+
+
+def test_simplified_glyphs_are_cached_with_the_font():
+    glyphs, _, _ = cleaned_svgout.load_svg_font(cleaned_svgout.FONT_PATH)
+    first = simplify.simplified_glyphs(glyphs, 20.0)
+    assert simplify.simplified_glyphs(glyphs, 20.0) is first
+
+    font_registry.clear()
+    assert font_registry.derived(glyphs) == {}
+    assert simplify.simplified_glyphs(glyphs, 20.0) is not first
@@ -0,0 +1,83 @@
+import os
+import shutil
+
+import numpy as np
+
+import cleaned_svgout
+import font_registry
+import pen_travel
+import stroke_merge
+from reference_data import REFERENCE_UTTERANCES
+
+FONT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "EMSDelight.svg")
+
+
+def strokes(*polylines):
+    points = np.concatenate([np.asarray(p, dtype=np.float64) for p in polylines])
+    offsets = np.cumsum([0] + [len(p) for p in polylines])
+    return points, offsets
+
+
+def segments(points, offsets):
+    """Set of undirected segments drawn by a stroke array."""
+    out = set()
+    for a, b in zip(offsets[:-1], offsets[1:]):
+        for p, q in zip(points[a:b - 1].tolist(), points[a + 1:b].tolist()):
+            out.add(tuple(sorted([tuple(p), tuple(q)])))
+    return out
+
+
+def test_merge_keeps_geometry_and_bridges_only_within_tolerance():
+    points, offsets = strokes(
+        [[0, 0], [1, 0]],
+        [[1.2, 0], [2, 1]],      # starts 0.2 after the first ends
+        [[3, 1], [2, 1]],        # ends where the second ends: reversed
+        [[10, 10], [11, 10]],    # too far to join
+    )
+    merged, new_offsets, removed = stroke_merge.merge_strokes(points, offsets, 0.25)
+
+    assert removed == 2 and len(new_offsets) - 1 == 2
+    old, new = segments(points, offsets), segments(merged, new_offsets)
+    assert old <= new
+    for p, q in new - old:
+        assert np.hypot(*np.subtract(p, q)) <= 0.25
+
+
+def test_nothing_within_tolerance_is_left_alone():
+    points, offsets = strokes([[0, 0], [1, 0]], [[2, 0], [3, 0]])
+    merged, new_offsets, removed = stroke_merge.merge_strokes(points, offsets, 0.5)
+    assert removed == 0 and merged is points
+
+
+def test_merged_glyphs_live_and_die_with_the_registry_entry(tmp_path):
+    font_registry.clear()
+    font_registry.set_max_fonts(1)
+    try:
+        a, b = str(tmp_path / "a.svg"), str(tmp_path / "b.svg")
+        shutil.copyfile(FONT, a)
+        shutil.copyfile(FONT, b)
+        glyphs, units_per_em, _ = font_registry.get_font(a)
+        tolerance = 1.0 * units_per_em / cleaned_svgout.TEXT_HEIGHT_MM
+        merged = stroke_merge.merged_glyphs(glyphs, tolerance)
+        assert merged and stroke_merge.merged_glyphs(glyphs, tolerance) is merged
+
+        font_registry.get_font(b)  # evicts a, and everything derived from it
+        assert font_registry.derived(glyphs) == {}
+        assert stroke_merge.merged_glyphs(glyphs, tolerance) is not merged
+    finally:
+        font_registry.set_max_fonts(font_registry.MAX_FONTS)
+        font_registry.clear()
+
+
+def test_default_tolerance_removes_lifts_on_a_page(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    runs = [run for run in cleaned_svgout.load_line_layout().add_text(" ".join(REFERENCE_UTTERANCES * 20))
+            if run[3] == 1]
+    outlines = cleaned_svgout.page_outlines("fine")
+    points, offsets, _, _ = outlines.place_runs(runs)
+    starts, ends = pen_travel.stroke_endpoints(points, offsets)
+    order, flipped = pen_travel.optimize_order(starts, ends, max_passes=cleaned_svgout.TRAVEL_MAX_PASSES)
+    points, offsets = pen_travel.reorder_strokes(points, offsets, order, flipped)
+    _, _, joined = stroke_merge.join_consecutive(
+        offsets, *pen_travel.stroke_endpoints(points, offsets), cleaned_svgout.MERGE_TOLERANCE_MM)
+    assert joined > 0
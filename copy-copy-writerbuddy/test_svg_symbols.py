@@ -0,0 +1,38 @@
+import numpy as np
+import pytest
+
+import cleaned_svgout
+import plot_time
+import svg_symbols
+
+
+@pytest.mark.parametrize("ext", [".svg", ".svgz"])
+def test_flattened_symbols_draw_the_glyph_page(tmp_path, runs, write_page, ext):
+    glyph_page = write_page(cleaned_svgout.layout_strokes(runs, mode="glyph"), tmp_path / "glyph.svg")
+    symbol_page = write_page(cleaned_svgout.layout_strokes(runs, mode="symbol"), tmp_path / f"symbol{ext}",
+                             "stream")
+    assert svg_symbols.check_symbols(symbol_page) == []
+
+    flat = str(tmp_path / f"flat{ext}")
+    uses = svg_symbols.flatten_symbols(symbol_page, flat)
+    assert uses == sum(1 for run in runs for c in run[0] if not c.isspace())
+    assert svg_symbols.check_symbols(flat) == []
+
+    points, offsets, elements, _ = plot_time.svg_page(flat)
+    glyph_points, glyph_offsets, glyph_elements, _ = plot_time.svg_page(glyph_page)
+    assert np.array_equal(offsets, glyph_offsets) and np.array_equal(elements, glyph_elements)
+    # Placements are snapped to the grid before (symbol) or after (glyph) adding the ascent
+    assert np.abs(points - glyph_points).max() <= cleaned_svgout.COORD_PRECISION_MM
+
+
+def test_check_reports_broken_references(tmp_path):
+    path = tmp_path / "broken.svg"
+    path.write_text(
+        '<svg xmlns="http://www.w3.org/2000/svg" xmlns:xlink="http://www.w3.org/1999/xlink">'
+        '<defs><path id="a" d="M 0 0 L 1 1" /><path id="empty" d="" /><g id="group" /></defs>'
+        '<use xlink:href="#a" /><use xlink:href="#missing" /><use xlink:href="#empty" />'
+        '<use xlink:href="#group" /></svg>'
+    )
+    problems = svg_symbols.check_symbols(str(path))
+    assert len(problems) == 3
+    assert svg_symbols.flatten_symbols(str(path)) == 3  # the missing one is left alone
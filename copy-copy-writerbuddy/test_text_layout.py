@@ -0,0 +1,82 @@
+import pytest
+
+import cleaned_svgout
+import text_layout
+from reference_data import REFERENCE_UTTERANCES, legacy_wrap_text_to_width, random_corpus
+
+HEIGHT = cleaned_svgout.TEXT_HEIGHT_MM
+
+
+@pytest.fixture
+def font():
+    return cleaned_svgout.load_svg_font(cleaned_svgout.FONT_PATH)
+
+
+def legacy_line_width(words, glyphs, upm):
+    """Width of one line of words, summed in the order the original loop used."""
+    scale = HEIGHT / upm
+    widths = [sum(glyphs[c][1] * scale for c in w if c in glyphs) for w in words]
+    width = widths[0]
+    for w in widths[1:]:
+        width += HEIGHT * text_layout.SPACE_FACTOR + w
+    return width
+
+
+@pytest.mark.parametrize("max_width", [20.0, 60.0, cleaned_svgout.MAX_LINE_WIDTH, 400.0])
+def test_wrap_matches_legacy_loop(font, max_width):
+    glyphs, upm, _ = font
+    texts = REFERENCE_UTTERANCES + [random_corpus(glyphs, 200, seed) for seed in range(20)]
+    for text in texts:
+        old = legacy_wrap_text_to_width(text, glyphs, upm, HEIGHT, max_width)
+        new = cleaned_svgout.wrap_text_to_width(text, glyphs, upm, HEIGHT, max_width)
+        assert new == old, text
+
+
+def test_line_exactly_max_width_fits(font):
+    glyphs, upm, _ = font
+    tol = text_layout.WIDTH_TOLERANCE_MM
+    for text in REFERENCE_UTTERANCES:
+        words = text.split()
+        for k in range(1, min(len(words), 10)):
+            exact = legacy_line_width(words[:k], glyphs, upm)
+            line = " ".join(words[:k])
+            # An exact fit stays on one line whichever way the sums round
+            for max_width in (exact, exact * (1 + 1e-15), exact * (1 - 1e-15)):
+                assert cleaned_svgout.wrap_text_to_width(text, glyphs, upm, HEIGHT, max_width)[0] == line
+            # Anything clearly narrower breaks before the last word
+            if k > 1:
+                narrower = cleaned_svgout.wrap_text_to_width(text, glyphs, upm, HEIGHT, exact - 10 * tol)
+                assert narrower[0] == " ".join(words[:k - 1])
+                assert narrower == legacy_wrap_text_to_width(text, glyphs, upm, HEIGHT, exact - 10 * tol)
+
+
+def test_state_restores_open_line_across_reload(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    cleaned_svgout.reset_state()
+    chunks = [f"sentence {i} goes on for a few more words." for i in range(60)]
+
+    kept = cleaned_svgout.load_line_layout()
+    expected = [run for chunk in chunks for run in kept.add_text(chunk)]
+
+    runs = []
+    for chunk in chunks:
+        # A fresh process: the layout comes back from the state file each time
+        layout = cleaned_svgout.load_line_layout()
+        runs.extend(layout.add_text(chunk))
+        cleaned_svgout.save_layout_state(layout)
+
+    assert [(text, page) for text, _, _, page in runs] == [(text, page) for text, _, _, page in expected]
+    for got, want in zip(runs, expected):
+        assert got[1:3] == pytest.approx(want[1:3], abs=1e-3)
+    assert expected[-1][3] > 1
+    assert layout.state() == kept.state()
+
+
+def test_restore_accepts_legacy_state(font):
+    glyphs, upm, _ = font
+    table = text_layout.advance_table(glyphs, upm, HEIGHT)
+    layout = text_layout.LineLayout(table, 15.0, 21.0, 180.0, 8.4, 282.0)
+    layout.restore({"current_y": 50.4})
+
+    assert layout.state() == {"current_y": 50.4, "page": 1}
+    assert layout.add_text("hello") == [("hello", 15.0, 50.4, 1)]
@@ -0,0 +1,191 @@
+from bisect import bisect_right
+
+import numpy as np
+
+import font_registry
+
+# Width of a space relative to the text height, as used by the SVG writers
+SPACE_FACTOR = 0.6
+
+# Slack for float rounding when a line is exactly max_width wide: the widths
+# are summed in a different order than the original per-character loop, so
+# an exact fit can land a few ulps either side of the limit
+WIDTH_TOLERANCE_MM = 1e-6
+
+
+class AdvanceTable:
+    """
+    Glyph advances in mm indexed by codepoint, for one font and text size.
+
+    The last slot is zero and absorbs every codepoint the font lacks, so
+    measuring is a single gather with no per-character dict lookups.
+    """
+
+    def __init__(self, glyphs, units_per_em, text_height_mm):
+        scale = text_height_mm / units_per_em
+        self.space_width = text_height_mm * SPACE_FACTOR
+
+        singles = [(ord(c), g[1]) for c, g in glyphs.items() if len(c) == 1]
+        size = max([cp for cp, _ in singles] + [ord(" ")]) + 2
+
+        self.adv_mm = np.zeros(size, dtype=np.float64)
+        for cp, adv in singles:
+            self.adv_mm[cp] = adv * scale
+        self.adv_mm[ord(" ")] = self.space_width
+        self.missing = size - 1
+
+    def indices(self, text):
+        """Codepoint index array for text; unknown codepoints map to the zero slot."""
+        cps = np.frombuffer(text.encode("utf-32-le"), dtype="<u4")
+        return np.minimum(cps, self.missing).astype(np.intp)
+
+    def text_width(self, text):
+        """Width of text in mm, spaces included."""
+        if not text:
+            return 0.0
+        return float(self.adv_mm[self.indices(text)].sum())
+
+    def word_widths(self, words):
+        """Widths of many words with one gather and one segmented sum."""
+        if not words:
+            return np.zeros(0, dtype=np.float64)
+        lengths = np.fromiter((len(w) for w in words), dtype=np.intp, count=len(words))
+        starts = np.zeros(len(words), dtype=np.intp)
+        np.cumsum(lengths[:-1], out=starts[1:])
+        char_widths = self.adv_mm[self.indices("".join(words))]
+        return np.add.reduceat(char_widths, starts)
+
+
+def advance_table(glyphs, units_per_em, text_height_mm):
+    """Return an AdvanceTable, cached with the font while it is resident (see font_registry.derived)."""
+    cache = font_registry.derived(glyphs)
+    key = ("advances", units_per_em, text_height_mm)
+    if key not in cache:
+        cache[key] = AdvanceTable(glyphs, units_per_em, text_height_mm)
+    return cache[key]
+
+
+def break_words(widths, space_width, max_width):
+    """
+    Greedy line breaks from word widths.
+
+    Returns a list of (start, end) word index ranges. Each line takes as
+    many words as fit within max_width (give or take WIDTH_TOLERANCE_MM),
+    always at least one.
+    """
+    n = len(widths)
+    if n == 0:
+        return []
+
+    # ends[k]: width of words 0..k-1 plus one trailing space per word
+    ends = np.empty(n + 1, dtype=np.float64)
+    ends[0] = 0.0
+    np.cumsum(widths + space_width, out=ends[1:])
+    ends = ends.tolist()
+    empty = (widths == 0).tolist()
+
+    ranges = []
+    start = 0
+    while start < n:
+        limit = ends[start] + space_width + max_width + WIDTH_TOLERANCE_MM
+        # A line opened by an overflowing zero-width word starts one space in
+        if start > 0 and empty[start]:
+            limit -= space_width
+        end = max(bisect_right(ends, limit, start + 1) - 1, start + 1)
+        ranges.append((start, end))
+        start = end
+    return ranges
+
+
+def wrap_words(text, table, max_width):
+    """Wrap text to max_width with an AdvanceTable, breaking at word boundaries."""
+    words = text.split()
+    widths = table.word_widths(words)
+    return [" ".join(words[a:b]) for a, b in break_words(widths, table.space_width, max_width)]
+
+
+class LineLayout:
+    """
+    Incremental layout that keeps the last line open between utterances.
+
+    `cursor_x` is the width already used on the open line (0 when no line
+    is open), `line_y` its top and `next_y` the top of the next fresh line.
+    Only the words passed to add_text() are measured. A fresh line whose
+    top would fall below `bottom` starts the next page instead of wrapping
+    over the current one.
+    """
+
+    def __init__(self, table, start_x, start_y, max_width, line_height, bottom):
+        self.table = table
+        self.start_x = start_x
+        self.start_y = start_y
+        self.max_width = max_width
+        self.line_height = line_height
+        self.bottom = bottom
+
+        self.page = 1
+        self.cursor_x = 0.0
+        self.line_y = start_y
+        self.next_y = start_y
+
+    def _open_line(self):
+        if self.next_y > self.bottom:
+            self.page += 1
+            self.line_y = self.start_y
+        else:
+            self.line_y = self.next_y
+        self.next_y = self.line_y + self.line_height
+        self.cursor_x = 0.0
+
+    def add_text(self, text):
+        """
+        Lay out new words after the open line.
+
+        Returns a list of (text, x, y, page) runs in mm; the open line
+        stays open so the next utterance can continue on it.
+        """
+        words = text.split()
+        if not words:
+            return []
+
+        widths = self.table.word_widths(words)
+        space = self.table.space_width
+        runs = []
+
+        # Fill the open line first
+        k = 0
+        if self.cursor_x > 0:
+            x0 = self.cursor_x
+            steps = np.cumsum(widths + space).tolist()
+            while k < len(words) and x0 + steps[k] <= self.max_width + WIDTH_TOLERANCE_MM:
+                k += 1
+            if k:
+                runs.append((" ".join(words[:k]), self.start_x + x0 + space, self.line_y, self.page))
+                self.cursor_x = x0 + steps[k - 1]
+
+        # Remaining words start fresh lines; the last one stays open
+        for a, b in break_words(widths[k:], space, self.max_width):
+            self._open_line()
+            runs.append((" ".join(words[k + a:k + b]), self.start_x, self.line_y, self.page))
+            self.cursor_x = float(widths[k + a:k + b].sum()) + space * (b - a - 1)
+
+        return runs
+
+    def close_line(self):
+        """Finish the open line so the next text starts a fresh one."""
+        self.cursor_x = 0.0
+
+    def state(self):
+        """Compact JSON-serializable state; `current_y` stays compatible with load_state()."""
+        state = {"current_y": round(self.next_y, 3), "page": self.page}
+        if self.cursor_x > 0:
+            state["line_y"] = round(self.line_y, 3)
+            state["cursor_x"] = round(self.cursor_x, 3)
+        return state
+
+    def restore(self, state):
+        """Load state() output (or the legacy {"current_y": y} form)."""
+        self.page = int(state.get("page", 1))
+        self.next_y = float(state.get("current_y", self.start_y))
+        self.cursor_x = float(state.get("cursor_x", 0.0))
+        self.line_y = float(state.get("line_y", self.next_y))
@@ -3,29 +3,49 @@ import os
 import time
 import sys
 
-# Try importing gTTS (internet required)
-try:
-    from gtts import gTTS
-    HAS_GTTS = True
-except ImportError:
-    HAS_GTTS = False
-    print("gTTS not found. Install with: pip install gTTS")
+# gTTS (internet required) and the pyttsx3 fallback are both loaded on
+# first use, so importing this module costs nothing at startup.
+HAS_GTTS = None
+gTTS = None
 
 # Fallback engine
-import pyttsx3
-engine = pyttsx3.init("espeak")
-engine.setProperty("rate", 150)
-engine.setProperty("volume", 1.0)
+engine = None
+
+
+def _load_gtts():
+    """Try importing gTTS once; sets HAS_GTTS."""
+    global HAS_GTTS, gTTS
+    if HAS_GTTS is None:
+        try:
+            from gtts import gTTS as _gTTS
+            gTTS = _gTTS
+            HAS_GTTS = True
+        except ImportError:
+            HAS_GTTS = False
+            print("gTTS not found. Install with: pip install gTTS")
+    return HAS_GTTS
+
+
+def get_engine():
+    """Initialize the offline espeak engine on first use."""
+    global engine
+    if engine is None:
+        import pyttsx3
+        engine = pyttsx3.init("espeak")
+        engine.setProperty("rate", 150)
+        engine.setProperty("volume", 1.0)
+    return engine
 
 def speak_fallback(text):
     """Uses the offline robotic voice."""
+    engine = get_engine()
     engine.say(text)
     engine.runAndWait()
     engine.stop()
 
 def speak(text):
     """Tries to speak with a human-like voice (online), falls back if fails."""
-    if not HAS_GTTS:
+    if not _load_gtts():
         speak_fallback(text)
         return
 